@@ -0,0 +1,539 @@
+#!/usr/bin/env python3
+"""
+Local JSON API Server
+
+Serves index.html and a small JSON API on top of CleanBibleDownloader and
+the stored corpus:
+
+    GET  /api/books                          book names and chapter counts
+    GET  /api/text/<Book>/<chapter>          verses (?version=he-en|he|en|en:<title>)
+    GET  /api/gematria/<Book>/<chapter>      verse totals and word values
+    GET  /api/gematria?text=...              value of any text in every scheme
+    GET  /api/gematria/value/<n>             words and verses with a value (?scheme=, ?limit=)
+    GET  /api/jobs                           download jobs and their progress
+    POST /api/jobs                           start a download, body {"book": ..., "version": ...}
+    POST /api/jobs/<id>/cancel               cancel a running download
+    GET  /api/events                         server-sent events: job progress as it happens
+
+Text comes from a SQLite store (--db) when it has the chapter, otherwise
+from the downloader, whose on-disk cache (--cache-dir) makes repeat fetches
+free. Rendered GET responses are kept in an LRU and carry an ETag, so a
+repeated chapter view is answered from memory or with 304 Not Modified.
+
+Value lookups use a gematria_index.GematriaIndex, loaded from
+--gematria-index or built from the store on first use (and saved to
+--gematria-index when given); a finished download into the store marks
+it for rebuilding.
+
+    python api_server.py --db tanakh.db --cache-dir cache --gematria-index tanakh.npz
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import sys
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+from clean_bible_downloader import BIBLE_BOOKS, CancelToken, CleanBibleDownloader, version_parts
+from response_cache import ResponseCache
+from text_writers import StreamingBookWriter
+
+INDEX_FILE = Path(__file__).parent / 'index.html'
+
+# Rendered GET responses kept in memory
+RESPONSE_CACHE_SIZE = 512
+
+# Seconds between SSE keep-alive comments while nothing changes
+KEEPALIVE_SECONDS = 15.0
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+def check_version(version: str):
+    """Raise a 400 ApiError unless version is a known or named Sefaria version"""
+    try:
+        version_parts(version)
+    except ValueError as e:
+        raise ApiError(400, str(e)) from None
+
+class DownloadJob:
+    """One book download started through the API"""
+
+    def __init__(self, job_id: int, book_name: str, version: str):
+        self.id = job_id
+        self.book_name = book_name
+        self.version = version
+        self.state = 'queued'
+        self.done = 0
+        self.total = 0
+        self.failed: List[int] = []
+        self.files: List[str] = []
+        self.error: Optional[str] = None
+        self.started = time.time()
+        self.finished: Optional[float] = None
+        self.token = CancelToken()
+
+    def as_dict(self) -> Dict:
+        return {
+            'id': self.id, 'book': self.book_name, 'version': self.version, 'state': self.state,
+            'done': self.done, 'total': self.total, 'failed': self.failed, 'files': self.files,
+            'error': self.error, 'started': self.started, 'finished': self.finished,
+        }
+
+class JobManager:
+    """Runs download jobs in background threads and wakes event streams on every change"""
+
+    def __init__(self, downloader: CleanBibleDownloader, output_dir: Path,
+                 db_path: Optional[str] = None, on_finish=None):
+        self.downloader = downloader
+        self.output_dir = output_dir
+        self.db_path = db_path
+        self.on_finish = on_finish
+        self.jobs: Dict[int, DownloadJob] = {}
+        self.changed = threading.Condition()
+        self.revision = 0
+        self.closed = False
+        self._ids = itertools.count(1)
+
+    def notify(self):
+        with self.changed:
+            self.revision += 1
+            self.changed.notify_all()
+
+    def close(self):
+        """Cancel running jobs and release waiting event streams"""
+        for job in list(self.jobs.values()):
+            job.token.cancel()
+        self.closed = True
+        self.notify()
+
+    def snapshot(self) -> List[Dict]:
+        return [job.as_dict() for job in list(self.jobs.values())]
+
+    def start(self, book_name: str, version: str) -> DownloadJob:
+        job = DownloadJob(next(self._ids), book_name, version)
+        self.jobs[job.id] = job
+        threading.Thread(target=self._run, args=(job,), daemon=True).start()
+        self.notify()
+        return job
+
+    def cancel(self, job_id: int) -> DownloadJob:
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise ApiError(404, f"no job {job_id}")
+        job.token.cancel()
+        return job
+
+    def _run(self, job: DownloadJob):
+        job.state = 'running'
+        self.notify()
+
+        store = None
+        try:
+            if self.db_path:
+                from sqlite_store import SQLiteStore
+                # SQLite connections belong to one thread, so each job opens its own
+                store = SQLiteStore(self.db_path)
+                writer = store.book_writer(job.book_name, job.version)
+            else:
+                self.output_dir.mkdir(parents=True, exist_ok=True)
+                writer = StreamingBookWriter(self.output_dir, f"{job.book_name}_complete")
+
+            def progress(chapter: int, chapter_count: int, data: Dict):
+                job.done += 1
+                job.total = chapter_count
+                if 'error' in data:
+                    job.failed.append(chapter)
+                self.notify()
+
+            result = self.downloader.stream_book(job.book_name, writer, job.version,
+                                                 progress=progress, token=job.token)
+            if 'error' in result:
+                writer.abort()
+                job.state, job.error = 'failed', result['error']
+            elif result.get('cancelled'):
+                writer.abort()
+                job.state = 'cancelled'
+            else:
+                job.files = writer.close()
+                job.state = 'finished'
+        except Exception as e:
+            job.state, job.error = 'failed', str(e)
+        finally:
+            if store is not None:
+                store.close()
+            job.finished = time.time()
+            if self.on_finish is not None:
+                self.on_finish(job)
+            self.notify()
+
+class BibleApi:
+    """Request routing and data access shared by all handler threads"""
+
+    def __init__(self, downloader: CleanBibleDownloader, output_dir: str = 'clean_downloads',
+                 db_path: Optional[str] = None, gematria_index_path: Optional[str] = None):
+        self.downloader = downloader
+        self.db_path = db_path
+        self.gematria_index_path = gematria_index_path
+        self._value_index = None
+        self._value_index_stale = False
+        self._value_index_lock = threading.Lock()
+        self.jobs = JobManager(downloader, Path(output_dir), db_path, on_finish=self._job_finished)
+        self._local = threading.local()
+        self._responses: 'OrderedDict[str, Tuple[bytes, str]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _store(self):
+        """This thread's SQLiteStore connection, or None without --db"""
+        if not self.db_path:
+            return None
+        store = getattr(self._local, 'store', None)
+        if store is None:
+            from sqlite_store import SQLiteStore
+            store = self._local.store = SQLiteStore(self.db_path)
+        return store
+
+    def _job_finished(self, job: DownloadJob):
+        # A finished download may have stored chapters that were served from elsewhere before
+        with self._lock:
+            self._responses.clear()
+        if self.db_path:
+            with self._value_index_lock:
+                self._value_index = None
+                self._value_index_stale = True
+
+    def cached_get(self, key: str, render) -> Tuple[bytes, str]:
+        """(body, etag) of a GET response, rendered once and kept in the LRU"""
+        with self._lock:
+            entry = self._responses.get(key)
+            if entry is not None:
+                self._responses.move_to_end(key)
+                return entry
+
+        body = json.dumps(render(), ensure_ascii=False).encode('utf-8')
+        entry = (body, '"' + hashlib.sha1(body).hexdigest() + '"')
+        with self._lock:
+            self._responses[key] = entry
+            while len(self._responses) > RESPONSE_CACHE_SIZE:
+                self._responses.popitem(last=False)
+        return entry
+
+    def resolve_book(self, name: str) -> str:
+        from bible_cli import resolve_book
+        try:
+            return resolve_book(name)
+        except ValueError as e:
+            raise ApiError(404, str(e)) from None
+
+    def chapter_text(self, book_name: str, chapter: int, version: str) -> Dict[str, List[str]]:
+        """{'hebrew': [...], 'english': [...]} from the store, else from the downloader"""
+        check_version(version)
+        if not 1 <= chapter <= self.downloader.get_chapter_count(book_name):
+            raise ApiError(404, f"{book_name} has no chapter {chapter}")
+
+        store = self._store()
+        if store is not None and chapter in store.chapter_numbers(book_name, version):
+            return {'hebrew': store.chapter(book_name, chapter, 'hebrew', version),
+                    'english': store.chapter(book_name, chapter, 'english', version)}
+
+        self.downloader.rate_limiter.acquire()
+        data = self.downloader.download_chapter(book_name, chapter, version)
+        if 'error' in data:
+            raise ApiError(502, data['error'])
+        return data
+
+    def books(self) -> Dict:
+        return {'books': [{'key': key, 'name': name,
+                           'chapters': self.downloader.get_chapter_count(name)}
+                          for key, name in BIBLE_BOOKS.items()]}
+
+    def text(self, book_name: str, chapter: int, version: str) -> Dict:
+        data = self.chapter_text(book_name, chapter, version)
+        hebrew, english = data['hebrew'], data['english']
+        return {
+            'book': book_name, 'chapter': chapter, 'version': version,
+            'verses': [{'verse': i + 1,
+                        'hebrew': hebrew[i] if i < len(hebrew) else '',
+                        'english': english[i] if i < len(english) else ''}
+                       for i in range(max(len(hebrew), len(english)))],
+        }
+
+    def chapter_gematria(self, book_name: str, chapter: int, scheme: str) -> Dict:
+        import numpy as np
+        from gematria import SCHEMES, GematriaCorpus
+
+        if scheme not in SCHEMES:
+            raise ApiError(400, f"unknown scheme '{scheme}'")
+        # he-en, like the default text view, so both share one cached response
+        hebrew = self.chapter_text(book_name, chapter, 'he-en')['hebrew']
+        corpus = GematriaCorpus.from_verses((book_name, chapter, verse, text)
+                                            for verse, text in enumerate(hebrew, 1))
+        word_sums = corpus.word_sums(scheme).tolist()
+        word_verse = corpus.word_verse(np.arange(len(word_sums))).tolist()
+
+        verses = [{'verse': i + 1, 'value': total, 'words': []}
+                  for i, total in enumerate(corpus.verse_sums(scheme).tolist())]
+        for index, (value, row) in enumerate(zip(word_sums, word_verse)):
+            verses[row]['words'].append([corpus.word(index), value])
+        return {'book': book_name, 'chapter': chapter, 'scheme': scheme,
+                'total': sum(verse['value'] for verse in verses), 'verses': verses}
+
+    def text_gematria(self, text: str) -> Dict:
+        from gematria import SCHEMES, gematria, letters_only
+
+        return {'text': text, 'letters': letters_only(text),
+                'values': {scheme: gematria(text, scheme) for scheme in SCHEMES}}
+
+    def value_index(self):
+        """The GematriaIndex, loaded or built on first use"""
+        with self._value_index_lock:
+            if self._value_index is not None:
+                return self._value_index
+
+            from gematria import SCHEMES
+            from gematria_index import GematriaIndex
+
+            path = self.gematria_index_path
+            store = self._store()
+            if path and Path(path).exists() and not (self._value_index_stale and store is not None):
+                self._value_index = GematriaIndex.load(path)
+            elif store is not None:
+                self._value_index = GematriaIndex.from_verses(store.iter_verses('hebrew'), list(SCHEMES))
+                if path:
+                    self._value_index.save(path)
+                self._value_index_stale = False
+            else:
+                raise ApiError(503, "no gematria index: start the server with --gematria-index or --db")
+            return self._value_index
+
+    def value_lookup(self, value: int, scheme: str, limit: int) -> Dict:
+        index = self.value_index()
+        if scheme not in index.schemes:
+            raise ApiError(400, f"scheme '{scheme}' is not in the gematria index")
+        return index.lookup(value, scheme, limit)
+
+    def get(self, path: str, query: Dict[str, List[str]]) -> Tuple[bytes, str]:
+        """(body, etag) of a cacheable GET"""
+        parts = [unquote(part) for part in path.strip('/').split('/')]
+        param = lambda name, default: query.get(name, [default])[0]
+
+        if parts == ['api', 'books']:
+            return self.cached_get('books', self.books)
+
+        if parts[:3] == ['api', 'gematria', 'value'] and len(parts) == 4:
+            try:
+                value, limit = int(parts[3]), int(param('limit', '20'))
+            except ValueError:
+                raise ApiError(400, "value and limit must be integers") from None
+            if limit < 0:
+                raise ApiError(400, "limit must not be negative")
+            scheme = param('scheme', 'standard')
+            return self.cached_get(f"value/{value}/{scheme}/{limit}",
+                                   lambda: self.value_lookup(value, scheme, limit))
+
+        if len(parts) == 4 and parts[1] in ('text', 'gematria'):
+            book_name = self.resolve_book(parts[2])
+            try:
+                chapter = int(parts[3])
+            except ValueError:
+                raise ApiError(400, f"bad chapter '{parts[3]}'") from None
+
+            if parts[1] == 'text':
+                version = param('version', 'he-en')
+                return self.cached_get(f"text/{book_name}/{chapter}/{version}",
+                                       lambda: self.text(book_name, chapter, version))
+            scheme = param('scheme', 'standard')
+            return self.cached_get(f"gematria/{book_name}/{chapter}/{scheme}",
+                                   lambda: self.chapter_gematria(book_name, chapter, scheme))
+
+        if parts == ['api', 'gematria']:
+            text = param('text', '')
+            return self.cached_get(f"gematria?{text}", lambda: self.text_gematria(text))
+
+        raise ApiError(404, f"no route for {path}")
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """HTTP front of a BibleApi (set on the server as server.api)"""
+
+    protocol_version = 'HTTP/1.1'
+
+    @property
+    def api(self) -> BibleApi:
+        return self.server.api
+
+    def log_message(self, format, *args):
+        sys.stderr.write(f"[api] {self.address_string()} {format % args}\n")
+
+    def send_json(self, status: int, data, etag: Optional[str] = None, body: Optional[bytes] = None):
+        if body is None:
+            body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if etag is not None:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        try:
+            if url.path in ('/', '/index.html'):
+                return self.send_file(INDEX_FILE, 'text/html; charset=utf-8')
+            if url.path == '/api/events':
+                return self.stream_events()
+            if url.path == '/api/jobs':
+                return self.send_json(200, {'jobs': self.api.jobs.snapshot()})
+
+            body, etag = self.api.get(url.path, parse_qs(url.query))
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            self.send_json(200, None, etag, body)
+        except ApiError as e:
+            self.send_json(e.status, {'error': str(e)})
+        except ConnectionError:
+            pass
+        except Exception as e:
+            self.send_internal_error(e)
+
+    def do_POST(self):
+        parts = urlparse(self.path).path.strip('/').split('/')
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            try:
+                body = json.loads(self.rfile.read(length) or b'{}')
+            except ValueError:
+                raise ApiError(400, 'request body is not JSON') from None
+
+            if parts == ['api', 'jobs']:
+                book_name = self.api.resolve_book(str(body.get('book', '')))
+                version = body.get('version', 'he-en')
+                check_version(version)
+                return self.send_json(202, self.api.jobs.start(book_name, version).as_dict())
+
+            if len(parts) == 4 and parts[:2] == ['api', 'jobs'] and parts[3] == 'cancel':
+                try:
+                    job_id = int(parts[2])
+                except ValueError:
+                    raise ApiError(404, f"no job {parts[2]}") from None
+                return self.send_json(200, self.api.jobs.cancel(job_id).as_dict())
+
+            raise ApiError(404, f"no route for {self.path}")
+        except ApiError as e:
+            self.send_json(e.status, {'error': str(e)})
+        except ConnectionError:
+            pass
+        except Exception as e:
+            self.send_internal_error(e)
+
+    def send_internal_error(self, error: Exception):
+        """Log an unexpected exception and answer 500 with a JSON body"""
+        self.log_error("unhandled error in %s %s\n%s", self.command, self.path, traceback.format_exc())
+        self.send_json(500, {'error': f"internal server error: {error}"})
+
+    def send_file(self, path: Path, content_type: str):
+        body = path.read_bytes()
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream_events(self):
+        """Push a 'progress' event with every job on each change, until the client goes away
+
+        An unexpected exception ends the stream with an 'error' event.
+        """
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.close_connection = True
+
+        jobs = self.api.jobs
+        seen = -1
+        try:
+            while not jobs.closed:
+                with jobs.changed:
+                    jobs.changed.wait_for(lambda: jobs.revision != seen or jobs.closed,
+                                          timeout=KEEPALIVE_SECONDS)
+                    revision = jobs.revision
+
+                if revision == seen:
+                    self.wfile.write(b": keep-alive\n\n")
+                else:
+                    seen = revision
+                    data = json.dumps({'jobs': jobs.snapshot()}, ensure_ascii=False)
+                    self.wfile.write(f"event: progress\ndata: {data}\n\n".encode('utf-8'))
+                self.wfile.flush()
+        except ConnectionError:
+            pass
+        except Exception as e:
+            self.log_error("unhandled error in event stream\n%s", traceback.format_exc())
+            data = json.dumps({'error': f"internal server error: {e}"}, ensure_ascii=False)
+            try:
+                self.wfile.write(f"event: error\ndata: {data}\n\n".encode('utf-8'))
+                self.wfile.flush()
+            except ConnectionError:
+                pass
+
+class ApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], api: BibleApi):
+        super().__init__(address, ApiHandler)
+        self.api = api
+
+    def server_close(self):
+        self.api.jobs.close()
+        super().server_close()
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--db', help='SQLite store to read text from and download into')
+    parser.add_argument('--cache-dir', help='on-disk response cache directory')
+    parser.add_argument('--gematria-index', help='GematriaIndex .npz for value lookups')
+    parser.add_argument('-o', '--output', default='clean_downloads',
+                        help='output directory for downloads without --db')
+    parser.add_argument('--rate', type=float, default=4.0, help='requests per second to Sefaria')
+    parser.add_argument('--base-url', default='https://www.sefaria.org/api')
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    cache = ResponseCache(args.cache_dir) if args.cache_dir else None
+    downloader = CleanBibleDownloader(requests_per_second=args.rate, base_url=args.base_url,
+                                      cache=cache)
+    server = ApiServer((args.host, args.port), BibleApi(downloader, args.output, args.db,
+                                                            args.gematria_index))
+    print(f"Serving on http://{args.host}:{server.server_address[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if cache is not None:
+            cache.flush()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Async Clean Bible Downloader
+
+An asyncio backend with the same public methods as CleanBibleDownloader,
+as coroutines. A single event loop drives every request through one
+aiohttp session, bounded by a semaphore and the shared token-bucket rate
+limiter, so one process can keep hundreds of chapter requests in flight.
+
+Downloads take the same CancelToken as the threaded downloader. Paused
+coroutines wait without blocking the event loop, and cancelling the token
+cancels a book's outstanding chapter tasks, including ones in a retry wait.
+
+Requires aiohttp (pip install aiohttp).
+"""
+
+import asyncio
+import json
+import time
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from chapter_index import ChapterIndex, load_chapter_index
+from clean_bible_downloader import (BIBLE_BOOKS, VERSIONS, CancelToken, DownloadCancelled, RateLimiter,
+                                    chapter_params, parse_chapter)
+from http_transport import HTTPTransport, LatencyStats, backoff_delay, parse_retry_after
+from verse_table import VerseTable
+
+# Seconds between looks at a CancelToken while paused or waiting to retry
+TOKEN_POLL_INTERVAL = 0.05
+
+async def check_token(token: Optional[CancelToken]):
+    """CancelToken.check() for coroutines: wait while paused, then raise DownloadCancelled if cancelled"""
+    if token is None:
+        return
+    while token.paused:
+        await asyncio.sleep(TOKEN_POLL_INTERVAL)
+    if token.cancelled:
+        raise DownloadCancelled()
+
+async def token_sleep(delay: float, token: Optional[CancelToken]):
+    """asyncio.sleep that raises DownloadCancelled as soon as token is cancelled"""
+    if token is None:
+        await asyncio.sleep(delay)
+        return
+    deadline = time.monotonic() + delay
+    while True:
+        await check_token(token)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        await asyncio.sleep(min(remaining, TOKEN_POLL_INTERVAL))
+
+async def cancel_on(token: CancelToken, tasks: List['asyncio.Task']):
+    """Cancel tasks once token is cancelled (run alongside them, cancel this when they finish)"""
+    while not token.cancelled:
+        await asyncio.sleep(TOKEN_POLL_INTERVAL)
+    for task in tasks:
+        task.cancel()
+
+class AsyncRateLimiter(RateLimiter):
+    """Token bucket rate limiter that waits without blocking the event loop"""
+
+    async def acquire(self):
+        """Wait until a request token is available"""
+        if self.rate <= 0:
+            return
+
+        wait = self.reserve()
+        while wait > 0:
+            await asyncio.sleep(wait)
+            wait = self.reserve()
+
+class AsyncCleanBibleDownloader:
+    """asyncio Bible text downloader with HTML tag removal"""
+
+    def __init__(self, max_concurrency: int = 100, requests_per_second: float = 4.0,
+                 base_url: str = "https://www.sefaria.org/api",
+                 chapter_index: Optional[ChapterIndex] = None,
+                 connect_timeout: float = 5.0, read_timeout: float = 30.0,
+                 max_retries: int = 4, backoff_factor: float = 0.5, max_backoff: float = 60.0):
+        if aiohttp is None:
+            raise ImportError("AsyncCleanBibleDownloader requires aiohttp: pip install aiohttp")
+
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = AsyncRateLimiter(requests_per_second)
+        self.chapter_index = chapter_index or load_chapter_index()
+
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.stats = LatencyStats()
+
+        self.bible_books = dict(BIBLE_BOOKS)
+        self.versions = dict(VERSIONS)
+
+        # Created on first use, inside the running event loop
+        self._session = None
+        self._semaphore = None
+
+    async def open(self):
+        """Create the HTTP session and concurrency semaphore"""
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers={
+                    'User-Agent': 'Clean-Bible-Downloader/1.0',
+                    'Accept': 'application/json',
+                    'Accept-Encoding': 'gzip, deflate',
+                },
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def close(self):
+        """Close the HTTP session"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            self._semaphore = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _get_json(self, url: str, params: Optional[Dict] = None,
+                        token: Optional[CancelToken] = None) -> Dict:
+        """GET a JSON document, retrying 429/5xx and connection errors with backoff"""
+        await self.open()
+
+        attempt = 0
+        while True:
+            await check_token(token)
+            await self.rate_limiter.acquire()
+
+            start = None
+            try:
+                async with self._semaphore:
+                    start = time.perf_counter()
+                    async with self._session.get(url, params=params) as response:
+                        body = await response.read()
+                        self.stats.record(url, time.perf_counter() - start, response.status, len(body))
+
+                        if (response.status not in HTTPTransport.RETRY_STATUSES
+                                or attempt >= self.max_retries):
+                            response.raise_for_status()
+                            return json.loads(body)
+
+                        delay = parse_retry_after(response.headers.get('Retry-After'), self.max_backoff)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                self.stats.record(url, time.perf_counter() - start if start else 0.0, None)
+                if attempt >= self.max_retries:
+                    raise
+                delay = None
+
+            if delay is None:
+                delay = backoff_delay(attempt, self.backoff_factor, self.max_backoff)
+
+            attempt += 1
+            self.stats.record_retry()
+            await token_sleep(delay, token)
+
+    async def get_chapter_count(self, book_name: str) -> int:
+        """Get the number of chapters in a book"""
+        chapter_count = self.chapter_index.chapter_count(book_name)
+        if chapter_count:
+            return chapter_count
+
+        try:
+            data = await self._get_json(f"{self.base_url}/texts/{book_name}")
+            return len(data.get('text', []))
+        except Exception as e:
+            print(f"Error getting chapter count: {e}")
+            return 0
+
+    async def download_chapter(self, book_name: str, chapter: int, version: str = 'he',
+                               token: Optional[CancelToken] = None) -> Dict:
+        """Download a specific chapter (raises DownloadCancelled if token is cancelled)"""
+        try:
+            url = f"{self.base_url}/texts/{book_name}.{chapter}"
+            data = await self._get_json(url, chapter_params(version), token)
+            return parse_chapter(data, version)
+        except DownloadCancelled:
+            raise
+        except Exception as e:
+            print(f"Error downloading {book_name} chapter {chapter}: {e!r}")
+            return {'hebrew': [], 'english': [], 'error': str(e) or repr(e)}
+
+    async def download_book(self, book_name: str, version: str = 'he',
+                            token: Optional[CancelToken] = None) -> Dict:
+        """Download an entire book with every chapter requested concurrently
+
+        If token is cancelled, the outstanding chapter tasks are cancelled
+        and the chapters downloaded so far are returned, with 'cancelled' set.
+        """
+        chapter_count = await self.get_chapter_count(book_name)
+        if chapter_count == 0:
+            return {'error': f'Could not determine chapter count for {book_name}'}
+
+        tasks = [asyncio.ensure_future(self.download_chapter(book_name, chapter, version, token))
+                 for chapter in range(1, chapter_count + 1)]
+        watcher = asyncio.ensure_future(cancel_on(token, tasks)) if token is not None else None
+        try:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+        table = VerseTable()
+        all_text = table.as_result()
+        # Tasks are in chapter order; cancelled ones are left out
+        for chapter, task in enumerate(tasks, 1):
+            if task.cancelled() or task.exception() is not None:
+                continue
+            chapter_data = task.result()
+            if 'error' not in chapter_data:
+                table.add_chapter(book_name, chapter, chapter_data['hebrew'], chapter_data['english'])
+            else:
+                print(f"Error in {book_name} Chapter {chapter}: {chapter_data['error']}")
+
+        if token is not None and token.cancelled:
+            print(f"Download of {book_name} cancelled")
+            all_text['cancelled'] = True
+        return all_text
+
+    async def download_books(self, books: Optional[Iterable[str]] = None, version: str = 'he',
+                             token: Optional[CancelToken] = None) -> Dict[str, Dict]:
+        """Download several books (default: the whole Tanakh) on one event loop"""
+        books: List[str] = list(books or self.bible_books.values())
+        results = await asyncio.gather(*(self.download_book(book_name, version, token)
+                                         for book_name in books))
+        return dict(zip(books, results))
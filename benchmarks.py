@@ -0,0 +1,874 @@
+#!/usr/bin/env python3
+"""
+Benchmarks - Command Line Version
+Measure downloader performance against a local stub of the Sefaria API
+"""
+
+import argparse
+import asyncio
+import html
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from chapter_index import load_chapter_index
+from clean_bible_downloader import CleanBibleDownloader
+from corpus_format import CorpusReader, convert_text_outputs
+from response_cache import ResponseCache
+from tests.stub_server import SAMPLE_ENGLISH, SAMPLE_HEBREW, StubSefariaServer
+from text_cleaner import clean_lines
+from text_writers import save_clean_text
+from verse_table import VerseRecord, VerseTable
+
+PLAIN_ENGLISH = 'God said, &ldquo;Let there be light&rdquo;; and there&thinsp;was light.'
+PLAIN_HEBREW = 'וַיֹּ֥אמֶר אֱלֹהִ֖ים יְהִ֣י א֑וֹר וַֽיְהִי־אֽוֹר׃ <span class="mam-spi-pe">{פ}</span>'
+
+# Verses in the Masoretic Tanakh
+TANAKH_VERSES = 23207
+
+
+def serial_download(downloader: CleanBibleDownloader, book_name: str, version: str) -> dict:
+    """The original download_book loop: one chapter at a time with a fixed sleep"""
+    table = VerseTable()
+
+    for chapter in range(1, downloader.get_chapter_count(book_name) + 1):
+        chapter_data = downloader.download_chapter(book_name, chapter, version)
+        table.add_chapter(book_name, chapter, chapter_data['hebrew'], chapter_data['english'])
+        time.sleep(0.5)
+
+    return table.as_result()
+
+
+def benchmark_download(args):
+    """Compare the serial loop with the concurrent download_book"""
+    with StubSefariaServer(args.chapters, args.verses, args.latency, args.fail_every) as stub:
+        serial = stub.downloader()
+        start = time.perf_counter()
+        expected = serial_download(serial, 'Psalms', 'he-en')
+        serial_time = time.perf_counter() - start
+
+        concurrent = stub.downloader(max_workers=args.workers, requests_per_second=args.rate)
+        start = time.perf_counter()
+        result = concurrent.download_book('Psalms', 'he-en')
+        concurrent_time = time.perf_counter() - start
+
+    print(f"\n=== download_book: {args.chapters} chapters, {args.latency * 1000:.0f} ms latency ===")
+    print(f"Serial loop (0.5 s sleep): {serial_time:8.2f} s")
+    print(f"Concurrent ({args.workers} workers, {args.rate:g} req/s): {concurrent_time:8.2f} s")
+    print(f"Speedup: {serial_time / concurrent_time:.1f}x")
+    print(f"Chapter order preserved: {result == expected}")
+    print(concurrent.transport.stats.report())
+
+
+def benchmark_ranges(args):
+    """Compare per-chapter requests with adaptive Book.N-M range requests"""
+    with StubSefariaServer(args.chapters, args.verses, args.latency,
+                           chapter_latency=args.chapter_latency) as stub:
+        print(f"\n=== Range requests: {args.chapters} chapters, {args.latency * 1000:.0f} ms latency "
+              f"+ {args.chapter_latency * 1000:.0f} ms/chapter, {args.workers} workers, "
+              f"{args.rate:g} req/s ===")
+
+        results = {}
+        for label, range_fetch in (('Per chapter', False), ('Range fetch', True)):
+            downloader = stub.downloader(max_workers=args.workers, requests_per_second=args.rate,
+                                         range_fetch=range_fetch)
+            before = stub.request_count
+            start = time.perf_counter()
+            results[label] = downloader.download_book('Psalms', 'he-en')
+            elapsed = time.perf_counter() - start
+            print(f"{label:<12} {elapsed:8.2f} s  {stub.request_count - before:5d} requests")
+
+        print(f"Final span: {downloader.span_sizer.span} chapters")
+        print(f"Results identical: {results['Per chapter'] == results['Range fetch']}")
+
+
+def benchmark_cache(args):
+    """Compare a cold download with cached, revalidated and offline re-runs"""
+    with StubSefariaServer(args.chapters, args.verses, args.latency) as stub, \
+            tempfile.TemporaryDirectory() as cache_dir:
+        print(f"\n=== Response cache: {args.chapters} chapters, {args.latency * 1000:.0f} ms latency ===")
+
+        # Each run opens the cache afresh, like a new process would
+        runs = [
+            ('Cold cache', {}, False),
+            ('Warm cache', {}, False),
+            ('Revalidate (304)', {'max_age': 0}, False),
+            ('Offline', {}, True),
+        ]
+
+        for label, cache_options, offline in runs:
+            cache = ResponseCache(cache_dir, **cache_options)
+            downloader = stub.downloader(max_workers=args.workers, requests_per_second=args.rate,
+                                         cache=cache, offline=offline)
+            before = stub.request_count
+            start = time.perf_counter()
+            downloader.download_book('Psalms', 'he-en')
+            elapsed = time.perf_counter() - start
+            print(f"{label:<18} {elapsed:8.2f} s  {stub.request_count - before:5d} requests")
+
+
+def benchmark_async(args):
+    """Compare the thread pool with the asyncio backend on a multi-book refresh"""
+    from async_downloader import AsyncCleanBibleDownloader
+
+    with StubSefariaServer(args.chapters, args.verses, args.latency) as stub:
+        index = stub.downloader().chapter_index
+        books = list(index.books)[:args.books]
+
+        threaded = stub.downloader(max_workers=args.workers, requests_per_second=0)
+        start = time.perf_counter()
+        expected = {book_name: threaded.download_book(book_name, 'he-en') for book_name in books}
+        threaded_time = time.perf_counter() - start
+
+        async def refresh():
+            async with AsyncCleanBibleDownloader(max_concurrency=args.concurrency, requests_per_second=0,
+                                                 base_url=stub.base_url, chapter_index=index) as downloader:
+                results = await downloader.download_books(books, 'he-en')
+                return results, downloader.stats
+
+        start = time.perf_counter()
+        results, stats = asyncio.run(refresh())
+        async_time = time.perf_counter() - start
+
+    total = len(books) * args.chapters
+    print(f"\n=== {len(books)} books x {args.chapters} chapters, {args.latency * 1000:.0f} ms latency ===")
+    print(f"Thread pool ({args.workers} workers, book by book): {threaded_time:8.2f} s "
+          f"({total / threaded_time:,.0f} chapters/s)")
+    print(f"asyncio ({args.concurrency} in flight, all books): {async_time:8.2f} s "
+          f"({total / async_time:,.0f} chapters/s)")
+    print(f"Results identical: {results == expected}")
+    print(stats.report())
+
+
+def legacy_clean(text: str) -> str:
+    """The original clean_hebrew_text / clean_english_text body"""
+    clean = re.sub(r'<[^>]*>', '', text)
+    clean = ' '.join(clean.split())
+    return clean.strip()
+
+
+def benchmark_clean(args):
+    """Compare the per-verse regex cleaners with the batch text_cleaner API"""
+    # Roughly one verse in four carries a footnote or marker in real Sefaria data
+    pattern = [SAMPLE_ENGLISH, PLAIN_ENGLISH, PLAIN_ENGLISH, PLAIN_ENGLISH,
+               SAMPLE_HEBREW, PLAIN_HEBREW, PLAIN_HEBREW, SAMPLE_HEBREW]
+    verses = (pattern * (2 * TANAKH_VERSES // len(pattern) + 1))[:2 * TANAKH_VERSES]
+
+    print(f"\n=== Text cleaning: {len(verses)} verses (Hebrew + English Tanakh) ===")
+
+    timings = {}
+    cleaners = (
+        ('Legacy re.sub per verse', lambda lines: [legacy_clean(line) for line in lines]),
+        ('Legacy + html.unescape', lambda lines: [legacy_clean(html.unescape(line)) for line in lines]),
+        ('text_cleaner.clean_lines', clean_lines),
+    )
+
+    for label, clean in cleaners:
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            clean(verses)
+            best = min(best, time.perf_counter() - start)
+        print(f"{label:<26} {best * 1000:8.1f} ms  ({len(verses) / best:,.0f} verses/s)")
+
+    print("Legacy output keeps footnote bodies, markers and raw entities:")
+    print(f"  legacy: {legacy_clean(SAMPLE_ENGLISH)}")
+    print(f"  new:    {clean_lines([SAMPLE_ENGLISH])[0]}")
+
+
+def synthetic_tanakh(verses_per_chapter: int = 25) -> list:
+    """Cleaned full-Tanakh-sized corpus: every book and chapter, sample verses"""
+    hebrew = clean_lines([SAMPLE_HEBREW, PLAIN_HEBREW])
+    english = clean_lines([SAMPLE_ENGLISH, PLAIN_ENGLISH])
+    index = load_chapter_index()
+    books = []
+    for book_name in index.books:
+        chapters = []
+        for chapter in range(1, index.chapter_count(book_name) + 1):
+            chapters.append({
+                'hebrew': [hebrew[v % 2] for v in range(verses_per_chapter)],
+                'english': [f"{book_name} {chapter}:{v + 1} {english[v % 2]}"
+                            for v in range(verses_per_chapter)],
+            })
+        books.append((book_name, chapters))
+    return books
+
+
+def benchmark_gematria(args):
+    """Full-Tanakh-sized gematria: encoding plus word/verse/chapter/book sums"""
+    from gematria import GematriaCorpus
+
+    books = synthetic_tanakh(args.verses)
+    verses = [(book_name, chapter, verse, f"{hebrew} {hebrew}")
+              for book_name, chapters in books
+              for chapter, data in enumerate(chapters, 1)
+              for verse, hebrew in enumerate(data['hebrew'], 1)]
+
+    start = time.perf_counter()
+    corpus = GematriaCorpus.from_verses(verses)
+    encode_time = time.perf_counter() - start
+
+    print(f"\n=== Gematria: {len(verses)} verses, {len(corpus.word_starts):,} words, "
+          f"{len(corpus.letters):,} letters ===")
+    print(f"Encode corpus:           {encode_time * 1000:8.1f} ms")
+
+    for scheme in ('standard', 'ordinal', 'reduced'):
+        start = time.perf_counter()
+        corpus.word_sums(scheme)
+        corpus.verse_sums(scheme)
+        corpus.chapter_sums(scheme)
+        corpus.book_sums(scheme)
+        print(f"{scheme + ' sums:':<24} {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+
+def benchmark_els(args):
+    """ELS search: full-stream strided comparison per skip vs anchored position slices"""
+    import numpy as np
+    from els import ELSIndex, term_codes, search_skips
+    from gematria import LETTERS
+
+    # Random consonants at Tanakh scale (about 1.2M letters); real text is
+    # just as costly to scan but its hit counts depend on the term
+    rng = np.random.default_rng(0)
+    letters = np.array(list(LETTERS))
+    verses = [('Genesis', 1 + v // 30, 1 + v % 30, ''.join(rng.choice(letters, size=args.letters_per_verse)))
+              for v in range(TANAKH_VERSES)]
+    start = time.perf_counter()
+    index = ELSIndex.from_verses(verses)
+    build_time = time.perf_counter() - start
+
+    print(f"\n=== ELS: {len(index):,} letters, skips ±{args.min_skip}..{args.max_skip} ===")
+    print(f"Build letter index:       {build_time * 1000:8.1f} ms")
+
+    skips = np.arange(args.min_skip, args.max_skip + 1)
+    skips = np.concatenate((skips, -skips))
+    for term in args.terms:
+        codes = term_codes(term)
+        k = len(codes)
+
+        # Baseline: compare the whole stream against every letter at each skip
+        start = time.perf_counter()
+        baseline = 0
+        for skip in skips.tolist():
+            span = (k - 1) * abs(skip)
+            if span >= len(index):
+                continue
+            first = 0 if skip > 0 else span
+            n = len(index) - span
+            match = np.ones(n, dtype=bool)
+            for i, code in enumerate(codes.tolist()):
+                offset = first + i * skip
+                match &= index.letters[offset:offset + n] == code
+            baseline += int(match.sum())
+        baseline_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        hits = search_skips(index.letters, index.positions, codes, skips)
+        anchored_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        pooled = index.search(term, args.min_skip, args.max_skip, workers=args.workers)
+        pool_time = time.perf_counter() - start
+
+        assert baseline == len(hits) == len(pooled)
+        print(f"{term} ({len(hits)} hits)")
+        print(f"  strided scan per skip:  {baseline_time * 1000:8.1f} ms")
+        print(f"  anchored slices:        {anchored_time * 1000:8.1f} ms")
+        print(f"  ELSIndex.search, {args.workers} worker(s), with refs: {pool_time * 1000:8.1f} ms")
+
+
+def benchmark_significance(args):
+    """Shuffle-test throughput: Python list shuffles vs vectorized NumPy controls"""
+    import numpy as np
+    from gematria import LETTERS, GematriaCorpus
+    from significance import CONTROLS, ShuffleTest, WordValueCount
+
+    rng = np.random.default_rng(0)
+    letters = np.array(list(LETTERS))
+    verses = [('Genesis', 1 + v // 30, 1 + v % 30,
+               ' '.join(''.join(rng.choice(letters, size=4)) for _ in range(13)))
+              for v in range(TANAKH_VERSES)]
+    corpus = GematriaCorpus.from_verses(verses)
+    statistic = WordValueCount(26)
+    print(f"\n=== Shuffle tests: {len(corpus.letters):,} letters, {args.shuffles} shuffles, "
+          f"statistic {type(statistic).__name__} ===")
+
+    # Baseline: random.shuffle on a Python list, converted back for the statistic
+    sample = min(args.shuffles, 10)
+    stream = corpus.letters.tolist()
+    start = time.perf_counter()
+    for _ in range(sample):
+        random.shuffle(stream)
+        statistic(np.array(stream, dtype=np.uint8), corpus)
+    elapsed = time.perf_counter() - start
+    print(f"{'random.shuffle (list)':<28} {sample / elapsed:8.1f} shuffles/s")
+
+    for control in CONTROLS:
+        for workers in sorted({1, args.workers}):
+            result = ShuffleTest(corpus, statistic, control).run(args.shuffles, workers=workers)
+            print(f"{control + f', {workers} worker(s)':<28} {result['shuffles_per_second']:8.1f} shuffles/s"
+                  f"  p={result['p_value']:.3f}")
+
+
+def benchmark_frequency(args):
+    """Letter, bigram and word counts: Python Counters vs bincount per book"""
+    import collections
+    import numpy as np
+    from frequency_analysis import FrequencyAnalyzer
+    from gematria import LETTERS, GematriaCorpus
+
+    rng = np.random.default_rng(0)
+    letters = np.array(list(LETTERS))
+    verses = [('Genesis', 1 + v // 30, 1 + v % 30,
+               ' '.join(''.join(rng.choice(letters, size=rng.integers(2, 7))) for _ in range(12)))
+              for v in range(TANAKH_VERSES)]
+    corpus = GematriaCorpus.from_verses(verses)
+
+    # Baseline: per-character loops over the verse strings
+    start = time.perf_counter()
+    letter_counts, bigrams, words = collections.Counter(), collections.Counter(), collections.Counter()
+    for _, _, _, text in verses:
+        for word in text.split():
+            words[word] += 1
+            letter_counts.update(word)
+            bigrams.update(word[i:i + 2] for i in range(len(word) - 1))
+    counter_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    analyzer = FrequencyAnalyzer(corpus, ngram_sizes=(2,))
+    result = analyzer.book('Genesis')
+    vector_time = time.perf_counter() - start
+    assert dict(result.words) == dict(words)
+
+    start = time.perf_counter()
+    analyzer.book('Genesis')
+    cached_time = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        analyzer.export(tmp)
+        export_time = time.perf_counter() - start
+        size = os.path.getsize(os.path.join(tmp, 'Genesis.json'))
+
+    print(f"\n=== Frequencies: {len(corpus.letters):,} letters, {len(corpus.word_starts):,} words ===")
+    print(f"Counter loops (letters, bigrams, words):       {counter_time * 1000:8.1f} ms")
+    print(f"bincount (+ per-verse and per-chapter tables): {vector_time * 1000:8.1f} ms")
+    print(f"Cached book result:                            {cached_time * 1e6:8.1f} us")
+    print(f"Columnar JSON export ({size / 1024 / 1024:.1f} MiB):            {export_time * 1000:8.1f} ms")
+
+
+def benchmark_value_index(args):
+    """Words and verses with a gematria value: full scan vs sorted reverse index"""
+    import numpy as np
+    from gematria import LETTERS, GematriaCorpus
+    from gematria_index import GematriaIndex
+
+    rng = np.random.default_rng(0)
+    letters = np.array(list(LETTERS))
+    verses = [('Genesis', 1 + v // 30, 1 + v % 30,
+               ' '.join(''.join(rng.choice(letters, size=rng.integers(2, 7))) for _ in range(12)))
+              for v in range(TANAKH_VERSES)]
+    corpus = GematriaCorpus.from_verses(verses)
+    values = rng.integers(2, 1500, size=args.lookups).tolist()
+
+    # Baseline: recompute word sums and scan them for every lookup
+    start = time.perf_counter()
+    for value in values:
+        matches = np.flatnonzero(corpus.word_sums() == value)
+        scan_words = {corpus.word(i) for i in matches[:200].tolist()}
+    scan_time = (time.perf_counter() - start) / len(values)
+
+    start = time.perf_counter()
+    index = GematriaIndex.build(corpus)
+    build_time = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'gematria.npz')
+        index.save(path)
+        size = os.path.getsize(path)
+        start = time.perf_counter()
+        index = GematriaIndex.load(path)
+        load_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for value in values:
+        index_words = index.words(value)
+    lookup_time = (time.perf_counter() - start) / len(values)
+    assert {word for word, _ in index_words} >= scan_words
+
+    start = time.perf_counter()
+    for value in values:
+        index.lookup(value)
+    summary_time = (time.perf_counter() - start) / len(values)
+
+    print(f"\n=== Gematria value index: {len(corpus.word_starts):,} words, {len(index.vocab):,} distinct ===")
+    print(f"Scan word sums per lookup:             {scan_time * 1e6:10.1f} us")
+    print(f"Build index:                           {build_time * 1000:10.1f} ms")
+    print(f"Load .npz ({size / 1024 / 1024:.1f} MiB):                 {load_time * 1000:10.1f} ms")
+    print(f"Distinct words for a value:            {lookup_time * 1e6:10.1f} us")
+    print(f"Full lookup (words, refs, verses):     {summary_time * 1e6:10.1f} us")
+
+
+def benchmark_api(args):
+    """API server: cold vs repeated chapter views, and SSE progress latency"""
+    import http.client
+    from api_server import ApiServer, BibleApi
+
+    def get(port, path, headers=None):
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        start = time.perf_counter()
+        conn.request('GET', path, headers=headers or {})
+        response = conn.getresponse()
+        response.read()
+        elapsed = time.perf_counter() - start
+        conn.close()
+        return response, elapsed
+
+    with StubSefariaServer(chapters=args.chapters, verses=args.verses, latency=args.latency) as stub, \
+            tempfile.TemporaryDirectory() as tmp:
+        api = BibleApi(stub.downloader(requests_per_second=0), tmp)
+        server = ApiServer(('127.0.0.1', 0), api)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_address[1]
+
+        cold = [get(port, f'/api/text/Genesis/{c}')[1] for c in range(1, args.chapters + 1)]
+        warm = [get(port, f'/api/text/Genesis/{c}')[1] for c in range(1, args.chapters + 1)]
+        response, _ = get(port, '/api/text/Genesis/1')
+        etag = response.getheader('ETag')
+        revalidated = [get(port, '/api/text/Genesis/1', {'If-None-Match': etag})[1] for _ in range(50)]
+
+        # Time from a job change to the event reaching a connected client
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        conn.request('GET', '/api/events')
+        events = conn.getresponse()
+        events.readline(), events.readline(), events.readline()    # initial snapshot
+        latencies = []
+        for _ in range(20):
+            start = time.perf_counter()
+            api.jobs.notify()
+            while not events.readline().startswith(b'data:'):
+                pass
+            latencies.append(time.perf_counter() - start)
+        conn.close()
+
+        server.shutdown()
+        server.server_close()
+
+    ms = lambda values: sum(values) / len(values) * 1000
+    print(f"\n=== API server: {args.chapters} chapters, {args.latency * 1000:.0f} ms upstream latency ===")
+    print(f"First chapter view (upstream fetch): {ms(cold):8.2f} ms")
+    print(f"Repeated view (response LRU):        {ms(warm):8.2f} ms")
+    print(f"Repeated view, 304 Not Modified:     {ms(revalidated):8.2f} ms")
+    print(f"SSE progress push latency:           {ms(latencies):8.2f} ms (polling every 30 s: 15000 ms mean)")
+
+
+def benchmark_verses(args):
+    """Memory and lookup cost of VerseTable vs per-verse objects at full-corpus scale"""
+    books = synthetic_tanakh(args.verses)
+    total = sum(len(chapters) for _, chapters in books) * args.verses
+
+    def measure(build):
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = build()
+        elapsed = time.perf_counter() - start
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return result, elapsed, size
+
+    def build_table():
+        table = VerseTable()
+        for book_name, chapters in books:
+            for chapter, data in enumerate(chapters, 1):
+                table.add_chapter(book_name, chapter, data['hebrew'], data['english'])
+        return table
+
+    def build_records():
+        # One object per verse plus a dict keyed by reference
+        records, hebrew, english = {}, [], []
+        for book_id, (book_name, chapters) in enumerate(books):
+            for chapter, data in enumerate(chapters, 1):
+                for verse in range(len(data['hebrew'])):
+                    records[(book_name, chapter, verse + 1)] = VerseRecord(
+                        book_id, chapter, verse + 1, len(hebrew), len(english))
+                    hebrew.append(data['hebrew'][verse])
+                    english.append(data['english'][verse])
+        return records
+
+    table, table_time, table_size = measure(build_table)
+    records, records_time, records_size = measure(build_records)
+
+    refs = [table.ref(random.randrange(len(table))) for _ in range(100000)]
+    start = time.perf_counter()
+    for book_name, chapter, verse in refs:
+        table.get(book_name, chapter, verse)
+    lookup_time = (time.perf_counter() - start) / len(refs)
+
+    # Text strings are shared with the source lists, so sizes are overhead only
+    print(f"\n=== Verse model: {total} verses ===")
+    print(f"VerseTable columns:      {table_size / total:6.1f} bytes/verse, built in {table_time * 1000:6.1f} ms")
+    print(f"VerseRecord per verse:   {records_size / total:6.1f} bytes/verse, built in {records_time * 1000:6.1f} ms")
+    print(f"VerseTable.get:          {lookup_time * 1e6:6.2f} us")
+
+
+def benchmark_sync(args):
+    """Whole-corpus refresh: full re-download vs conditional incremental sync"""
+    from bulk_downloader import BulkDownloader
+
+    with StubSefariaServer(args.chapters, args.verses, args.latency) as stub, \
+            tempfile.TemporaryDirectory() as tmp:
+        stub.send_etags = args.etags
+
+        def pipeline():
+            downloader = stub.downloader(max_workers=args.workers, requests_per_second=args.rate)
+            return BulkDownloader(downloader, tmp, search_index=True)
+
+        start = time.perf_counter()
+        pipeline().run()
+        full_time = time.perf_counter() - start
+
+        timings = []
+        for label, revised in (('First sync (no validators yet)', set()),
+                               ('Sync, nothing changed', set()),
+                               ('Sync, 2 chapters per book revised', {1, 2})):
+            stub.revised_chapters = revised
+            requests_before = stub.request_count
+            stats = pipeline().sync()
+            timings.append((label, stats['elapsed'], stub.request_count - requests_before,
+                            len(stats['changed'])))
+
+    print(f"\n=== Sync: {len(load_chapter_index().books)} books x {args.chapters} chapters, "
+          f"{args.latency * 1000:.0f} ms latency, {args.rate:g} req/s ===")
+    print(f"{'Full download':36s} {full_time:7.2f} s")
+    for label, elapsed, requests, changed in timings:
+        print(f"{label:36s} {elapsed:7.2f} s  {requests:5d} requests  {changed:5d} chapters rewritten")
+
+
+def benchmark_search(args):
+    """Inverted index build, size, query latency and incremental update cost"""
+    from search_index import SearchIndex
+
+    books = synthetic_tanakh(args.verses)
+    index = SearchIndex()
+    start = time.perf_counter()
+    for book_name, chapters in books:
+        for chapter, data in enumerate(chapters, 1):
+            index.add_chapter(book_name, chapter, data['hebrew'], data['english'])
+    build_time = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'search_index.bin')
+        index.save(path)
+        size = os.path.getsize(path)
+        start = time.perf_counter()
+        index = SearchIndex.load(path)
+        load_time = time.perf_counter() - start
+
+    print(f"\n=== Search index: {len(index)} verses, {len(index.postings)} terms, "
+          f"{size / 1024 / 1024:.1f} MiB on disk ===")
+    print(f"Build:  {build_time * 1000:8.1f} ms")
+    print(f"Load:   {load_time * 1000:8.1f} ms")
+
+    queries = [
+        ('term (rare)', 'term', 'obadiah'),
+        ('term (Hebrew)', 'term', 'אֱלֹהִ֖ים'),
+        ('phrase (rare)', 'phrase', 'lamentations 3'),
+        ('prefix (rare)', 'prefix', 'lament'),
+        ('search (mixed)', 'search', '"ruth 2" light'),
+        ('term (every verse)', 'term', 'god'),
+    ]
+    for label, method, query in queries:
+        # First call decodes the posting lists; repeats hit the decoded cache
+        search = getattr(index, method)
+        start = time.perf_counter()
+        hits = search(query)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            search(query)
+        warm = (time.perf_counter() - start) / args.repeat
+        print(f"{label:<20} {len(hits):6d} hits  cold {cold * 1000:7.3f} ms  warm {warm * 1000:7.3f} ms")
+
+    book_name, chapters = books[0]
+    start = time.perf_counter()
+    index.add_chapter(book_name, 1, chapters[0]['hebrew'], chapters[0]['english'])
+    print(f"Re-index one chapter: {(time.perf_counter() - start) * 1000:6.2f} ms "
+          f"({len(index.deleted)} verses tombstoned)")
+
+
+def benchmark_corpus(args):
+    """Compare re-parsing .txt outputs with the memory-mapped corpus file"""
+    books = synthetic_tanakh(args.verses)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for book_name, chapters in books:
+            for chapter, data in enumerate(chapters, 1):
+                save_clean_text(data, work_dir, f"{book_name}_chapter_{chapter}")
+
+        corpus_path = os.path.join(work_dir, 'tanakh.bibc')
+        start = time.perf_counter()
+        convert_text_outputs(work_dir, corpus_path)
+        convert_time = time.perf_counter() - start
+
+        # Baseline: what any analysis had to do before, re-reading every text file
+        start = time.perf_counter()
+        text = {}
+        for name in os.listdir(work_dir):
+            if name.endswith('_hebrew_clean.txt'):
+                with open(os.path.join(work_dir, name), encoding='utf-8') as f:
+                    text[name] = f.read().split('\n')[3:]
+        parse_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        corpus = CorpusReader(corpus_path)
+        open_time = time.perf_counter() - start
+
+        refs = [(book_name, random.randint(1, len(chapters)), random.randint(1, args.verses))
+                for book_name, chapters in books for _ in range(100)]
+        start = time.perf_counter()
+        for ref in refs:
+            corpus.verse(*ref)
+        lookup_time = (time.perf_counter() - start) / len(refs)
+
+        size = os.path.getsize(corpus_path)
+        corpus.close()
+
+    total = sum(len(chapters) for _, chapters in books) * args.verses
+    print(f"\n=== Corpus file: {total} verses ({size / 1024 / 1024:.1f} MiB) ===")
+    print(f"Convert .txt outputs to corpus: {convert_time * 1000:8.1f} ms")
+    print(f"Re-read all Hebrew .txt files: {parse_time * 1000:8.1f} ms")
+    print(f"Open corpus with mmap:         {open_time * 1000:8.2f} ms")
+    print(f"Random verse lookup:           {lookup_time * 1e6:8.2f} us")
+
+
+def benchmark_versions(args):
+    """Several versions of the same chapters: one job per version vs shared batched requests"""
+    import contextlib
+    import io
+    from pathlib import Path
+    from bible_cli import BatchRunner, build_jobs
+    from clean_bible_downloader import batch_versions
+    from sqlite_store import SQLiteStore
+
+    versions = ['he', 'en', 'he-en', 'he:Miqra according to the Masorah',
+                'en:The Koren Jerusalem Bible', 'en:The Holy Scriptures']
+    refs = [f"{book_name}:1-{args.chapters}" for book_name in ('Genesis', 'Exodus', 'Psalms')]
+
+    with StubSefariaServer(args.chapters, args.verses, args.latency) as stub, \
+            tempfile.TemporaryDirectory() as tmp:
+        def run(run_versions, db_name):
+            downloader = stub.downloader(max_workers=args.workers, requests_per_second=args.rate)
+            with SQLiteStore(os.path.join(tmp, db_name)) as store:
+                jobs = build_jobs(downloader, refs, run_versions, Path(tmp), store)
+                requests_before = stub.request_count
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    BatchRunner(downloader, jobs, args.workers, progress=io.StringIO()).run()
+                return time.perf_counter() - start, stub.request_count - requests_before
+
+        # Baseline: every version is its own job, so every version is its own request
+        separate = [run([version], 'separate.db') for version in versions]
+        separate_time = sum(elapsed for elapsed, _ in separate)
+        separate_requests = sum(requests for _, requests in separate)
+        shared_time, shared_requests = run(versions, 'shared.db')
+
+        with SQLiteStore(os.path.join(tmp, 'shared.db')) as store:
+            koren = store.verse('Psalms', 1, 1, 'english', 'en:The Koren Jerusalem Bible')
+            default = store.verse('Psalms', 1, 1, 'english', 'en')
+
+    chapters = len(refs) * args.chapters
+    print(f"\n=== {len(versions)} versions x {chapters} chapters, {args.latency * 1000:.0f} ms latency, "
+          f"{args.workers} workers ===")
+    print(f"Requests per chapter: {', '.join(batch_versions(versions))}")
+    print(f"One job per version:   {separate_time:7.2f} s  {separate_requests:5d} requests")
+    print(f"Shared batch requests: {shared_time:7.2f} s  {shared_requests:5d} requests")
+    print(f"Stored side by side: {koren[:40]!r} / {default[:40]!r}")
+
+
+def benchmark_store(args):
+    """Text files vs SQLite ingest, and verse lookups and FTS queries against the database"""
+    from sqlite_store import SQLiteStore
+
+    books = synthetic_tanakh(args.verses)
+    total = sum(len(chapters) for _, chapters in books) * args.verses
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        start = time.perf_counter()
+        for book_name, chapters in books:
+            for chapter, data in enumerate(chapters, 1):
+                save_clean_text(data, work_dir, f"{book_name}_chapter_{chapter}")
+        text_time = time.perf_counter() - start
+
+        # Baseline: one transaction per chapter
+        with SQLiteStore(os.path.join(work_dir, 'per_chapter.db')) as store:
+            start = time.perf_counter()
+            for book_name, chapters in books:
+                for chapter, data in enumerate(chapters, 1):
+                    store.write_chapters(book_name, 'he-en', [(chapter, data['hebrew'], data['english'])])
+            chapter_time = time.perf_counter() - start
+
+        path = os.path.join(work_dir, 'tanakh.db')
+        with SQLiteStore(path) as store:
+            start = time.perf_counter()
+            for book_name, chapters in books:
+                store.write_chapters(book_name, 'he-en', [(chapter, data['hebrew'], data['english'])
+                                                         for chapter, data in enumerate(chapters, 1)])
+            book_time = time.perf_counter() - start
+            store.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            size = os.path.getsize(path)
+
+            refs = [(book_name, random.randint(1, len(chapters)), random.randint(1, args.verses))
+                    for book_name, chapters in books for _ in range(20)]
+            start = time.perf_counter()
+            for ref in refs:
+                store.verse(*ref)
+            lookup_time = (time.perf_counter() - start) / len(refs)
+
+            print(f"\n=== SQLite store: {total} verses ({size / 1024 / 1024:.1f} MiB) ===")
+            print(f"save_clean_text per chapter:      {text_time * 1000:8.1f} ms")
+            print(f"SQLite, transaction per chapter:  {chapter_time * 1000:8.1f} ms")
+            print(f"SQLite, transaction per book:     {book_time * 1000:8.1f} ms")
+            print(f"Random verse lookup:              {lookup_time * 1e6:8.1f} us")
+
+            queries = [
+                ('search (rare)', 'obadiah'),
+                ('search (Hebrew)', 'אֱלֹהִ֖ים'),
+                ('phrase (rare)', '"lamentations 3"'),
+                ('prefix (rare)', 'lament*'),
+                ('search (mixed)', '"ruth 2" light'),
+            ]
+            for label, query in queries:
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    hits = store.search(query)
+                elapsed = (time.perf_counter() - start) / args.repeat
+                print(f"{label:<20} {len(hits):6d} hits  {elapsed * 1000:8.3f} ms")
+
+        # What a search cost before: re-reading and scanning every English file
+        start = time.perf_counter()
+        hits = 0
+        for name in os.listdir(work_dir):
+            if name.endswith('_english_clean.txt'):
+                with open(os.path.join(work_dir, name), encoding='utf-8') as f:
+                    hits += sum('obadiah' in line.lower() for line in f.read().split('\n')[3:])
+        print(f"{'scan .txt (rare)':<20} {hits:6d} hits  {(time.perf_counter() - start) * 1000:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    download = subparsers.add_parser('download', help='serial vs concurrent download_book')
+    download.add_argument('--chapters', type=int, default=150)
+    download.add_argument('--verses', type=int, default=20)
+    download.add_argument('--latency', type=float, default=0.05)
+    download.add_argument('--workers', type=int, default=8)
+    download.add_argument('--rate', type=float, default=50.0)
+    download.add_argument('--fail-every', type=int, default=0)
+    download.set_defaults(func=benchmark_download)
+
+    ranges = subparsers.add_parser('ranges', help='per-chapter vs range requests')
+    ranges.add_argument('--chapters', type=int, default=150)
+    ranges.add_argument('--verses', type=int, default=20)
+    ranges.add_argument('--latency', type=float, default=0.05)
+    ranges.add_argument('--chapter-latency', type=float, default=0.002)
+    ranges.add_argument('--workers', type=int, default=4)
+    ranges.add_argument('--rate', type=float, default=4.0)
+    ranges.set_defaults(func=benchmark_ranges)
+
+    cache = subparsers.add_parser('cache', help='cold vs cached download_book')
+    cache.add_argument('--chapters', type=int, default=150)
+    cache.add_argument('--verses', type=int, default=20)
+    cache.add_argument('--latency', type=float, default=0.05)
+    cache.add_argument('--workers', type=int, default=8)
+    cache.add_argument('--rate', type=float, default=50.0)
+    cache.set_defaults(func=benchmark_cache)
+
+    async_run = subparsers.add_parser('async', help='thread pool vs asyncio multi-book refresh')
+    async_run.add_argument('--books', type=int, default=10)
+    async_run.add_argument('--chapters', type=int, default=30)
+    async_run.add_argument('--verses', type=int, default=20)
+    async_run.add_argument('--latency', type=float, default=0.1)
+    async_run.add_argument('--workers', type=int, default=8)
+    async_run.add_argument('--concurrency', type=int, default=200)
+    async_run.set_defaults(func=benchmark_async)
+
+    gematria_run = subparsers.add_parser('gematria', help='full-corpus gematria sums')
+    gematria_run.add_argument('--verses', type=int, default=25)
+    gematria_run.set_defaults(func=benchmark_gematria)
+
+    els_run = subparsers.add_parser('els', help='equidistant letter sequence search')
+    els_run.add_argument('--letters-per-verse', type=int, default=52)
+    els_run.add_argument('--min-skip', type=int, default=1)
+    els_run.add_argument('--max-skip', type=int, default=1000)
+    els_run.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    els_run.add_argument('--terms', nargs='+', default=['תורה', 'ישראל'])
+    els_run.set_defaults(func=benchmark_els)
+
+    significance_run = subparsers.add_parser('significance', help='Monte Carlo shuffle throughput')
+    significance_run.add_argument('--shuffles', type=int, default=200)
+    significance_run.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    significance_run.set_defaults(func=benchmark_significance)
+
+    frequency = subparsers.add_parser('frequency', help='letter, n-gram and word counts')
+    frequency.set_defaults(func=benchmark_frequency)
+
+    value_index = subparsers.add_parser('value-index', help='gematria value reverse index lookups')
+    value_index.add_argument('--lookups', type=int, default=200)
+    value_index.set_defaults(func=benchmark_value_index)
+
+    api = subparsers.add_parser('api', help='API server chapter views and SSE latency')
+    api.add_argument('--chapters', type=int, default=20)
+    api.add_argument('--verses', type=int, default=25)
+    api.add_argument('--latency', type=float, default=0.05)
+    api.set_defaults(func=benchmark_api)
+
+    verses = subparsers.add_parser('verses', help='VerseTable memory and lookups')
+    verses.add_argument('--verses', type=int, default=25)
+    verses.set_defaults(func=benchmark_verses)
+
+    sync = subparsers.add_parser('sync', help='full re-download vs incremental sync')
+    sync.add_argument('--chapters', type=int, default=24)
+    sync.add_argument('--verses', type=int, default=25)
+    sync.add_argument('--latency', type=float, default=0.05)
+    sync.add_argument('--workers', type=int, default=8)
+    sync.add_argument('--rate', type=float, default=20.0)
+    sync.add_argument('--etags', action='store_true', help='serve ETags (Sefaria does not)')
+    sync.set_defaults(func=benchmark_sync)
+
+    versions_run = subparsers.add_parser('versions', help='multi-version downloads with shared requests')
+    versions_run.add_argument('--chapters', type=int, default=20)
+    versions_run.add_argument('--verses', type=int, default=25)
+    versions_run.add_argument('--latency', type=float, default=0.05)
+    versions_run.add_argument('--workers', type=int, default=8)
+    versions_run.add_argument('--rate', type=float, default=0.0)
+    versions_run.set_defaults(func=benchmark_versions)
+
+    search = subparsers.add_parser('search', help='inverted index build and queries')
+    search.add_argument('--verses', type=int, default=25)
+    search.add_argument('--repeat', type=int, default=100)
+    search.set_defaults(func=benchmark_search)
+
+    store = subparsers.add_parser('store', help='text files vs SQLite ingest and FTS queries')
+    store.add_argument('--verses', type=int, default=25)
+    store.add_argument('--repeat', type=int, default=20)
+    store.set_defaults(func=benchmark_store)
+
+    corpus = subparsers.add_parser('corpus', help='text files vs memory-mapped corpus')
+    corpus.add_argument('--verses', type=int, default=25)
+    corpus.set_defaults(func=benchmark_corpus)
+
+    clean = subparsers.add_parser('clean', help='legacy vs single-pass text cleaning')
+    clean.add_argument('--repeat', type=int, default=5)
+    clean.set_defaults(func=benchmark_clean)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Bible Downloader - Headless Command Line Version
+
+Download books or chapter ranges from Sefaria without a display:
+
+    bible-downloader Genesis "Psalms:1-10,23" --version he-en --workers 8
+    bible-downloader all --version he --version en --output tanakh
+    bible-downloader Ruth -v he-en -v "en:The Koren Jerusalem Bible" -v "en:The Holy Scriptures"
+
+Every requested (book, chapter) is one task in a single parallel batch
+sharing the downloader's thread pool, rate limiter and cache. A task
+fetches the chapter for all requested versions, including named Sefaria
+versions ('he:<title>', 'en:<title>'), with the fewest requests: one per
+Hebrew/English pair of distinct texts (see batch_versions). With
+--range-fetch a task is instead a span of consecutive chapters fetched
+with one Book.N-M request per version batch.
+
+Whole books are streamed to <Book>_complete_*_clean.txt in chapter order;
+chapter selections are saved as <Book>_chapter_<n>_*_clean.txt, in one
+directory per version when there are several. With --db every job is
+stored in a SQLite database instead (see sqlite_store), one transaction
+per book and version, with versions side by side under their names.
+Progress is written to stdout as JSON lines; log messages go to stderr.
+tkinter is never imported.
+"""
+
+import argparse
+import contextlib
+import json
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, TextIO, Tuple
+
+from clean_bible_downloader import (BIBLE_BOOKS, VERSIONS, CancelToken, CleanBibleDownloader,
+                                    DownloadCancelled, version_dirname, version_parts)
+from response_cache import ResponseCache
+from text_writers import StreamingBookWriter, save_clean_text
+
+if TYPE_CHECKING:
+    from sqlite_store import SQLiteStore
+
+def resolve_book(name: str) -> str:
+    """Sefaria book name for a display name or BIBLE_BOOKS key, case-insensitively"""
+    wanted = name.strip().lower().replace('_', ' ')
+    for key, book_name in BIBLE_BOOKS.items():
+        if wanted in (key.replace('_', ' '), book_name.lower()):
+            return book_name
+    raise ValueError(f"unknown book '{name}'")
+
+def parse_chapters(spec: str, chapter_count: int) -> List[int]:
+    """Chapters in a '1-5,8,10-' style selection, in order and without duplicates"""
+    chapters = []
+    for part in spec.split(','):
+        first, dash, last = part.strip().partition('-')
+        try:
+            start = int(first) if first else 1
+            end = (int(last) if last else chapter_count) if dash else start
+        except ValueError:
+            raise ValueError(f"bad chapter selection '{part}'") from None
+
+        if not 1 <= start <= end <= chapter_count:
+            raise ValueError(f"chapters {part} out of range 1-{chapter_count}")
+        chapters.extend(range(start, end + 1))
+
+    return list(dict.fromkeys(chapters))
+
+class BatchJob:
+    """One book (or chapter selection of a book) in one version"""
+
+    def __init__(self, book_name: str, chapters: List[int], version: str, output_dir: Path,
+                 whole_book: bool, store: Optional['SQLiteStore'] = None):
+        self.book_name = book_name
+        self.chapters = chapters
+        self.version = version
+        self.output_dir = output_dir
+        self.whole_book = whole_book
+        self.failed: List[int] = []
+        self.files: List[str] = []
+        self.remaining = len(chapters)
+
+        # Whole books (and any job going to a database) stream in chapter
+        # order; out-of-order results wait here
+        if store is not None:
+            self.writer = store.book_writer(book_name, version)
+        elif whole_book:
+            self.writer = StreamingBookWriter(output_dir, f"{book_name}_complete")
+        else:
+            self.writer = None
+        self._next = 0
+        self._buffer: Dict[int, Dict] = {}
+
+    def add(self, chapter: int, data: Dict):
+        """Record a finished chapter, writing whatever output is now ready"""
+        self.remaining -= 1
+        if 'error' in data:
+            self.failed.append(chapter)
+
+        if self.writer is None:
+            if 'error' not in data:
+                self.files.extend(save_clean_text(data, self.output_dir,
+                                                  f"{self.book_name}_chapter_{chapter}"))
+            return
+
+        self._buffer[chapter] = data
+        while self._next < len(self.chapters) and self.chapters[self._next] in self._buffer:
+            ready = self._buffer.pop(self.chapters[self._next])
+            if 'error' not in ready:
+                self.writer.write_chapter(ready, self.chapters[self._next])
+            self._next += 1
+
+    def finish(self):
+        if self.writer is not None:
+            self.files = self.writer.close()
+
+    def abort(self):
+        if self.writer is not None:
+            self.writer.abort()
+
+class BatchRunner:
+    """Run a list of BatchJobs as one parallel batch, reporting progress as JSON lines"""
+
+    def __init__(self, downloader: CleanBibleDownloader, jobs: List[BatchJob],
+                 workers: int = 4, progress: Optional[TextIO] = None,
+                 token: Optional[CancelToken] = None):
+        self.downloader = downloader
+        self.jobs = jobs
+        self.workers = max(1, workers)
+        self.progress = progress or sys.stdout
+        self.token = token or CancelToken()
+
+    def emit(self, event: str, **fields):
+        self.progress.write(json.dumps({'event': event, **fields}, ensure_ascii=False) + "\n")
+        self.progress.flush()
+
+    def fetch(self, jobs: List[BatchJob], span: List[int]) -> List[Tuple[int, Dict[str, Dict]]]:
+        """(chapter, data of every job's version) for a span of chapters, fetched with shared requests"""
+        self.token.check()
+        versions = [job.version for job in jobs]
+        if len(span) == 1:
+            return [(span[0], self.downloader.download_chapter_versions(jobs[0].book_name, span[0],
+                                                                        versions, self.token))]
+        return self.downloader.download_span_versions(jobs[0].book_name, span[0], span[-1],
+                                                      versions, self.token)
+
+    def groups(self) -> List[List[BatchJob]]:
+        """Jobs for the same book and chapters in different versions, fetched together"""
+        groups: Dict[Tuple[str, Tuple[int, ...]], List[BatchJob]] = {}
+        for job in self.jobs:
+            groups.setdefault((job.book_name, tuple(job.chapters)), []).append(job)
+        return list(groups.values())
+
+    def run(self) -> Dict:
+        """Download every task and return the summary that was emitted last"""
+        # A task is one chapter, or with the downloader's range_fetch a span of chapters
+        tasks = ((jobs, span) for jobs in self.groups()
+                 for span in self.downloader.request_spans(jobs[0].chapters))
+        total = sum(len(job.chapters) for job in self.jobs)
+        done = 0
+        failed = []
+        cancelled = False
+
+        self.emit('start', jobs=len(self.jobs), chapters=total, workers=self.workers)
+        start = time.perf_counter()
+
+        # Bounded window of tasks in flight across all jobs, as in iter_chapters. The
+        # executor is shut down in finally, after a failure has cancelled the queue
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        pending = {}
+        try:
+            pending = {executor.submit(self.fetch, jobs, span): jobs
+                       for jobs, span in islice(tasks, self.workers * 2)}
+
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    jobs = pending.pop(future)
+                    for next_jobs, next_span in islice(tasks, 1):
+                        pending[executor.submit(self.fetch, next_jobs, next_span)] = next_jobs
+
+                    for chapter, results in future.result():
+                        for job in jobs:
+                            data = results[job.version]
+                            job.add(chapter, data)
+                            done += 1
+
+                            elapsed = time.perf_counter() - start
+                            fields = {
+                                'book': job.book_name, 'chapter': chapter, 'version': job.version,
+                                'done': done, 'total': total, 'elapsed': round(elapsed, 3),
+                            }
+                            if 'error' in data:
+                                failed.append(f"{job.book_name}.{chapter}:{job.version}")
+                                fields['error'] = data['error']
+                            else:
+                                fields['verses'] = max(len(data['hebrew']), len(data['english']))
+                            self.emit('chapter', **fields)
+
+                            if job.remaining == 0:
+                                job.finish()
+                                self.emit('job', book=job.book_name, version=job.version,
+                                          chapters=len(job.chapters), failed=job.failed,
+                                          files=job.files)
+        except DownloadCancelled:
+            # Finished chapter files stay; unfinished whole books keep their .part files
+            cancelled = True
+            for job in self.jobs:
+                job.abort()
+        except BaseException:
+            # Queued tasks are dropped and in-flight ones stop at their next check,
+            # so the shutdown below only waits for requests already on the wire
+            self.token.cancel()
+            for future in pending:
+                future.cancel()
+            for job in self.jobs:
+                job.abort()
+            raise
+        finally:
+            executor.shutdown(wait=True)
+            if self.downloader.cache is not None:
+                self.downloader.cache.flush()
+
+        elapsed = time.perf_counter() - start
+        summary = {
+            'chapters': done,
+            'failed': failed,
+            'elapsed': round(elapsed, 3),
+            'chapters_per_second': round(done / elapsed, 2) if elapsed > 0 else 0.0,
+            'cancelled': cancelled,
+            'http': self.downloader.transport.stats.summary(),
+        }
+        self.emit('done', **summary)
+        return summary
+
+def build_jobs(downloader: CleanBibleDownloader, refs: List[str], versions: List[str],
+               output_dir: Path, store: Optional['SQLiteStore'] = None) -> List[BatchJob]:
+    """Expand 'Book' / 'Book:chapters' / 'all' references into one job per version"""
+    versions = list(dict.fromkeys(versions))
+    for version in versions:
+        version_parts(version)
+
+    # book -> [whole book requested, selected chapters]. Repeated refs and
+    # overlapping selections collapse, so no two jobs write the same file
+    selections: Dict[str, List] = {}
+    for ref in refs:
+        if ref.strip().lower() == 'all':
+            for book_name in BIBLE_BOOKS.values():
+                selections.setdefault(book_name, [False, []])[0] = True
+            continue
+
+        name, _, spec = ref.partition(':')
+        book_name = resolve_book(name)
+        selection = selections.setdefault(book_name, [False, []])
+        if not spec.strip():
+            selection[0] = True
+            continue
+
+        chapter_count = downloader.get_chapter_count(book_name)
+        if chapter_count == 0:
+            raise ValueError(f"could not determine chapter count for {book_name}")
+        selection[1] = list(dict.fromkeys(selection[1] + parse_chapters(spec, chapter_count)))
+
+    jobs = []
+    for version in versions:
+        # Several versions would write the same file names, so give each its own directory
+        version_dir = output_dir / version_dirname(version) if len(versions) > 1 else output_dir
+        for book_name, (whole_book, chapters) in selections.items():
+            if whole_book:
+                chapter_count = downloader.get_chapter_count(book_name)
+                if chapter_count == 0:
+                    raise ValueError(f"could not determine chapter count for {book_name}")
+                jobs.append(BatchJob(book_name, list(range(1, chapter_count + 1)), version, version_dir,
+                                     whole_book=True, store=store))
+            # A whole book and a chapter selection write different files, but the same database rows
+            if chapters and not (whole_book and store is not None):
+                jobs.append(BatchJob(book_name, chapters, version, version_dir, whole_book=False,
+                                     store=store))
+
+    return jobs
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='bible-downloader', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('refs', nargs='+', metavar='REF',
+                        help="'Book', 'Book:1-5,8' or 'all' (book names or keys like samuel1)")
+    parser.add_argument('-v', '--version', dest='versions', action='append', metavar='VERSION',
+                        help=f"{', '.join(VERSIONS)} or a named Sefaria version 'he:<title>' / "
+                             f"'en:<title>'; may be repeated (default: he-en)")
+    parser.add_argument('-j', '--workers', type=int, default=4, help='parallel downloads (default: 4)')
+    parser.add_argument('--rate', type=float, default=4.0,
+                        help='requests per second, 0 for unlimited (default: 4)')
+    parser.add_argument('-o', '--output', default='clean_downloads', help='output directory')
+    parser.add_argument('--db', help='store text in this SQLite database instead of .txt files')
+    parser.add_argument('--base-url', default='https://www.sefaria.org/api')
+    parser.add_argument('--cache-dir', help='on-disk response cache directory')
+    parser.add_argument('--offline', action='store_true', help='serve from --cache-dir only')
+    parser.add_argument('--range-fetch', action='store_true',
+                        help='fetch consecutive chapters with one Book.N-M request per span')
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.offline and not args.cache_dir:
+        parser.error('--offline requires --cache-dir')
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+
+    cache = ResponseCache(args.cache_dir) if args.cache_dir else None
+    downloader = CleanBibleDownloader(max_workers=args.workers, requests_per_second=args.rate,
+                                      base_url=args.base_url, cache=cache, offline=args.offline,
+                                      range_fetch=args.range_fetch)
+
+    store = None
+    if args.db:
+        # Imported here so runs without --db never load sqlite3
+        from sqlite_store import SQLiteStore
+        store = SQLiteStore(args.db)
+
+    output_dir = Path(args.output)
+    try:
+        jobs = build_jobs(downloader, args.refs, args.versions or ['he-en'], output_dir, store)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if store is None:
+        for job in jobs:
+            job.output_dir.mkdir(parents=True, exist_ok=True)
+
+    # stdout carries only JSON lines; the downloader's own messages go to stderr
+    runner = BatchRunner(downloader, jobs, args.workers, progress=sys.stdout)
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            summary = runner.run()
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        if store is not None:
+            store.close()
+
+    return 1 if summary['failed'] or summary['cancelled'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
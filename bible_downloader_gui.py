@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Clean Bible Downloader GUI
+
+A Tk front end for CleanBibleDownloader: pick a book, version and chapter
+and save the cleaned text. Kept apart from the downloader core so headless
+use never imports tkinter.
+"""
+
+import queue
+import sys
+import threading
+import time
+import tkinter as tk
+from tkinter import ttk, scrolledtext, messagebox, filedialog
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from clean_bible_downloader import CancelToken, CleanBibleDownloader, DownloadCancelled
+from text_writers import StreamingBookWriter, save_clean_text
+
+class BibleDownloaderGUI:
+    """GUI for Bible Downloader"""
+    
+    # How often the main loop drains worker events, and the most it handles per tick
+    POLL_INTERVAL_MS = 100
+    MAX_EVENTS_PER_POLL = 200
+    
+    def __init__(self):
+        self.root = tk.Tk()
+        self.root.title("Clean Bible Downloader - Sefaria")
+        self.root.geometry("800x700")
+        
+        self.downloader = CleanBibleDownloader()
+        
+        # Worker threads never touch Tk; they post events here and the main
+        # loop drains them on an after() timer
+        self.events = queue.Queue()
+        self.progress_start = 0.0
+        self.progress_done = 0
+        self.progress_total = 0
+        
+        # Cancel/pause flag of the running download, if any
+        self.token: Optional[CancelToken] = None
+        
+        self.create_widgets()
+        
+        # Update chapter count when book changes
+        self.book_var.trace('w', self.update_chapter_range)
+        
+        self.root.after(self.POLL_INTERVAL_MS, self.poll_events)
+    
+    def create_widgets(self):
+        """Create GUI widgets"""
+        # Title
+        title_label = tk.Label(self.root, text="Clean Bible Text Downloader", 
+                               font=('Arial', 16, 'bold'))
+        title_label.pack(pady=10)
+        
+        # Main frame
+        main_frame = tk.Frame(self.root)
+        main_frame.pack(fill='both', expand=True, padx=20, pady=10)
+        
+        # Book selection
+        book_frame = tk.LabelFrame(main_frame, text="Book Selection", font=('Arial', 12, 'bold'))
+        book_frame.pack(fill='x', pady=5)
+        
+        tk.Label(book_frame, text="Book:").grid(row=0, column=0, sticky='w', padx=5, pady=5)
+        
+        self.book_var = tk.StringVar(value='Genesis')
+        book_combo = ttk.Combobox(book_frame, textvariable=self.book_var, 
+                                  values=list(self.downloader.bible_books.values()),
+                                  width=30)
+        book_combo.grid(row=0, column=1, padx=5, pady=5, sticky='ew')
+        
+        book_frame.grid_columnconfigure(1, weight=1)
+        
+        # Version selection
+        version_frame = tk.LabelFrame(main_frame, text="Version", font=('Arial', 12, 'bold'))
+        version_frame.pack(fill='x', pady=5)
+        
+        tk.Label(version_frame, text="Version:").grid(row=0, column=0, sticky='w', padx=5, pady=5)
+        
+        self.version_var = tk.StringVar(value='he-en')
+        version_combo = ttk.Combobox(version_frame, textvariable=self.version_var,
+                                    values=list(self.downloader.versions.keys()),
+                                    width=30)
+        version_combo.grid(row=0, column=1, padx=5, pady=5, sticky='ew')
+        
+        # Version description
+        self.version_desc = tk.Label(version_frame, text="Hebrew + English (Side by side)", 
+                                   font=('Arial', 9), fg='gray')
+        self.version_desc.grid(row=1, column=1, padx=5, pady=2, sticky='w')
+        
+        version_frame.grid_columnconfigure(1, weight=1)
+        
+        # Update version description when version changes
+        self.version_var.trace('w', self.update_version_description)
+        
+        # Download options
+        options_frame = tk.LabelFrame(main_frame, text="Download Options", font=('Arial', 12, 'bold'))
+        
+        # Chapter selection
+        chapter_frame = tk.Frame(options_frame)
+        
+        self.download_type = tk.StringVar(value='chapter')
+        
+        rb1 = tk.Radiobutton(chapter_frame, text="Specific Chapter:", variable=self.download_type, 
+                            value='chapter', command=self.toggle_download_options)
+        rb1.pack(side='left', padx=5)
+        
+        self.chapter_var = tk.StringVar(value='1')
+        self.chapter_spinbox = ttk.Spinbox(chapter_frame, from_=1, to=1, 
+                                         textvariable=self.chapter_var, width=10)
+        self.chapter_spinbox.pack(side='left', padx=5)
+        
+        chapter_frame.pack(anchor='w', pady=5)
+        
+        rb2 = tk.Radiobutton(options_frame, text="Entire Book", variable=self.download_type, 
+                            value='book', command=self.toggle_download_options)
+        rb2.pack(anchor='w', padx=5, pady=5)
+        
+        options_frame.pack(fill='x', pady=5)
+        
+        # Output directory
+        output_frame = tk.LabelFrame(main_frame, text="Output", font=('Arial', 12, 'bold'))
+        
+        tk.Label(output_frame, text="Save to:").grid(row=0, column=0, sticky='w', padx=5, pady=5)
+        
+        self.output_var = tk.StringVar(value='clean_downloads')
+        output_entry = ttk.Entry(output_frame, textvariable=self.output_var, width=50)
+        output_entry.grid(row=0, column=1, padx=5, pady=5, sticky='ew')
+        
+        browse_btn = ttk.Button(output_frame, text="Browse", command=self.browse_output_dir)
+        browse_btn.grid(row=0, column=2, padx=5, pady=5)
+        
+        output_frame.grid_columnconfigure(1, weight=1)
+        output_frame.pack(fill='x', pady=5)
+        
+        # Preview area
+        preview_frame = tk.LabelFrame(main_frame, text="Preview", font=('Arial', 12, 'bold'))
+        preview_frame.pack(fill='both', expand=True, pady=5)
+        
+        self.preview_text = scrolledtext.ScrolledText(preview_frame, height=10, font=('David', 12))
+        self.preview_text.pack(fill='both', expand=True, padx=5, pady=5)
+        
+        # Progress
+        progress_frame = tk.Frame(main_frame)
+        progress_frame.pack(fill='x', pady=5)
+        
+        self.progress_bar = ttk.Progressbar(progress_frame, mode='determinate')
+        self.progress_bar.pack(fill='x', padx=5)
+        
+        self.status_var = tk.StringVar(value='Ready')
+        tk.Label(progress_frame, textvariable=self.status_var, font=('Arial', 9),
+                 fg='gray').pack(anchor='w', padx=5)
+        
+        # Button frame
+        button_frame = tk.Frame(main_frame)
+        
+        preview_btn = ttk.Button(button_frame, text="Preview Book Info", command=self.preview_book)
+        preview_btn.pack(side='left', padx=5)
+        
+        self.download_btn = ttk.Button(button_frame, text="Download", command=self.start_download)
+        self.download_btn.pack(side='left', padx=5)
+        
+        self.pause_btn = ttk.Button(button_frame, text="Pause", command=self.toggle_pause,
+                                    state='disabled')
+        self.pause_btn.pack(side='left', padx=5)
+        
+        self.cancel_btn = ttk.Button(button_frame, text="Cancel", command=self.cancel_download,
+                                     state='disabled')
+        self.cancel_btn.pack(side='left', padx=5)
+        
+        clear_btn = ttk.Button(button_frame, text="Clear Preview", command=self.clear_preview)
+        clear_btn.pack(side='left', padx=5)
+        
+        button_frame.pack(pady=10)
+    
+    def update_version_description(self, *args):
+        """Update version description label"""
+        version = self.version_var.get()
+        descriptions = {
+            'he': 'Hebrew (Original)',
+            'en': 'English Translation', 
+            'he-en': 'Hebrew + English (Side by side)'
+        }
+        self.version_desc.config(text=descriptions.get(version, ''))
+    
+    def update_chapter_range(self, *args):
+        """Update chapter range when book changes"""
+        book_name = self.downloader.bible_books.get(
+            list(self.downloader.bible_books.keys())[
+                list(self.downloader.bible_books.values()).index(self.book_var.get())
+            ]
+        )
+        
+        chapter_count = self.downloader.get_chapter_count(book_name)
+        self.chapter_spinbox.config(to=chapter_count)
+        
+        # Reset to chapter 1 if current selection exceeds range
+        current_chapter = int(self.chapter_var.get())
+        if current_chapter > chapter_count:
+            self.chapter_var.set('1')
+    
+    def toggle_download_options(self):
+        """Toggle download options based on selection"""
+        if self.download_type.get() == 'book':
+            self.chapter_spinbox.config(state='disabled')
+        else:
+            self.chapter_spinbox.config(state='normal')
+    
+    def browse_output_dir(self):
+        """Browse for output directory"""
+        directory = filedialog.askdirectory()
+        if directory:
+            self.output_var.set(directory)
+    
+    def preview_book(self):
+        """Preview book information"""
+        book_name = self.downloader.bible_books.get(
+            list(self.downloader.bible_books.keys())[
+                list(self.downloader.bible_books.values()).index(self.book_var.get())
+            ]
+        )
+        
+        if book_name:
+            chapter_count = self.downloader.get_chapter_count(book_name)
+            
+            preview_text = f"""Book: {self.book_var.get()} ({book_name})
+Version: {self.downloader.versions[self.version_var.get()]}
+Total Chapters: {chapter_count}
+
+Ready to download: {'Entire book' if self.download_type.get() == 'book' else f'Chapter {self.chapter_var.get()}'}
+Output Directory: {self.output_var.get()}
+"""
+            self.preview_text.delete(1.0, tk.END)
+            self.preview_text.insert(1.0, preview_text)
+    
+    def clear_preview(self):
+        """Clear preview text"""
+        self.preview_text.delete(1.0, tk.END)
+    
+    def start_download(self):
+        """Start the download process"""
+        # Read the Tk variables here, on the main thread, and hand plain values to the worker
+        book_name = self.downloader.bible_books.get(
+            list(self.downloader.bible_books.keys())[
+                list(self.downloader.bible_books.values()).index(self.book_var.get())
+            ]
+        )
+        chapter = None if self.download_type.get() == 'book' else int(self.chapter_var.get())
+        
+        self.token = CancelToken()
+        self.download_btn.config(state='disabled')
+        self.pause_btn.config(state='normal', text="Pause")
+        self.cancel_btn.config(state='normal')
+        self.progress_bar.config(value=0, maximum=1)
+        self.status_var.set('Starting...')
+        
+        # Run download in separate thread to avoid freezing GUI
+        thread = threading.Thread(target=self.download_worker,
+                                  args=(book_name, self.version_var.get(), self.output_var.get(), chapter,
+                                        self.token))
+        thread.daemon = True
+        thread.start()
+    
+    def toggle_pause(self):
+        """Pause or resume the running download"""
+        if self.token is None:
+            return
+        
+        if self.token.paused:
+            self.token.resume()
+            self.pause_btn.config(text="Pause")
+            self.status_var.set('Resuming...')
+        else:
+            self.token.pause()
+            self.pause_btn.config(text="Resume")
+            self.status_var.set('Paused (requests in flight will finish)')
+    
+    def cancel_download(self):
+        """Cancel the running download; requests already in flight finish"""
+        if self.token is not None:
+            self.token.cancel()
+            self.pause_btn.config(state='disabled')
+            self.cancel_btn.config(state='disabled')
+            self.status_var.set('Cancelling...')
+    
+    def post(self, kind: str, *args):
+        """Queue an event for the main loop (safe from any thread)"""
+        self.events.put((kind, args))
+    
+    def download_worker(self, book_name: str, version: str, output_dir: str, chapter: Optional[int],
+                        token: Optional[CancelToken] = None):
+        """Worker thread for download"""
+        try:
+            # Create output directory
+            Path(output_dir).mkdir(parents=True, exist_ok=True)
+            
+            if chapter is None:
+                # Download entire book, writing each chapter as soon as it arrives
+                self.post('log', f"\nStarting download of entire {book_name}...\n")
+                self.post('start', self.downloader.get_chapter_count(book_name))
+                
+                writer = StreamingBookWriter(output_dir, f"{book_name}_complete")
+                try:
+                    data = self.downloader.stream_book(
+                        book_name, writer, version,
+                        progress=lambda number, total, chapter_data:
+                            self.post('chapter', number, 'error' not in chapter_data),
+                        token=token)
+                except Exception:
+                    writer.abort()
+                    raise
+                
+                if data.get('cancelled'):
+                    # Keep what was downloaded: every finished chapter is already flushed
+                    writer.abort()
+                    self.post('log', f"Download cancelled after {data['chapters']} chapters; "
+                                     f"partial text kept in {output_dir}/{book_name}_complete_*.txt.part\n")
+                    self.post('finished')
+                    return
+                
+                saved = writer.close()
+                
+                if 'error' not in data:
+                    self.post('saved', saved)
+                    if data['failed']:
+                        self.post('log', f"Failed chapters: {', '.join(map(str, data['failed']))}\n")
+                    self.post('log', f"Download completed! Saved to {output_dir}\n")
+                else:
+                    self.post('log', f"Error: {data['error']}\n")
+            
+            else:
+                # Download specific chapter
+                self.post('log', f"\nDownloading {book_name} Chapter {chapter}...\n")
+                self.post('start', 1)
+                
+                data = self.downloader.download_chapter(book_name, chapter, version, token)
+                self.post('chapter', chapter, 'error' not in data)
+                
+                if 'error' not in data:
+                    self.post('saved', save_clean_text(data, output_dir, f"{book_name}_chapter_{chapter}"))
+                    self.post('log', f"Download completed! Saved to {output_dir}\n")
+                else:
+                    self.post('log', f"Error: {data['error']}\n")
+                    
+        except DownloadCancelled:
+            self.post('log', "Download cancelled\n")
+        except Exception as e:
+            self.post('log', f"Download error: {str(e)}\n")
+        
+        self.post('finished')
+    
+    def poll_events(self):
+        """Drain queued worker events in a batch, then reschedule"""
+        try:
+            for _ in range(self.MAX_EVENTS_PER_POLL):
+                kind, args = self.events.get_nowait()
+                self.handle_event(kind, *args)
+        except queue.Empty:
+            pass
+        
+        self.root.after(self.POLL_INTERVAL_MS, self.poll_events)
+    
+    def handle_event(self, kind: str, *args):
+        """Apply one worker event to the widgets (main thread only)"""
+        if kind == 'log':
+            self.preview_text.insert(tk.END, args[0])
+            self.preview_text.see(tk.END)
+        
+        elif kind == 'start':
+            self.progress_start = time.monotonic()
+            self.progress_done = 0
+            self.progress_total = args[0]
+            self.progress_bar.config(value=0, maximum=max(1, self.progress_total))
+        
+        elif kind == 'chapter':
+            chapter, ok = args
+            self.progress_done += 1
+            self.progress_bar.config(value=self.progress_done)
+            self.update_status(chapter, ok)
+        
+        elif kind == 'saved':
+            self.show_saved_files(args[0])
+        
+        elif kind == 'finished':
+            cancelled = self.token is not None and self.token.cancelled
+            self.token = None
+            self.download_btn.config(state='normal')
+            self.pause_btn.config(state='disabled', text="Pause")
+            self.cancel_btn.config(state='disabled')
+            if cancelled:
+                self.status_var.set('Cancelled')
+            elif self.status_var.get() == 'Starting...':
+                self.status_var.set('Ready')
+    
+    def update_status(self, chapter: int, ok: bool):
+        """Show chapter progress, throughput and ETA"""
+        done, total = self.progress_done, self.progress_total
+        elapsed = time.monotonic() - self.progress_start
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = (total - done) / rate if rate > 0 else 0.0
+        
+        self.status_var.set(f"Chapter {chapter}{'' if ok else ' (failed)'} - {done}/{total} "
+                            f"- {rate:.1f} chapters/s - ETA {int(eta) // 60}:{int(eta) % 60:02d}")
+    
+    def save_clean_text(self, data: Dict, output_dir: str, filename: str, version: str):
+        """Save clean text to files (main thread only)"""
+        self.show_saved_files(save_clean_text(data, output_dir, filename))
+    
+    def show_saved_files(self, saved: List[str]):
+        """Show preview of downloaded content"""
+        self.preview_text.insert(tk.END, f"\nSaved files:\n")
+        
+        for name in saved:
+            self.preview_text.insert(tk.END, f"- {name}\n")
+    
+    def run(self):
+        """Run the GUI"""
+        self.root.mainloop()
+
+def main():
+    try:
+        app = BibleDownloaderGUI()
+        app.run()
+    except Exception as e:
+        print(f"Error starting GUI: {e}")
+        print("Make sure tkinter is installed: sudo apt-get install python3-tk")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Bulk Tanakh Downloader
+
+Walks every book in CleanBibleDownloader.bible_books, storing each cleaned
+chapter as it completes and checkpointing progress to a manifest so an
+interrupted run resumes without re-fetching finished chapters. With
+search_index enabled, a full-text index (search_index.bin) is updated as
+chapters arrive.
+
+The manifest also records a SHA-256 content hash for every stored chapter.
+For every synced book it records the validators: ETag, Last-Modified, the
+version titles and a fingerprint of their texts/versions entries. sync()
+re-checks a book by fetching its versions listing. If the fingerprint is
+unchanged, the book text is not downloaded. Otherwise the book is fetched
+with one conditional Book.1-N request. For a changed book, only the
+chapters whose cleaned content hash differs are rewritten and re-indexed.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from clean_bible_downloader import CleanBibleDownloader
+from search_index import SearchIndex
+from verse_table import VerseTable
+
+class BulkDownloader:
+    """Resumable whole-Tanakh download pipeline"""
+
+    MANIFEST_VERSION = 2
+
+    def __init__(self, downloader: CleanBibleDownloader, output_dir: str = 'tanakh_download',
+                 version: str = 'he-en', search_index: bool = False):
+        self.downloader = downloader
+        self.output_dir = Path(output_dir)
+        self.chapters_dir = self.output_dir / 'chapters'
+        self.manifest_file = self.output_dir / 'manifest.json'
+        self.index_file = self.output_dir / 'search_index.bin'
+        self.version = version
+        self.manifest = {}
+        self.search_index: Optional[SearchIndex] = SearchIndex() if search_index else None
+
+    def load_manifest(self) -> Dict:
+        """Load the checkpoint manifest, or start a new one"""
+        if self.manifest_file.exists():
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+
+            if manifest.get('version') != self.version:
+                raise ValueError(f"{self.manifest_file} was written for version "
+                                 f"'{manifest.get('version')}', not '{self.version}'")
+            # Format 1 manifests have no hashes; sync() fills them in
+            manifest.setdefault('hashes', {})
+            manifest.setdefault('validators', {})
+            manifest['format'] = self.MANIFEST_VERSION
+        else:
+            manifest = {
+                'format': self.MANIFEST_VERSION,
+                'version': self.version,
+                'chapter_counts': {},
+                'completed': {},
+                'hashes': {},
+                'validators': {},
+            }
+
+        self.manifest = manifest
+        return manifest
+
+    def save_manifest(self):
+        """Write the manifest atomically so a crash never leaves it half written"""
+        tmp_file = self.manifest_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_file, self.manifest_file)
+
+    def chapter_file(self, book_name: str, chapter: int) -> Path:
+        return self.chapters_dir / book_name / f"{chapter}.json"
+
+    @staticmethod
+    def chapter_body(data: Dict) -> Tuple[bytes, str]:
+        """(chapter file contents, SHA-256 hex digest) of a cleaned chapter"""
+        body = json.dumps({'hebrew': data['hebrew'], 'english': data['english']},
+                          ensure_ascii=False).encode('utf-8')
+        return body, hashlib.sha256(body).hexdigest()
+
+    def save_chapter(self, book_name: str, chapter: int, data: Dict, checkpoint: bool = True):
+        """Store one cleaned chapter and record it and its hash in the manifest
+
+        With checkpoint=False the caller saves the manifest later.
+        """
+        chapter_file = self.chapter_file(book_name, chapter)
+        chapter_file.parent.mkdir(parents=True, exist_ok=True)
+
+        body, digest = self.chapter_body(data)
+        tmp_file = chapter_file.with_suffix('.tmp')
+        with open(tmp_file, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_file, chapter_file)
+
+        completed = self.manifest['completed'].setdefault(book_name, [])
+        if chapter not in completed:
+            completed.append(chapter)
+        self.manifest['hashes'].setdefault(book_name, {})[str(chapter)] = digest
+        if checkpoint:
+            self.save_manifest()
+
+        if self.search_index is not None:
+            self.search_index.add_chapter(book_name, chapter, data['hebrew'], data['english'])
+
+    def load_search_index(self):
+        """Load the search index and index any stored chapters it is missing
+
+        The index is saved at the end of a run, so after an interrupted run
+        (or when indexing is first enabled) it catches up from the chapter files.
+        """
+        if self.index_file.exists():
+            self.search_index = SearchIndex.load(str(self.index_file))
+        else:
+            self.search_index = SearchIndex()
+
+        for book_name, chapters in self.manifest['completed'].items():
+            for chapter in chapters:
+                if not self.search_index.has_chapter(book_name, chapter):
+                    with open(self.chapter_file(book_name, chapter), 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    self.search_index.add_chapter(book_name, chapter, data['hebrew'], data['english'])
+
+    def pending_chapters(self, book_name: str) -> List[int]:
+        """Chapters of a book that are not yet checkpointed"""
+        counts = self.manifest['chapter_counts']
+        if book_name not in counts:
+            counts[book_name] = self.downloader.get_chapter_count(book_name)
+
+        done = set(self.manifest['completed'].get(book_name, []))
+        return [chapter for chapter in range(1, counts[book_name] + 1) if chapter not in done]
+
+    def run(self, books: Optional[List[str]] = None) -> Dict:
+        """Download every pending chapter and report throughput"""
+        books = books or list(self.downloader.bible_books.values())
+        self.chapters_dir.mkdir(parents=True, exist_ok=True)
+
+        # Resume overhead: reading the manifest and working out what is left to do
+        start = time.perf_counter()
+        self.load_manifest()
+        plan = {book_name: self.pending_chapters(book_name) for book_name in books}
+        self.save_manifest()
+        if self.search_index is not None:
+            self.load_search_index()
+        resume_overhead = time.perf_counter() - start
+
+        skipped = sum(len(self.manifest['completed'].get(book_name, [])) for book_name in books)
+        downloaded = 0
+        failed = []
+
+        start = time.perf_counter()
+        for book_name, chapters in plan.items():
+            if not chapters:
+                continue
+
+            print(f"Downloading {book_name} ({len(chapters)} chapters remaining)")
+
+            for chapter, data in self.downloader.iter_chapters(book_name, chapters, self.version):
+                if 'error' in data:
+                    failed.append(f"{book_name}.{chapter}")
+                    print(f"Error in {book_name} Chapter {chapter}: {data['error']}")
+                    continue
+
+                self.save_chapter(book_name, chapter, data)
+                downloaded += 1
+
+        elapsed = time.perf_counter() - start
+        if self.downloader.cache is not None:
+            self.downloader.cache.flush()
+        if self.search_index is not None:
+            self.search_index.save(str(self.index_file))
+
+        stats = {
+            'books': len(books),
+            'downloaded': downloaded,
+            'skipped': skipped,
+            'failed': failed,
+            'elapsed': elapsed,
+            'chapters_per_second': downloaded / elapsed if elapsed > 0 else 0.0,
+            'resume_overhead': resume_overhead,
+            'http': self.downloader.transport.stats.summary(),
+        }
+
+        print("\n=== Bulk Download Summary ===")
+        print(f"Chapters downloaded: {downloaded}")
+        print(f"Chapters resumed from checkpoint: {skipped}")
+        print(f"Failed chapters: {len(failed)}")
+        print(f"Throughput: {stats['chapters_per_second']:.2f} chapters/sec ({elapsed:.1f} s)")
+        print(f"Resume overhead: {resume_overhead * 1000:.1f} ms")
+        print(self.downloader.transport.stats.report())
+
+        return stats
+
+    def stored_hash(self, book_name: str, chapter: int) -> Optional[str]:
+        """Content hash of a stored chapter, hashing its file when the manifest has none"""
+        hashes = self.manifest['hashes'].setdefault(book_name, {})
+        if str(chapter) not in hashes:
+            chapter_file = self.chapter_file(book_name, chapter)
+            if not chapter_file.exists():
+                return None
+            hashes[str(chapter)] = hashlib.sha256(chapter_file.read_bytes()).hexdigest()
+        return hashes[str(chapter)]
+
+    def _fetch_book(self, book_name: str, force: bool = False) -> Tuple[Optional[Dict], Optional[str]]:
+        """(download_book_if_changed result, error), sending validators only for complete books"""
+        done = self.manifest['completed'].get(book_name, [])
+        validators = None
+        if not force and len(done) == self.manifest['chapter_counts'][book_name]:
+            validators = self.manifest['validators'].get(book_name)
+        try:
+            return self.downloader.download_book_if_changed(book_name, self.version, validators), None
+        except Exception as e:
+            return None, str(e)
+
+    def sync_book(self, book_name: str, chapters: List[Dict], validators: Dict) -> Tuple[List[int], List[int]]:
+        """(changed, added) chapters after storing those whose content hash differs"""
+        completed = set(self.manifest['completed'].get(book_name, []))
+        changed, added = [], []
+
+        for chapter, data in enumerate(chapters, 1):
+            if chapter in completed and self.stored_hash(book_name, chapter) == self.chapter_body(data)[1]:
+                continue
+            self.save_chapter(book_name, chapter, data, checkpoint=False)
+            (changed if chapter in completed else added).append(chapter)
+
+        self.manifest['validators'][book_name] = validators
+        self.save_manifest()
+        return changed, added
+
+    def sync(self, books: Optional[List[str]] = None, force: bool = False) -> Dict:
+        """Re-check books against the server and store only chapters that changed
+
+        Books are checked in parallel on the downloader's workers. Missing
+        chapters are added as well. With force, every book's text is fetched
+        regardless of its validators. Books whose request fails are reported
+        in 'failed' and keep their stored chapters.
+        """
+        books = books or list(self.downloader.bible_books.values())
+        self.chapters_dir.mkdir(parents=True, exist_ok=True)
+
+        start = time.perf_counter()
+        self.load_manifest()
+        for book_name in books:
+            self.pending_chapters(book_name)
+        if self.search_index is not None:
+            self.load_search_index()
+
+        unchanged, changed, added, failed = [], [], [], []
+        workers = max(1, min(self.downloader.max_workers, len(books)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for book_name, (result, error) in zip(books, executor.map(self._fetch_book, books, [force] * len(books))):
+                if error is not None:
+                    failed.append(book_name)
+                    print(f"Error syncing {book_name}: {error}")
+                elif result is None:
+                    unchanged.append(book_name)
+                else:
+                    book_changed, book_added = self.sync_book(book_name, result['chapters'],
+                                                              result['validators'])
+                    changed.extend(f"{book_name}.{chapter}" for chapter in book_changed)
+                    added.extend(f"{book_name}.{chapter}" for chapter in book_added)
+                    if book_changed or book_added:
+                        print(f"{book_name}: {len(book_changed)} changed, {len(book_added)} added")
+
+        if self.search_index is not None and (changed or added):
+            self.search_index.save(str(self.index_file))
+        if self.downloader.cache is not None:
+            self.downloader.cache.flush()
+        elapsed = time.perf_counter() - start
+
+        stats = {
+            'books': len(books),
+            'unchanged_books': unchanged,
+            'changed': changed,
+            'added': added,
+            'failed': failed,
+            'elapsed': elapsed,
+            'http': self.downloader.transport.stats.summary(),
+        }
+
+        print("\n=== Sync Summary ===")
+        print(f"Books not modified: {len(unchanged)} of {len(books)}")
+        print(f"Chapters changed: {len(changed)}, added: {len(added)}")
+        print(f"Failed books: {len(failed)}")
+        print(f"Elapsed: {elapsed:.1f} s")
+
+        return stats
+
+    def load_book(self, book_name: str) -> Dict:
+        """Reassemble a downloaded book in the download_book result shape"""
+        table = VerseTable()
+
+        for chapter in sorted(self.manifest['completed'].get(book_name, [])):
+            with open(self.chapter_file(book_name, chapter), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            table.add_chapter(book_name, chapter, data['hebrew'], data['english'])
+
+        return table.as_result()
+
+def main():
+    flags = {'--sync', '--force', '--range-fetch'}
+    args = [arg for arg in sys.argv[1:] if arg not in flags]
+    output_dir = args[0] if args else 'tanakh_download'
+    downloader = CleanBibleDownloader(range_fetch='--range-fetch' in sys.argv[1:])
+    pipeline = BulkDownloader(downloader, output_dir, search_index=True)
+    if '--sync' in sys.argv[1:]:
+        stats = pipeline.sync(force='--force' in sys.argv[1:])
+    else:
+        stats = pipeline.run()
+    return 1 if stats['failed'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Chapter Index
+
+Chapter and verse counts for every book in the Tanakh, bundled as
+chapter_index.json so chapter lookups never need the network. Verse counts
+follow the Masoretic versification Sefaria serves (23,207 verses).
+
+The index can be refreshed from Sefaria's shape API. The refreshed copy is
+written to USER_INDEX_FILE and is preferred over the bundled one from then
+on; the bundled file is never modified.
+"""
+
+import json
+import os
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+INDEX_FILE = Path(__file__).with_name('chapter_index.json')
+USER_INDEX_FILE = Path.home() / '.clean_bible_downloader' / 'chapter_index.json'
+INDEX_FORMAT = 1
+
+class ChapterIndex:
+    """In-memory chapter/verse count lookups"""
+
+    def __init__(self, books: Dict[str, Dict], revision: str = '', source: str = ''):
+        self.revision = revision
+        self.source = source
+        self.books = books
+        self._chapters = {name: entry['chapters'] for name, entry in books.items()}
+
+    def chapter_count(self, book_name: str) -> int:
+        """Number of chapters in a book, or 0 if the book is unknown"""
+        return self._chapters.get(book_name, 0)
+
+    def verse_counts(self, book_name: str) -> Optional[List[int]]:
+        """Verses per chapter for a book, if the index has them"""
+        entry = self.books.get(book_name)
+        return entry.get('verses') if entry else None
+
+    def verse_count(self, book_name: str, chapter: int) -> Optional[int]:
+        """Number of verses in a chapter, if the index has it"""
+        verses = self.verse_counts(book_name)
+        if verses and 1 <= chapter <= len(verses):
+            return verses[chapter - 1]
+        return None
+
+    def to_dict(self) -> Dict:
+        return {'format': INDEX_FORMAT, 'revision': self.revision, 'source': self.source,
+                'books': self.books}
+
+    def to_json(self) -> str:
+        """The index file contents, one line per book"""
+        books = ',\n'.join(f"    {json.dumps(name, ensure_ascii=False)}: {json.dumps(entry)}"
+                           for name, entry in self.books.items())
+        header = json.dumps({key: value for key, value in self.to_dict().items() if key != 'books'},
+                            ensure_ascii=False, indent=2)
+        return f"{header[:-2]},\n  \"books\": {{\n{books}\n  }}\n}}\n"
+
+def load_chapter_index(path: Optional[str] = None) -> ChapterIndex:
+    """Load a chapter index file (memoized per path)
+
+    Without a path, loads the refreshed index in USER_INDEX_FILE if there
+    is one, else the bundled index.
+    """
+    if path is None:
+        path = USER_INDEX_FILE if USER_INDEX_FILE.exists() else INDEX_FILE
+    return _load_index(str(path))
+
+@lru_cache(maxsize=None)
+def _load_index(path: str) -> ChapterIndex:
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    if data.get('format') != INDEX_FORMAT:
+        raise ValueError(f"Unsupported chapter index format in {path}: {data.get('format')}")
+
+    return ChapterIndex(data['books'], data.get('revision', ''), data.get('source', ''))
+
+def fetch_book_shape(downloader, book_name: str) -> Dict:
+    """Fetch chapter and verse counts for one book from Sefaria's shape API"""
+    data = downloader._get_json(f"{downloader.base_url}/shape/{book_name}")
+
+    # The shape API answers with a one-element list for a single book
+    if isinstance(data, list):
+        data = data[0]
+
+    verses = data.get('chapters')
+    if not verses:
+        raise ValueError(f"No chapter shape returned for {book_name}")
+
+    return {'chapters': len(verses), 'verses': verses}
+
+def refresh_chapter_index(downloader, path: str = str(USER_INDEX_FILE)) -> ChapterIndex:
+    """Rebuild the index from the API into path (the user index by default) and reset the memo"""
+    books = {}
+    for book_name in downloader.bible_books.values():
+        downloader.rate_limiter.acquire()
+        books[book_name] = fetch_book_shape(downloader, book_name)
+
+    index = ChapterIndex(books, time.strftime('%Y-%m-%d'),
+                         f"Sefaria shape API ({downloader.base_url})")
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = f"{path}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write(index.to_json())
+    os.replace(tmp_file, path)
+
+    _load_index.cache_clear()
+    return load_chapter_index(path)
+
+if __name__ == "__main__":
+    from clean_bible_downloader import CleanBibleDownloader
+
+    index = refresh_chapter_index(CleanBibleDownloader())
+    print(f"Chapter index refreshed ({index.revision}) in {USER_INDEX_FILE}: "
+          f"{sum(index.chapter_count(name) for name in index.books)} chapters")
@@ -1,81 +1,429 @@
 #!/usr/bin/env python3
 """
-Clean Bible Downloader with GUI
+Clean Bible Downloader
 
-A GUI application to download Bible texts from Sefaria.org without HTML tags,
-with options to select different versions and translations.
+Downloads Bible texts from Sefaria.org without HTML tags, with options to
+select different versions and translations. Run without arguments for the
+GUI (bible_downloader_gui), or with arguments for the headless CLI
+(bible_cli).
+
+A version is one of VERSIONS (Sefaria's default Hebrew and/or English
+text) or a named Sefaria version, 'he:<versionTitle>' or
+'en:<versionTitle>'. One texts API request can carry one Hebrew and one
+English version, written as a combined version such as
+'he:Miqra according to the Masorah|en:The Koren Jerusalem Bible'.
+batch_versions plans the fewest such requests for a set of versions.
 """
 
-import requests
+import hashlib
 import json
 import re
-import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox, filedialog
-from pathlib import Path
-from typing import Dict, List, Optional
+import sys
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice, zip_longest
 import threading
 import time
 
+from chapter_index import ChapterIndex, load_chapter_index
+from http_transport import HTTPTransport
+from response_cache import OfflineCacheMiss, ResponseCache
+from text_cleaner import clean_lines, clean_text
+from verse_table import VerseTable
+
+# Common Bible books
+BIBLE_BOOKS = {
+    'genesis': 'Genesis', 'exodus': 'Exodus', 'leviticus': 'Leviticus', 
+    'numbers': 'Numbers', 'deuteronomy': 'Deuteronomy', 'joshua': 'Joshua',
+    'judges': 'Judges', 'samuel1': 'I Samuel', 'samuel2': 'II Samuel',
+    'kings1': 'I Kings', 'kings2': 'II Kings', 'isaiah': 'Isaiah',
+    'jeremiah': 'Jeremiah', 'ezekiel': 'Ezekiel', 'hosea': 'Hosea',
+    'joel': 'Joel', 'amos': 'Amos', 'obadiah': 'Obadiah', 'jonah': 'Jonah',
+    'micah': 'Micah', 'nahum': 'Nahum', 'habakkuk': 'Habakkuk',
+    'zephaniah': 'Zephaniah', 'haggai': 'Haggai', 'zechariah': 'Zechariah',
+    'malachi': 'Malachi', 'psalms': 'Psalms', 'proverbs': 'Proverbs',
+    'job': 'Job', 'song_of_songs': 'Song of Songs', 'ruth': 'Ruth',
+    'lamentations': 'Lamentations', 'ecclesiastes': 'Ecclesiastes',
+    'esther': 'Esther', 'daniel': 'Daniel', 'ezra': 'Ezra',
+    'nehemiah': 'Nehemiah', 'chronicles1': 'I Chronicles', 'chronicles2': 'II Chronicles'
+}
+
+# Available versions/translations on Sefaria
+VERSIONS = {
+    'he': 'Hebrew (Original)',
+    'en': 'English Translation',
+    'he-en': 'Hebrew + English (Side by side)'
+}
+
+def version_parts(version: str) -> List[Tuple[str, str]]:
+    """(language, versionTitle) pairs of a version; '' is Sefaria's default version
+
+    Raises ValueError for anything that is not a known or named version.
+    """
+    if version in VERSIONS:
+        return [(language, '') for language in version.split('-')]
+    
+    parts = []
+    for part in version.split('|'):
+        language, colon, title = part.partition(':')
+        if language not in ('he', 'en') or (colon and not title.strip()):
+            raise ValueError(f"unknown version '{part}', expected one of {', '.join(VERSIONS)}, "
+                             f"'he:<title>' or 'en:<title>'")
+        parts.append((language, title.strip()))
+    
+    if len(parts) > 2 or len({language for language, _ in parts}) != len(parts):
+        raise ValueError(f"'{version}' combines more than one Hebrew or English version")
+    return parts
+
+def version_dirname(version: str) -> str:
+    """Directory name for a version's text files"""
+    return re.sub(r'[^\w.-]+', '_', version).strip('_')
+
+def batch_versions(versions: Iterable[str]) -> List[str]:
+    """Fewest combined versions (one request each) covering every text of versions
+
+    Duplicate texts are fetched once, and each request pairs one Hebrew
+    with one English version. So he, en and he-en need a single request,
+    and three translations plus one Hebrew edition need three.
+    """
+    texts = {'he': {}, 'en': {}}
+    for version in versions:
+        for language, title in version_parts(version):
+            texts[language][title] = None
+    
+    batches = []
+    for hebrew, english in zip_longest(texts['he'], texts['en']):
+        parts = [f"{language}:{title}" if title else language
+                 for language, title in (('he', hebrew), ('en', english)) if title is not None]
+        batches.append('he-en' if parts == ['he', 'en'] else '|'.join(parts))
+    return batches
+
+def split_versions(results: Dict[str, Dict], versions: Iterable[str]) -> Dict[str, Dict]:
+    """Chapter data of each version, assembled from chapter data of combined versions
+
+    results maps each combined version (see batch_versions) to its cleaned
+    chapter data. A version whose request failed carries that 'error'.
+    """
+    columns = {}
+    errors = {}
+    for batch, data in results.items():
+        for language, title in version_parts(batch):
+            if 'error' in data:
+                errors[(language, title)] = data['error']
+            else:
+                columns[(language, title)] = data['hebrew' if language == 'he' else 'english']
+    
+    split = {}
+    for version in versions:
+        data = {'hebrew': [], 'english': []}
+        for language, title in version_parts(version):
+            if (language, title) in errors:
+                data['error'] = errors[(language, title)]
+            else:
+                data['hebrew' if language == 'he' else 'english'] = columns[(language, title)]
+        split[version] = data
+    return split
+
+def chapter_params(version: str) -> Dict:
+    """Query parameters for a texts API request in the given version"""
+    # Without vhe/ven Sefaria answers with its default Hebrew and English versions
+    return {f"v{language}": title for language, title in version_parts(version) if title}
+
+def parse_chapter(data: Dict, version: str) -> Dict:
+    """Clean the Hebrew and/or English verses of a texts API response"""
+    languages = {language for language, _ in version_parts(version)}
+    hebrew_lines = []
+    english_lines = []
+    
+    if 'he' in languages and 'he' in data:
+        hebrew_lines = clean_lines(data['he'])
+    
+    if 'en' in languages and 'text' in data:
+        english_lines = clean_lines(data['text'])
+    
+    return {'hebrew': hebrew_lines, 'english': english_lines}
+
+def range_chapters(data: Dict, chapter_count: int) -> List[Dict]:
+    """Split a multi-chapter (Book.1-10) texts API response into per-chapter raw responses"""
+    # Range responses nest verses per chapter: 'text': [[ch1 verses], [ch2 verses], ...]
+    columns = {}
+    for key in ('he', 'text'):
+        value = data.get(key)
+        if value is None:
+            continue
+        if not value:
+            value = [[]] * chapter_count
+        if len(value) != chapter_count or not all(isinstance(chapter, list) for chapter in value):
+            raise ValueError(f"expected {chapter_count} chapters in '{key}', got {len(value)}")
+        columns[key] = value
+    
+    return [{key: value[i] for key, value in columns.items()} for i in range(chapter_count)]
+
+def split_range(data: Dict, version: str, chapter_count: int) -> List[Dict]:
+    """Split a multi-chapter (Book.1-10) texts API response into per-chapter results"""
+    return [parse_chapter(chapter, version) for chapter in range_chapters(data, chapter_count)]
+
+def versions_fingerprint(listing: List[Dict], titles: Dict) -> Optional[str]:
+    """SHA-256 of the texts/versions entries for the given version titles
+
+    titles maps 'versionTitle' / 'heVersionTitle' to the titles a texts
+    response carried. Returns None when none of them are listed.
+    """
+    wanted = set(titles.values())
+    entries = [entry for entry in listing if isinstance(entry, dict) and entry.get('versionTitle') in wanted]
+    if not entries:
+        return None
+    body = json.dumps(sorted(entries, key=lambda entry: (entry.get('language', ''), entry['versionTitle'])),
+                      sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+# progress(chapter, chapter_count, chapter_data), called in chapter order from
+# the thread running download_book / stream_book
+ProgressCallback = Callable[[int, int, Dict], None]
+
+class RateLimiter:
+    """Token bucket rate limiter shared by all download workers"""
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        # rate is in requests per second; 0 or less disables limiting
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def reserve(self) -> float:
+        """Take a token if one is available, else return the seconds to wait"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            
+            return (1 - self._tokens) / self.rate
+    
+    def acquire(self):
+        """Block until a request token is available"""
+        if self.rate <= 0:
+            return
+        
+        wait = self.reserve()
+        while wait > 0:
+            time.sleep(wait)
+            wait = self.reserve()
+
+class SpanSizer:
+    """Adaptive chapters-per-request for range fetches
+
+    Keeps exponentially weighted per-chapter response size and latency and
+    picks the largest span expected to stay under both targets, at most
+    doubling from one request to the next.
+    """
+    
+    def __init__(self, initial: int = 4, max_span: int = 30, target_bytes: int = 512 * 1024,
+                 target_seconds: float = 2.0, smoothing: float = 0.3):
+        self.max_span = max_span
+        self.target_bytes = target_bytes
+        self.target_seconds = target_seconds
+        self.smoothing = smoothing
+        self._span = max(1, min(initial, max_span))
+        self._bytes_per_chapter = None
+        self._seconds_per_chapter = None
+        self._lock = threading.Lock()
+    
+    @property
+    def span(self) -> int:
+        return self._span
+    
+    def record(self, chapters: int, size: int, seconds: float):
+        """Update the estimates with one range response"""
+        with self._lock:
+            bytes_per_chapter = size / chapters
+            seconds_per_chapter = seconds / chapters
+            if self._bytes_per_chapter is None:
+                self._bytes_per_chapter = bytes_per_chapter
+                self._seconds_per_chapter = seconds_per_chapter
+            else:
+                a = self.smoothing
+                self._bytes_per_chapter += a * (bytes_per_chapter - self._bytes_per_chapter)
+                self._seconds_per_chapter += a * (seconds_per_chapter - self._seconds_per_chapter)
+            
+            fit = min(self.target_bytes / max(self._bytes_per_chapter, 1.0),
+                      self.target_seconds / max(self._seconds_per_chapter, 1e-6))
+            self._span = int(max(1, min(fit, self._span * 2, self.max_span)))
+
+class DownloadCancelled(Exception):
+    """Raised inside a download when its CancelToken is cancelled"""
+
+class CancelToken:
+    """Cooperative cancel and pause/resume flag shared by a download's workers
+
+    Workers call check() before each request: it blocks while paused and
+    raises DownloadCancelled once cancelled, so at most the requests already
+    in flight complete after cancel(). Retry backoff waits use sleep(),
+    which ends as soon as the token is cancelled.
+    """
+    
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+    
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+    
+    def cancel(self):
+        self._cancelled.set()
+        # Wake paused workers so they see the cancellation
+        self._running.set()
+    
+    def pause(self):
+        if not self.cancelled:
+            self._running.clear()
+    
+    def resume(self):
+        self._running.set()
+    
+    def check(self):
+        """Wait while paused, then raise DownloadCancelled if cancelled"""
+        self._running.wait()
+        if self._cancelled.is_set():
+            raise DownloadCancelled()
+    
+    def sleep(self, seconds: float):
+        """time.sleep that raises DownloadCancelled as soon as the token is cancelled"""
+        if self._cancelled.wait(seconds):
+            raise DownloadCancelled()
+
 class CleanBibleDownloader:
     """Clean Bible text downloader with HTML tag removal"""
     
-    def __init__(self):
-        self.base_url = "https://www.sefaria.org/api"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Clean-Bible-Downloader/1.0'
-        })
+    def __init__(self, max_workers: int = 4, requests_per_second: float = 4.0,
+                 base_url: str = "https://www.sefaria.org/api",
+                 cache: Optional[ResponseCache] = None, offline: bool = False,
+                 chapter_index: Optional[ChapterIndex] = None,
+                 transport: Optional[HTTPTransport] = None,
+                 range_fetch: bool = False, span_sizer: Optional[SpanSizer] = None):
+        self.base_url = base_url
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(requests_per_second)
+        
+        # Pooled, retrying HTTP transport sized to the download concurrency
+        self.transport = transport or HTTPTransport(pool_size=max_workers)
+        self.session = self.transport.session
+        
+        # Optional on-disk response cache; offline mode serves from it exclusively
+        self.cache = cache
+        self.offline = offline
+        if offline and cache is None:
+            raise ValueError("offline mode requires a response cache")
+        
+        # Range mode fetches Book.N-M spans instead of one chapter per request
+        self.range_fetch = range_fetch
+        self.span_sizer = span_sizer or SpanSizer()
+        
+        # Bundled chapter counts, so chapter lookups need no network I/O
+        self.chapter_index = chapter_index or load_chapter_index()
         
         # Common Bible books
-        self.bible_books = {
-            'genesis': 'Genesis', 'exodus': 'Exodus', 'leviticus': 'Leviticus', 
-            'numbers': 'Numbers', 'deuteronomy': 'Deuteronomy', 'joshua': 'Joshua',
-            'judges': 'Judges', 'samuel1': 'I Samuel', 'samuel2': 'II Samuel',
-            'kings1': 'I Kings', 'kings2': 'II Kings', 'isaiah': 'Isaiah',
-            'jeremiah': 'Jeremiah', 'ezekiel': 'Ezekiel', 'hosea': 'Hosea',
-            'joel': 'Joel', 'amos': 'Amos', 'obadiah': 'Obadiah', 'jonah': 'Jonah',
-            'micah': 'Micah', 'nahum': 'Nahum', 'habakkuk': 'Habakkuk',
-            'zephaniah': 'Zephaniah', 'haggai': 'Haggai', 'zechariah': 'Zechariah',
-            'malachi': 'Malachi', 'psalms': 'Psalms', 'proverbs': 'Proverbs',
-            'job': 'Job', 'song_of_songs': 'Song of Songs', 'ruth': 'Ruth',
-            'lamentations': 'Lamentations', 'ecclesiastes': 'Ecclesiastes',
-            'esther': 'Esther', 'daniel': 'Daniel', 'ezra': 'Ezra',
-            'nehemiah': 'Nehemiah', 'chronicles1': 'I Chronicles', 'chronicles2': 'II Chronicles'
-        }
+        self.bible_books = dict(BIBLE_BOOKS)
         
         # Available versions/translations on Sefaria
-        self.versions = {
-            'he': 'Hebrew (Original)',
-            'en': 'English Translation',
-            'he-en': 'Hebrew + English (Side by side)'
-        }
+        self.versions = dict(VERSIONS)
     
     def clean_hebrew_text(self, text: str) -> str:
         """Remove HTML tags and clean Hebrew text"""
-        # Remove HTML tags but preserve Hebrew letters
-        clean = re.sub(r'<[^>]*>', '', text)
-        
-        # Remove extra whitespace and normalize
-        clean = ' '.join(clean.split())
-        
-        return clean.strip()
+        # Letters, niqqud and cantillation are preserved; markers like {פ} are dropped
+        return clean_text(text)
     
     def clean_english_text(self, text: str) -> str:
-        """Clean English text by removing HTML tags"""
-        # Remove HTML tags
-        clean = re.sub(r'<[^>]*>', '', text)
-        
-        # Remove extra whitespace
-        clean = ' '.join(clean.split())
-        
-        return clean.strip()
+        """Clean English text by removing HTML tags and footnotes"""
+        return clean_text(text)
+    
+    def _get_body(self, url: str, params: Optional[Dict] = None,
+                  token: Optional[CancelToken] = None) -> bytes:
+        """GET a response body, going through the response cache when enabled"""
+        if self.cache is None:
+            response = self.transport.get(url, params=params, token=token)
+            response.raise_for_status()
+            return response.content
+        
+        key = self.cache.key(url, params)
+        entry = self.cache.get(key)
+        
+        if entry is not None and (self.offline or self.cache.is_fresh(entry)):
+            body = self.cache.read(entry)
+            if body is not None:
+                return body
+            # Evicted by another thread since get(): a miss
+            entry = None
+        
+        if self.offline:
+            raise OfflineCacheMiss(f"{url} is not cached (offline mode)")
+        
+        # Revalidate stale entries with their ETag / Last-Modified validators
+        response = self.transport.get(url, params=params,
+                                      headers=self.cache.conditional_headers(entry), token=token)
+        
+        if response.status_code == 304 and entry is not None:
+            body = self.cache.read(entry)
+            if body is not None:
+                self.cache.touch(key)
+                return body
+            # Evicted while revalidating: fetch the body unconditionally
+            response = self.transport.get(url, params=params, token=token)
+        
+        response.raise_for_status()
+        self.cache.put(key, response.content, response.headers)
+        return response.content
+    
+    def _get_json(self, url: str, params: Optional[Dict] = None,
+                  token: Optional[CancelToken] = None) -> Dict:
+        """GET a JSON document, going through the response cache when enabled"""
+        return json.loads(self._get_body(url, params, token))
+    
+    def _chapter_key(self, book_name: str, chapter: int, version: str) -> str:
+        """Response cache key of a single-chapter request"""
+        return self.cache.key(f"{self.base_url}/texts/{book_name}.{chapter}", chapter_params(version))
+    
+    def _cache_chapters(self, book_name: str, first: int, chapters: List[Dict], version: str):
+        """Store raw chapters from a range response under their single-chapter cache keys"""
+        if self.cache is None:
+            return
+        for chapter, data in enumerate(chapters, first):
+            body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+            self.cache.put(self._chapter_key(book_name, chapter, version), body)
+    
+    def book_versions(self, book_name: str) -> List[Dict]:
+        """The texts/versions listing of a book, or [] if it cannot be fetched"""
+        self.rate_limiter.acquire()
+        try:
+            response = self.transport.get(f"{self.base_url}/texts/versions/{book_name}")
+            response.raise_for_status()
+            listing = json.loads(response.content)
+            return listing if isinstance(listing, list) else []
+        except Exception as e:
+            print(f"Error getting versions of {book_name}: {e}")
+            return []
     
     def get_chapter_count(self, book_name: str) -> int:
         """Get the number of chapters in a book"""
+        chapter_count = self.chapter_index.chapter_count(book_name)
+        if chapter_count:
+            return chapter_count
+        
+        # Not in the bundled index: fall back to counting the full book text
         try:
-            response = self.session.get(f"{self.base_url}/\texts/{book_name}")
-            response.raise_for_status()
-            data = response.json()
+            data = self._get_json(f"{self.base_url}/texts/{book_name}")
             
             if 'text' in data:
                 return len(data['text'])
@@ -84,381 +432,317 @@ class CleanBibleDownloader:
             print(f"Error getting chapter count: {e}")
             return 0
     
-    def download_chapter(self, book_name: str, chapter: int, version: str = 'he') -> Dict:
-        """Download a specific chapter"""
+    def download_chapter(self, book_name: str, chapter: int, version: str = 'he',
+                         token: Optional[CancelToken] = None) -> Dict:
+        """Download a specific chapter (raises DownloadCancelled if token is cancelled)"""
+        if token is not None:
+            token.check()
+        
         try:
             ref = f"{book_name}.{chapter}"
             url = f"{self.base_url}/texts/{ref}"
             
-            params = {}
-            if version == 'he-en':
-                params = {'version': 'he'}
+            data = self._get_json(url, chapter_params(version), token)
+            return parse_chapter(data, version)
             
-            response = self.session.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Clean the text based on version
-            if version == 'he':
-                # Clean Hebrew text
-                hebrew_lines = []
-                if 'he' in data:
-                    for line in data['he']:
-                        hebrew_lines.append(self.clean_hebrew_text(line))
-                return {'hebrew': hebrew_lines, 'english': []}
-            
-            elif version == 'en':
-                # Clean English text
-                english_lines = []
-                if 'text' in data:
-                    for line in data['text']:
-                        english_lines.append(self.clean_english_text(line))
-                return {'hebrew': [], 'english': english_lines}
-            
-            else:  # he-en (both)
-                hebrew_lines = []
-                english_lines = []
-                
-                if 'he' in data:
-                    for line in data['he']:
-                        hebrew_lines.append(self.clean_hebrew_text(line))
-                
-                if 'text' in data:
-                    for line in data['text']:
-                        english_lines.append(self.clean_english_text(line))
-                
-                return {'hebrew': hebrew_lines, 'english': english_lines}
-                
+        except DownloadCancelled:
+            raise
         except Exception as e:
             print(f"Error downloading chapter: {e}")
             return {'hebrew': [], 'english': [], 'error': str(e)}
-    
-    def download_book(self, book_name: str, version: str = 'he') -> Dict:
-        """Download an entire book"""
+
+    def download_chapter_versions(self, book_name: str, chapter: int, versions: Iterable[str],
+                                  token: Optional[CancelToken] = None) -> Dict[str, Dict]:
+        """Download a chapter in several versions, sharing requests between them
+
+        Makes one request per batch_versions batch, taking a rate limiter
+        token before each, and returns the chapter data of every version.
+        """
+        versions = list(dict.fromkeys(versions))
+        results = {}
+        for batch in batch_versions(versions):
+            if token is not None:
+                token.check()
+            self.rate_limiter.acquire()
+            results[batch] = self.download_chapter(book_name, chapter, batch, token)
+        return split_versions(results, versions)
+
+    def download_span(self, book_name: str, first: int, last: int, version: str = 'he',
+                      token: Optional[CancelToken] = None) -> List[Tuple[int, Dict]]:
+        """Download chapters first..last with one Book.first-last range request
+
+        Feeds the response size and latency to span_sizer. If the range
+        request fails, each chapter is fetched on its own instead.
+
+        Span boundaries depend on timing, so the response cache stores a
+        range response per chapter, under the same keys as single-chapter
+        requests. A span whose chapters are all cached (or any span in
+        offline mode) is served from those entries without a range request.
+        """
+        if token is not None:
+            token.check()
+        
+        chapters = range(first, last + 1)
+        if self.cache is not None:
+            entries = [self.cache.get(self._chapter_key(book_name, chapter, version)) for chapter in chapters]
+            if self.offline or all(entry is not None and self.cache.is_fresh(entry) for entry in entries):
+                return [(chapter, self.download_chapter(book_name, chapter, version, token))
+                        for chapter in chapters]
+        
+        url = f"{self.base_url}/texts/{book_name}.{first}-{last}"
+        try:
+            start = time.perf_counter()
+            response = self.transport.get(url, params=chapter_params(version), token=token)
+            response.raise_for_status()
+            seconds = time.perf_counter() - start
+            raw_chapters = range_chapters(json.loads(response.content), len(chapters))
+        except DownloadCancelled:
+            raise
+        except Exception as e:
+            print(f"Error downloading {book_name} {first}-{last} ({e}), retrying chapter by chapter")
+            results = []
+            for chapter in chapters:
+                self.rate_limiter.acquire()
+                results.append(self.download_chapter(book_name, chapter, version, token))
+            return list(zip(chapters, results))
+        
+        self.span_sizer.record(len(chapters), len(response.content), seconds)
+        self._cache_chapters(book_name, first, raw_chapters, version)
+        return [(chapter, parse_chapter(data, version)) for chapter, data in zip(chapters, raw_chapters)]
+
+    def download_span_versions(self, book_name: str, first: int, last: int, versions: Iterable[str],
+                               token: Optional[CancelToken] = None) -> List[Tuple[int, Dict[str, Dict]]]:
+        """Download chapters first..last in several versions, one range request per version batch
+
+        Returns (chapter, {version: chapter data}) in chapter order.
+        """
+        versions = list(dict.fromkeys(versions))
+        spans = {}
+        for batch in batch_versions(versions):
+            if token is not None:
+                token.check()
+            self.rate_limiter.acquire()
+            spans[batch] = self.download_span(book_name, first, last, batch, token)
+        return [(chapter, split_versions({batch: span[i][1] for batch, span in spans.items()}, versions))
+                for i, chapter in enumerate(range(first, last + 1))]
+
+    def download_book_if_changed(self, book_name: str, version: str = 'he',
+                                 validators: Optional[Dict] = None) -> Optional[Dict]:
+        """Whole book in one Book.1-N request, conditional on the validators of a previous one
+
+        Returns None when the book has not changed. Otherwise returns
+        {'chapters': [chapter data, ...], 'validators': {...}}. The validators
+        hold the response's ETag and Last-Modified headers, the version titles
+        from the body, and a fingerprint of those versions' texts/versions
+        entries. They can be passed back on the next call.
+
+        Sefaria sends no ETag, so when validators carry version titles the
+        versions listing is fetched first. If its fingerprint is unchanged
+        the book body is not requested at all. The chapters of a fetched
+        book replace their entries in the response cache. Raises on failure.
+        """
         chapter_count = self.get_chapter_count(book_name)
         if chapter_count == 0:
-            return {'error': f'Could not determine chapter count for {book_name}'}
-        
-        print(f"Downloading {book_name} ({chapter_count} chapters)")
-        
-        all_text = {'hebrew': [], 'english': []}
-        
-        for chapter in range(1, chapter_count + 1):
-            print(f"Downloading Chapter {chapter}...")
-            
-            chapter_data = self.download_chapter(book_name, chapter, version)
-            
-            if 'error' not in chapter_data:
-                all_text['hebrew'].extend(chapter_data['hebrew'])
-                all_text['english'].extend(chapter_data['english'])
-            else:
-                print(f"Error in Chapter {chapter}: {chapter_data['error']}")
-            
-            # Rate limiting
-            time.sleep(0.5)
-        
-        return all_text
+            raise ValueError(f"Could not determine chapter count for {book_name}")
 
-class BibleDownloaderGUI:
-    """GUI for Bible Downloader"""
-    
-    def __init__(self):
-        self.root = tk.Tk()
-        self.root.title("Clean Bible Downloader - Sefaria")
-        self.root.geometry("800x700")
-        
-        self.downloader = CleanBibleDownloader()
-        
-        self.create_widgets()
-        
-        # Update chapter count when book changes
-        self.book_var.trace('w', self.update_chapter_range)
-    
-    def create_widgets(self):
-        """Create GUI widgets"""
-        # Title
-        title_label = tk.Label(self.root, text="Clean Bible Text Downloader", 
-                               font=('Arial', 16, 'bold'))
-        title_label.pack(pady=10)
-        
-        # Main frame
-        main_frame = tk.Frame(self.root)
-        main_frame.pack(fill='both', expand=True, padx=20, pady=10)
-        
-        # Book selection
-        book_frame = tk.LabelFrame(main_frame, text="Book Selection", font=('Arial', 12, 'bold'))
-        book_frame.pack(fill='x', pady=5)
-        
-        tk.Label(book_frame, text="Book:").grid(row=0, column=0, sticky='w', padx=5, pady=5)
-        
-        self.book_var = tk.StringVar(value='Genesis')
-        book_combo = ttk.Combobox(book_frame, textvariable=self.book_var, 
-                                  values=list(self.downloader.bible_books.values()),
-                                  width=30)
-        book_combo.grid(row=0, column=1, padx=5, pady=5, sticky='ew')
-        
-        book_frame.grid_columnconfigure(1, weight=1)
-        
-        # Version selection
-        version_frame = tk.LabelFrame(main_frame, text="Version", font=('Arial', 12, 'bold'))
-        version_frame.pack(fill='x', pady=5)
-        
-        tk.Label(version_frame, text="Version:").grid(row=0, column=0, sticky='w', padx=5, pady=5)
-        
-        self.version_var = tk.StringVar(value='he-en')
-        version_combo = ttk.Combobox(version_frame, textvariable=self.version_var,
-                                    values=list(self.downloader.versions.keys()),
-                                    width=30)
-        version_combo.grid(row=0, column=1, padx=5, pady=5, sticky='ew')
-        
-        # Version description
-        self.version_desc = tk.Label(version_frame, text="Hebrew + English (Side by side)", 
-                                   font=('Arial', 9), fg='gray')
-        self.version_desc.grid(row=1, column=1, padx=5, pady=2, sticky='w')
-        
-        version_frame.grid_columnconfigure(1, weight=1)
-        
-        # Update version description when version changes
-        self.version_var.trace('w', self.update_version_description)
-        
-        # Download options
-        options_frame = tk.LabelFrame(main_frame, text="Download Options", font=('Arial', 12, 'bold'))
-        
-        # Chapter selection
-        chapter_frame = tk.Frame(options_frame)
-        
-        self.download_type = tk.StringVar(value='chapter')
-        
-        rb1 = tk.Radiobutton(chapter_frame, text="Specific Chapter:", variable=self.download_type, 
-                            value='chapter', command=self.toggle_download_options)
-        rb1.pack(side='left', padx=5)
-        
-        self.chapter_var = tk.StringVar(value='1')
-        self.chapter_spinbox = ttk.Spinbox(chapter_frame, from_=1, to=1, 
-                                         textvariable=self.chapter_var, width=10)
-        self.chapter_spinbox.pack(side='left', padx=5)
-        
-        chapter_frame.pack(anchor='w', pady=5)
-        
-        rb2 = tk.Radiobutton(options_frame, text="Entire Book", variable=self.download_type, 
-                            value='book', command=self.toggle_download_options)
-        rb2.pack(anchor='w', padx=5, pady=5)
-        
-        options_frame.pack(fill='x', pady=5)
-        
-        # Output directory
-        output_frame = tk.LabelFrame(main_frame, text="Output", font=('Arial', 12, 'bold'))
-        
-        tk.Label(output_frame, text="Save to:").grid(row=0, column=0, sticky='w', padx=5, pady=5)
-        
-        self.output_var = tk.StringVar(value='clean_downloads')
-        output_entry = ttk.Entry(output_frame, textvariable=self.output_var, width=50)
-        output_entry.grid(row=0, column=1, padx=5, pady=5, sticky='ew')
-        
-        browse_btn = ttk.Button(output_frame, text="Browse", command=self.browse_output_dir)
-        browse_btn.grid(row=0, column=2, padx=5, pady=5)
-        
-        output_frame.grid_columnconfigure(1, weight=1)
-        output_frame.pack(fill='x', pady=5)
-        
-        # Preview area
-        preview_frame = tk.LabelFrame(main_frame, text="Preview", font=('Arial', 12, 'bold'))
-        preview_frame.pack(fill='both', expand=True, pady=5)
-        
-        self.preview_text = scrolledtext.ScrolledText(preview_frame, height=10, font=('David', 12))
-        self.preview_text.pack(fill='both', expand=True, padx=5, pady=5)
-        
-        # Button frame
-        button_frame = tk.Frame(main_frame)
-        
-        preview_btn = ttk.Button(button_frame, text="Preview Book Info", command=self.preview_book)
-        preview_btn.pack(side='left', padx=5)
-        
-        download_btn = ttk.Button(button_frame, text="Download", command=self.start_download)
-        download_btn.pack(side='left', padx=5)
-        
-        clear_btn = ttk.Button(button_frame, text="Clear Preview", command=self.clear_preview)
-        clear_btn.pack(side='left', padx=5)
-        
-        button_frame.pack(pady=10)
-    
-    def update_version_description(self, *args):
-        """Update version description label"""
-        version = self.version_var.get()
-        descriptions = {
-            'he': 'Hebrew (Original)',
-            'en': 'English Translation', 
-            'he-en': 'Hebrew + English (Side by side)'
+        listing = None
+        if validators and validators.get('versions'):
+            listing = self.book_versions(book_name)
+            revision = versions_fingerprint(listing, validators['versions'])
+            if revision is not None and revision == validators.get('revision'):
+                return None
+
+        headers = {}
+        if validators:
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+
+        ref = f"{book_name}.1" if chapter_count == 1 else f"{book_name}.1-{chapter_count}"
+        self.rate_limiter.acquire()
+        response = self.transport.get(f"{self.base_url}/texts/{ref}",
+                                      params=chapter_params(version), headers=headers)
+        if response.status_code == 304 and headers:
+            return None
+        response.raise_for_status()
+
+        data = json.loads(response.content)
+        titles = {key: data[key] for key in ('versionTitle', 'heVersionTitle') if data.get(key)}
+        if chapter_count == 1:
+            # Single-chapter books are requested as Book.1, which is not nested
+            data = {key: [value] for key, value in data.items() if key in ('he', 'text')}
+        chapters = range_chapters(data, chapter_count)
+        self._cache_chapters(book_name, 1, chapters, version)
+
+        if listing is None and titles:
+            listing = self.book_versions(book_name)
+        return {
+            'chapters': [parse_chapter(chapter, version) for chapter in chapters],
+            'validators': {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'versions': titles,
+                'revision': versions_fingerprint(listing or [], titles),
+            },
         }
-        self.version_desc.config(text=descriptions.get(version, ''))
-    
-    def update_chapter_range(self, *args):
-        """Update chapter range when book changes"""
-        book_name = self.downloader.bible_books.get(
-            list(self.downloader.bible_books.keys())[
-                list(self.downloader.bible_books.values()).index(self.book_var.get())
-            ]
-        )
-        
-        chapter_count = self.downloader.get_chapter_count(book_name)
-        self.chapter_spinbox.config(to=chapter_count)
-        
-        # Reset to chapter 1 if current selection exceeds range
-        current_chapter = int(self.chapter_var.get())
-        if current_chapter > chapter_count:
-            self.chapter_var.set('1')
-    
-    def toggle_download_options(self):
-        """Toggle download options based on selection"""
-        if self.download_type.get() == 'book':
-            self.chapter_spinbox.config(state='disabled')
-        else:
-            self.chapter_spinbox.config(state='normal')
-    
-    def browse_output_dir(self):
-        """Browse for output directory"""
-        directory = filedialog.askdirectory()
-        if directory:
-            self.output_var.set(directory)
-    
-    def preview_book(self):
-        """Preview book information"""
-        book_name = self.downloader.bible_books.get(
-            list(self.downloader.bible_books.keys())[
-                list(self.downloader.bible_books.values()).index(self.chapter_var.get())
-            ]
-        )
-        
-        if book_name:
-            chapter_count = self.downloader.get_chapter_count(book_name)
-            
-            preview_text = f"""Book: {self.book_var.get()} ({book_name})
-Version: {self.downloader.versions[self.version_var.get()]}
-Total Chapters: {chapter_count}
 
-Ready to download: {'Entire book' if self.download_type.get() == 'book' else f'Chapter {self.chapter_var.get()}'}
-Output Directory: {self.output_var.get()}
-"""
-            self.preview_text.delete(1.0, tk.END)
-            self.preview_text.insert(1.0, preview_text)
-    
-    def clear_preview(self):
-        """Clear preview text"""
-        self.preview_text.delete(1.0, tk.END)
-    
-    def start_download(self):
-        """Start the download process"""
-        # Run download in separate thread to avoid freezing GUI
-        thread = threading.Thread(target=self.download_worker)
-        thread.daemon = True
-        thread.start()
-    
-    def download_worker(self):
-        """Worker thread for download"""
-        try:
-            book_name = self.downloader.bible_books.get(
-                list(self.downloader.bible_books.keys())[
-                    list(self.downloader.bible_books.values()).index(self.book_var.get())
-                ]
-            )
+    def request_spans(self, chapters: List[int]) -> Iterator[List[int]]:
+        """Chapters grouped as they are requested: one per request, or spans in range mode"""
+        if self.range_fetch:
+            return self._spans(chapters)
+        return ([chapter] for chapter in chapters)
+    
+    def _spans(self, chapters: List[int]) -> Iterator[List[int]]:
+        """Split chapters into runs of consecutive chapters sized by span_sizer"""
+        position = 0
+        while position < len(chapters):
+            span = [chapters[position]]
+            limit = self.span_sizer.span
+            while (len(span) < limit and position + len(span) < len(chapters)
+                   and chapters[position + len(span)] == span[-1] + 1):
+                span.append(chapters[position + len(span)])
+            position += len(span)
+            yield span
+    
+    def iter_chapters(self, book_name: str, chapters: Iterable[int], version: str = 'he',
+                      max_workers: Optional[int] = None,
+                      token: Optional[CancelToken] = None) -> Iterator[Tuple[int, Dict]]:
+        """Download chapters concurrently, yielding (chapter, data) in chapter order"""
+        chapters = list(chapters)
+        workers = max(1, min(max_workers or self.max_workers, len(chapters) or 1))
+        
+        def fetch(span: List[int]) -> List[Tuple[int, Dict]]:
+            if token is not None:
+                token.check()
+            self.rate_limiter.acquire()
             
-            version = self.version_var.get()
-            output_dir = self.output_var.get()
+            if len(span) == 1:
+                print(f"Downloading {book_name} Chapter {span[0]}...")
+                return [(span[0], self.download_chapter(book_name, span[0], version, token))]
             
-            # Create output directory
-            Path(output_dir).mkdir(parents=True, exist_ok=True)
+            print(f"Downloading {book_name} Chapters {span[0]}-{span[-1]}...")
+            return self.download_span(book_name, span[0], span[-1], version, token)
+        
+        # Each request covers one chapter, or in range mode a span of consecutive
+        # chapters whose size adapts as responses come back
+        spans = self.request_spans(chapters)
+        
+        if workers == 1:
+            for span in spans:
+                yield from fetch(span)
+            return
+        
+        # Keep a bounded window of requests in flight so finished chapters
+        # never pile up in memory ahead of the consumer
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
             
-            if self.download_type.get() == 'book':
-                # Download entire book
-                self.preview_text.insert(tk.END, f"\nStarting download of entire {self.book_var.get()}...\n")
-                self.root.update()
-                
-                data = self.downloader.download_book(book_name, version)
-                
-                if 'error' not in data:
-                    self.save_clean_text(data, output_dir, f"{book_name}_complete", version)
-                    self.preview_text.insert(tk.END, f"Download completed! Saved to {output_dir}\n")
-                else:
-                    self.preview_text.insert(tk.END, f"Error: {data['error']}\n")
+            for span in islice(spans, workers * 2):
+                pending.append(executor.submit(fetch, span))
             
-            else:
-                # Download specific chapter
-                chapter = int(self.chapter_var.get())
-                self.preview_text.insert(tk.END, f"\nDownloading {self.book_var.get()} Chapter {chapter}...\n")
-                self.root.update()
-                
-                data = self.downloader.download_chapter(book_name, chapter, version)
-                
-                if 'error' not in data:
-                    self.save_clean_text(data, output_dir, f"{book_name}_chapter_{chapter}", version)
-                    self.preview_text.insert(tk.END, f"Download completed! Saved to {output_dir}\n")
-                else:
-                    self.preview_text.insert(tk.END, f"Error: {data['error']}\n")
-                    
-        except Exception as e:
-            self.preview_text.insert(tk.END, f"Download error: {str(e)}\n")
-        
-        self.root.update()
+            try:
+                while pending:
+                    future = pending.popleft()
+                    for next_span in islice(spans, 1):
+                        pending.append(executor.submit(fetch, next_span))
+                    yield from future.result()
+            finally:
+                # On cancellation (or an abandoned iterator) drop queued chapters
+                # so shutdown only waits for requests already in flight
+                for future in pending:
+                    future.cancel()
     
-    def save_clean_text(self, data: Dict, output_dir: str, filename: str, version: str):
-        """Save clean text to files"""
-        
-        # Save Hebrew text
-        if data['hebrew']:
-            hebrew_file = Path(output_dir) / f"{filename}_hebrew_clean.txt"
-            with open(hebrew_file, 'w', encoding='utf-8') as f:
-                f.write(f"Clean Hebrew Text - {filename}\n")
-                f.write("=" * 50 + "\n\n")
-                for line in data['hebrew']:
-                    f.write(line + "\n")
+    def download_book(self, book_name: str, version: str = 'he',
+                      max_workers: Optional[int] = None,
+                      progress: Optional[ProgressCallback] = None,
+                      token: Optional[CancelToken] = None) -> Dict:
+        """Download an entire book, fetching chapters concurrently
+
+        Returns flat 'hebrew' / 'english' lists plus 'verses', a VerseTable
+        addressing them by chapter and verse. If token is cancelled the
+        chapters downloaded so far are returned, with 'cancelled' set.
+        """
+        chapter_count = self.get_chapter_count(book_name)
+        if chapter_count == 0:
+            return {'error': f'Could not determine chapter count for {book_name}'}
         
-        # Save English text
-        if data['english']:
-            english_file = Path(output_dir) / f"{filename}_english_clean.txt"
-            with open(english_file, 'w', encoding='utf-8') as f:
-                f.write(f"Clean English Text - {filename}\n")
-                f.write("=" * 50 + "\n\n")
-                for line in data['english']:
-                    f.write(line + "\n")
+        print(f"Downloading {book_name} ({chapter_count} chapters)")
         
-        # Save combined text
-        if data['hebrew'] and data['english']:
-            combined_file = Path(output_dir) / f"{filename}_parallel_clean.txt"
-            with open(combined_file, 'w', encoding='utf-8') as f:
-                f.write(f"Parallel Hebrew-English Text - {filename}\n")
-                f.write("=" * 50 + "\n\n")
-                
-                # Determine which array is longer
-                max_lines = max(len(data['hebrew']), len(data['english']))
-                
-                for i in range(max_lines):
-                    hebrew_line = data['hebrew'][i] if i < len(data['hebrew']) else ""
-                    english_line = data['english'][i] if i < len(data['english']) else ""
-                    
-                    f.write(f"\n--- Verse {i+1} ---\n")
-                    f.write(f"Hebrew:  {hebrew_line}\n")
-                    f.write(f"English: {english_line}\n")
+        table = VerseTable()
+        all_text = table.as_result()
         
-        # Show preview of downloaded content
-        self.preview_text.insert(tk.END, f"\nSaved files:\n")
+        try:
+            for chapter, chapter_data in self.iter_chapters(book_name, range(1, chapter_count + 1),
+                                                            version, max_workers, token):
+                if 'error' not in chapter_data:
+                    table.add_chapter(book_name, chapter, chapter_data['hebrew'], chapter_data['english'])
+                else:
+                    print(f"Error in Chapter {chapter}: {chapter_data['error']}")
+                if progress is not None:
+                    progress(chapter, chapter_count, chapter_data)
+        except DownloadCancelled:
+            print(f"Download of {book_name} cancelled")
+            all_text['cancelled'] = True
+        finally:
+            if self.cache is not None:
+                self.cache.flush()
         
-        if data['hebrew']:
-            self.preview_text.insert(tk.END, f"- {filename}_hebrew_clean.txt\n")
+        return all_text
+    
+    def stream_book(self, book_name: str, writer, version: str = 'he',
+                    max_workers: Optional[int] = None,
+                    progress: Optional[ProgressCallback] = None,
+                    token: Optional[CancelToken] = None) -> Dict:
+        """Download an entire book, passing each chapter to writer.write_chapter(data, chapter) in order
+
+        If token is cancelled, chapters already written stay written and the
+        result has 'cancelled' set.
+        """
+        chapter_count = self.get_chapter_count(book_name)
+        if chapter_count == 0:
+            return {'error': f'Could not determine chapter count for {book_name}'}
         
-        if data['english']:
-            self.preview_text.insert(tk.END, f"- {filename}_english_clean.txt\n")
+        print(f"Streaming {book_name} ({chapter_count} chapters)")
         
-        if data['hebrew'] and data['english']:
-            self.preview_text.insert(tk.END, f"- {filename}_parallel_clean.txt\n")
-    
-    def run(self):
-        """Run the GUI"""
-        self.root.mainloop()
+        written = 0
+        failed = []
+        result = {}
+        try:
+            for chapter, chapter_data in self.iter_chapters(book_name, range(1, chapter_count + 1),
+                                                            version, max_workers, token):
+                if 'error' not in chapter_data:
+                    writer.write_chapter(chapter_data, chapter)
+                    written += 1
+                else:
+                    failed.append(chapter)
+                    print(f"Error in Chapter {chapter}: {chapter_data['error']}")
+                if progress is not None:
+                    progress(chapter, chapter_count, chapter_data)
+        except DownloadCancelled:
+            print(f"Download of {book_name} cancelled after {written} chapters")
+            result['cancelled'] = True
+        finally:
+            if self.cache is not None:
+                self.cache.flush()
+        
+        return {'chapters': written, 'failed': failed, **result}
+
+def __getattr__(name: str):
+    # The GUI lives in its own module so importing the core never loads tkinter
+    if name == 'BibleDownloaderGUI':
+        from bible_downloader_gui import BibleDownloaderGUI
+        return BibleDownloaderGUI
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def main(argv=None) -> int:
+    """Headless CLI entry point (see bible_cli)"""
+    from bible_cli import main as cli_main
+    return cli_main(argv)
 
 if __name__ == "__main__":
-    try:
-        app = BibleDownloaderGUI()
-        app.run()
-    except Exception as e:
-        print(f"Error starting GUI: {e}")
-        print("Make sure tkinter is installed: sudo apt-get install python3-tk")
+    if len(sys.argv) > 1:
+        sys.exit(main())
+
+    from bible_downloader_gui import main as gui_main
+    sys.exit(gui_main())
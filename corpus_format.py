@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Compact Corpus Format
+
+Stores a cleaned corpus as one file: a small JSON header (book names and
+chapter counts), an offset table indexed by book/chapter/verse, and a UTF-8
+blob holding every Hebrew verse followed by every English verse. Opened
+with mmap, any verse is a zero-copy slice of the file.
+
+File layout (native byte order, recorded in the header):
+
+    magic          8 bytes   b'BIBCORP1'
+    header_len     u32
+    header         JSON, padded to 8 bytes
+    chapter_start  u32[n_chapters + 1]   first verse row of each chapter
+    he_offsets     u32[n_verses + 1]     Hebrew verse byte offsets into blob
+    en_offsets     u32[n_verses + 1]     English verse byte offsets into blob
+    blob           UTF-8 text
+"""
+
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from chapter_index import ChapterIndex, load_chapter_index
+
+MAGIC = b'BIBCORP1'
+FORMAT_VERSION = 1
+LANGUAGES = ('hebrew', 'english')
+
+def _pad(length: int) -> int:
+    return -length % 8
+
+def write_corpus(path: str, books: Iterable[Tuple[str, List[Dict]]]):
+    """Write books given as (book_name, [{'hebrew': [...], 'english': [...]}, ...])"""
+    book_table = []
+    chapter_start = array('I', [0])
+    offsets = {language: array('I', [0]) for language in LANGUAGES}
+    blobs = {language: bytearray() for language in LANGUAGES}
+
+    for book_name, chapters in books:
+        book_table.append([book_name, len(chapters)])
+
+        for chapter in chapters:
+            rows = max(len(chapter.get('hebrew', [])), len(chapter.get('english', [])))
+
+            for language in LANGUAGES:
+                lines = chapter.get(language, [])
+                blob = blobs[language]
+                for i in range(rows):
+                    if i < len(lines):
+                        blob += lines[i].encode('utf-8')
+                    offsets[language].append(len(blob))
+
+            chapter_start.append(chapter_start[-1] + rows)
+
+    # English offsets are relative to the start of the blob, after the Hebrew text
+    hebrew_size = len(blobs['hebrew'])
+    english_offsets = array('I', (offset + hebrew_size for offset in offsets['english']))
+    if hebrew_size + len(blobs['english']) >= 2 ** 32:
+        raise ValueError("Corpus text exceeds the 4 GiB limit of the offset table")
+
+    header = json.dumps({
+        'version': FORMAT_VERSION,
+        'byteorder': sys.byteorder,
+        'books': book_table,
+        'chapters': len(chapter_start) - 1,
+        'verses': chapter_start[-1],
+    }, ensure_ascii=False).encode('utf-8')
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('=I', len(header)))
+        f.write(header + b'\0' * _pad(len(MAGIC) + 4 + len(header)))
+        chapter_start.tofile(f)
+        offsets['hebrew'].tofile(f)
+        english_offsets.tofile(f)
+        f.write(blobs['hebrew'])
+        f.write(blobs['english'])
+    os.replace(tmp_path, path)
+
+class CorpusReader:
+    """Memory-mapped, zero-copy verse access to a corpus file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+
+        if view[:len(MAGIC)] != MAGIC:
+            self._abort(view)
+            raise ValueError(f"{path} is not a corpus file")
+
+        (header_len,) = struct.unpack_from('=I', view, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(bytes(view[start:start + header_len]))
+
+        if header['version'] != FORMAT_VERSION or header['byteorder'] != sys.byteorder:
+            self._abort(view)
+            raise ValueError(f"Unsupported corpus file {path}: version {header['version']}, "
+                             f"{header['byteorder']} endian")
+
+        pos = start + header_len + _pad(start + header_len)
+        n_chapters, n_verses = header['chapters'], header['verses']
+
+        def table(count: int) -> memoryview:
+            nonlocal pos
+            size = count * 4
+            result = view[pos:pos + size].cast('I')
+            pos += size
+            return result
+
+        self.chapter_start = table(n_chapters + 1)
+        self.offsets = {'hebrew': table(n_verses + 1), 'english': table(n_verses + 1)}
+        self._blob_start = pos
+        self._view = view
+
+        self.books: List[str] = []
+        self._first_chapter: Dict[str, int] = {}
+        self._chapter_counts: Dict[str, int] = {}
+
+        chapter = 0
+        for book_name, chapter_count in header['books']:
+            self.books.append(book_name)
+            self._first_chapter[book_name] = chapter
+            self._chapter_counts[book_name] = chapter_count
+            chapter += chapter_count
+
+    def _abort(self, view: memoryview):
+        view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def close(self):
+        """Release the memory map (verse slices handed out must be released first)"""
+        for view in (self.chapter_start, *self.offsets.values(), self._view):
+            view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def chapter_count(self, book_name: str) -> int:
+        return self._chapter_counts.get(book_name, 0)
+
+    def _chapter_row(self, book_name: str, chapter: int) -> int:
+        if not 1 <= chapter <= self._chapter_counts.get(book_name, 0):
+            raise KeyError(f"{book_name} {chapter}")
+        return self._first_chapter[book_name] + chapter - 1
+
+    def verse_count(self, book_name: str, chapter: int) -> int:
+        row = self._chapter_row(book_name, chapter)
+        return self.chapter_start[row + 1] - self.chapter_start[row]
+
+    def verse_row(self, book_name: str, chapter: int, verse: int) -> int:
+        """Global row number of a verse, in O(1)"""
+        row = self._chapter_row(book_name, chapter)
+        first, end = self.chapter_start[row], self.chapter_start[row + 1]
+        if not 1 <= verse <= end - first:
+            raise KeyError(f"{book_name} {chapter}:{verse}")
+        return first + verse - 1
+
+    def row_bytes(self, row: int, language: str = 'hebrew') -> memoryview:
+        """UTF-8 bytes of a verse row as a zero-copy slice of the file"""
+        offsets = self.offsets[language]
+        start = self._blob_start + offsets[row]
+        return self._view[start:self._blob_start + offsets[row + 1]]
+
+    def verse_bytes(self, book_name: str, chapter: int, verse: int,
+                    language: str = 'hebrew') -> memoryview:
+        """UTF-8 bytes of a verse as a zero-copy slice of the file"""
+        return self.row_bytes(self.verse_row(book_name, chapter, verse), language)
+
+    def verse(self, book_name: str, chapter: int, verse: int, language: str = 'hebrew') -> str:
+        """Text of a verse"""
+        return str(self.verse_bytes(book_name, chapter, verse, language), 'utf-8')
+
+    def chapter(self, book_name: str, chapter: int, language: str = 'hebrew') -> List[str]:
+        """All verses of a chapter"""
+        row = self._chapter_row(book_name, chapter)
+        first, end = self.chapter_start[row], self.chapter_start[row + 1]
+        return [str(self.row_bytes(r, language), 'utf-8') for r in range(first, end)]
+
+    def iter_verses(self, language: str = 'hebrew') -> Iterator[Tuple[str, int, int, str]]:
+        """Yield (book, chapter, verse, text) for the whole corpus in order"""
+        for book_name in self.books:
+            for chapter in range(1, self._chapter_counts[book_name] + 1):
+                for verse, text in enumerate(self.chapter(book_name, chapter, language), 1):
+                    yield book_name, chapter, verse, text
+
+# Files written by save_clean_text / StreamingBookWriter
+_OUTPUT_RE = re.compile(r'^(?P<book>.+?)_(?:chapter_(?P<chapter>\d+)|complete)_'
+                        r'(?P<kind>hebrew|english|parallel)_clean\.txt$')
+_PARALLEL_VERSE_RE = re.compile(r'^--- Verse (?:(?P<chapter>\d+):)?(?P<verse>\d+) ---$')
+
+def _read_lines(path: Path) -> List[str]:
+    """Verse lines of a _hebrew_clean / _english_clean file, without the banner"""
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.read().split('\n')
+    # Banner: title, '=====', blank line; the file ends with a newline
+    body = lines[3:]
+    if body and body[-1] == '':
+        body.pop()
+    return body
+
+def _read_parallel(path: Path) -> Tuple[List[str], List[str]]:
+    """Hebrew and English verse lists of a _parallel_clean file"""
+    hebrew, english = [], []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if line.startswith('Hebrew:  '):
+                hebrew.append(line[len('Hebrew:  '):])
+            elif line.startswith('English: '):
+                english.append(line[len('English: '):])
+    return hebrew, english
+
+def _read_parallel_chapters(path: Path) -> Optional[List[Dict[str, List[str]]]]:
+    """Per-chapter verse lists of a parallel file labelled chapter:verse, else None"""
+    chapters: Dict[int, Dict[str, List[str]]] = {}
+    current = None
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            match = _PARALLEL_VERSE_RE.match(line)
+            if match:
+                if match.group('chapter') is None:
+                    return None
+                current = chapters.setdefault(int(match.group('chapter')), {'hebrew': [], 'english': []})
+            elif current is not None and line.startswith('Hebrew:  '):
+                current['hebrew'].append(line[len('Hebrew:  '):])
+            elif current is not None and line.startswith('English: '):
+                current['english'].append(line[len('English: '):])
+
+    if not chapters:
+        return None
+    return [chapters.get(n, {'hebrew': [], 'english': []}) for n in range(1, max(chapters) + 1)]
+
+def _split_book(lines: List[str], verse_counts: List[int]) -> List[List[str]]:
+    chapters, pos = [], 0
+    for count in verse_counts:
+        chapters.append(lines[pos:pos + count])
+        pos += count
+    return chapters
+
+def convert_text_outputs(input_dir: str, output_path: str,
+                         chapter_index: Optional[ChapterIndex] = None) -> Dict:
+    """Build a corpus file from a directory of downloaded .txt outputs
+
+    Per-chapter files map directly onto chapters, as do whole-book
+    parallel files labelled chapter:verse. Other whole-book files (such
+    as Hebrew-only or English-only downloads) are split using the verse
+    counts in the chapter index. Books whose line count does not match
+    those counts are skipped and reported in 'skipped'.
+    """
+    chapter_index = chapter_index or load_chapter_index()
+    found: Dict[str, Dict] = {}
+
+    for path in sorted(Path(input_dir).iterdir()):
+        match = _OUTPUT_RE.match(path.name)
+        if not match:
+            continue
+        key = int(match.group('chapter')) if match.group('chapter') else 'complete'
+        found.setdefault(match.group('book'), {}).setdefault(key, {})[match.group('kind')] = path
+
+    books, skipped = [], []
+    order = {name: i for i, name in enumerate(chapter_index.books)}
+
+    for book_name in sorted(found, key=lambda name: (order.get(name, len(order)), name)):
+        parts = found[book_name]
+
+        def load(files: Dict) -> Dict[str, List[str]]:
+            if 'hebrew' in files or 'english' in files:
+                return {language: _read_lines(files[language]) if language in files else []
+                        for language in LANGUAGES}
+            hebrew, english = _read_parallel(files['parallel'])
+            return {'hebrew': hebrew, 'english': english}
+
+        labelled = None
+        if 'complete' in parts and 'parallel' in parts['complete']:
+            labelled = _read_parallel_chapters(parts['complete']['parallel'])
+
+        if labelled:
+            chapters = labelled
+        elif 'complete' in parts:
+            verse_counts = chapter_index.verse_counts(book_name)
+            if not verse_counts:
+                skipped.append(book_name)
+                print(f"Skipping {book_name}: whole-book file needs verse counts in the chapter index")
+                continue
+
+            text = load(parts['complete'])
+            mismatched = {language: len(lines) for language, lines in text.items()
+                          if lines and len(lines) != sum(verse_counts)}
+            if mismatched:
+                skipped.append(book_name)
+                print(f"Skipping {book_name}: expected {sum(verse_counts)} verses, found {mismatched}")
+                continue
+            split = {language: _split_book(text[language], verse_counts) for language in LANGUAGES}
+            chapters = [{language: split[language][i] for language in LANGUAGES}
+                        for i in range(len(verse_counts))]
+        else:
+            # Chapters not downloaded are stored empty so numbering stays aligned
+            last = max(parts)
+            chapters = [load(parts[n]) if n in parts else {'hebrew': [], 'english': []}
+                        for n in range(1, last + 1)]
+
+        books.append((book_name, chapters))
+
+    write_corpus(output_path, books)
+    return {'books': [name for name, _ in books], 'skipped': skipped}
+
+def convert_bulk_download(input_dir: str, output_path: str) -> Dict:
+    """Build a corpus file from a BulkDownloader output directory"""
+    with open(Path(input_dir) / 'manifest.json', 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    def chapters(book_name: str) -> List[Dict]:
+        done = set(manifest['completed'].get(book_name, []))
+        result = []
+        for chapter in range(1, manifest['chapter_counts'][book_name] + 1):
+            if chapter in done:
+                with open(Path(input_dir) / 'chapters' / book_name / f"{chapter}.json",
+                          'r', encoding='utf-8') as f:
+                    result.append(json.load(f))
+            else:
+                result.append({'hebrew': [], 'english': []})
+        return result
+
+    books = [name for name in manifest['chapter_counts'] if manifest['completed'].get(name)]
+    write_corpus(output_path, ((name, chapters(name)) for name in books))
+    return {'books': books, 'skipped': []}
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == 'convert':
+        input_dir, output_path = sys.argv[2], sys.argv[3]
+        if (Path(input_dir) / 'manifest.json').exists():
+            result = convert_bulk_download(input_dir, output_path)
+        else:
+            result = convert_text_outputs(input_dir, output_path)
+        print(f"Wrote {output_path}: {len(result['books'])} books")
+        return 0
+
+    if len(sys.argv) in (5, 6) and sys.argv[1] == 'show':
+        with CorpusReader(sys.argv[2]) as corpus:
+            book_name, chapter = sys.argv[3], int(sys.argv[4])
+            if len(sys.argv) == 6:
+                verse = int(sys.argv[5])
+                print(corpus.verse(book_name, chapter, verse, 'hebrew'))
+                print(corpus.verse(book_name, chapter, verse, 'english'))
+            else:
+                for line in corpus.chapter(book_name, chapter, 'hebrew'):
+                    print(line)
+        return 0
+
+    print("Usage: corpus_format.py convert <download_dir> <corpus_file>")
+    print("       corpus_format.py show <corpus_file> <book> <chapter> [verse]")
+    return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
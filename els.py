@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Equidistant Letter Sequence Search
+
+Finds a term spelled out at a fixed skip through the consonant stream of the
+cleaned Hebrew corpus. The stream is GematriaCorpus.letters with final
+letters folded to their regular forms (one uint8 code per letter, every
+letter position preserved), plus a position list per letter.
+
+A search anchors on the term's rarest letter: at each skip, the occurrences
+of that letter whose sequence fits in the stream (one searchsorted slice of
+its sorted positions) are the candidates, and the other letters are checked
+with vectorized fancy indexing, rarest first, so the candidate array shrinks
+as early as possible. Negative skips read the stream backwards. Blocks of
+skips are spread over a process pool.
+
+Requires NumPy (the 'analysis' extra).
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError("els requires NumPy: pip install numpy") from e
+
+from gematria import FINAL_FORMS, LETTERS, GematriaCorpus, letter_codes
+
+# Code -> code with final letters folded to their regular forms
+_FOLD = np.arange(len(LETTERS) + 1, dtype=np.uint8)
+for _final, _regular in FINAL_FORMS.items():
+    _FOLD[LETTERS.index(_final) + 1] = LETTERS.index(_regular) + 1
+
+# Skips per task handed to the process pool
+SKIPS_PER_TASK = 256
+
+def fold_finals(codes: 'np.ndarray') -> 'np.ndarray':
+    """Letter codes with final letters folded to their regular forms"""
+    return _FOLD[codes]
+
+def term_codes(term: str) -> 'np.ndarray':
+    """Folded letter codes of an ELS term"""
+    return fold_finals(letter_codes(term))
+
+def letter_positions(letters: 'np.ndarray') -> List['np.ndarray']:
+    """Sorted positions of each letter code: one stable sort, split at the code boundaries"""
+    order = np.argsort(letters, kind='stable').astype(np.int32)
+    bounds = np.concatenate(([0], np.cumsum(np.bincount(letters, minlength=len(_FOLD)))))
+    return [order[bounds[code]:bounds[code + 1]] for code in range(len(_FOLD))]
+
+def search_skips(letters: 'np.ndarray', positions: Sequence['np.ndarray'], term: 'np.ndarray',
+                 skips: 'np.ndarray') -> List[Tuple[int, int]]:
+    """(start, skip) of every occurrence of term at the given skips
+
+    positions[code] lists the (sorted) positions of each letter code in letters.
+    """
+    n = len(letters)
+    k = len(term)
+    if k == 0 or len(skips) == 0:
+        return []
+
+    # Check letters from rarest to most common; the rarest is the anchor
+    order = sorted(range(k), key=lambda i: len(positions[term[i]]))
+    anchor = order[0]
+    anchor_positions = positions[term[anchor]]
+    checks = [(i - anchor, term[i]) for i in order[1:]]
+
+    # The anchors whose sequence fits in the stream are one contiguous slice
+    # per skip: the sequence spans anchor - before .. anchor + after
+    skips = np.asarray(skips, dtype=np.int64)
+    before = np.maximum(anchor * skips, -(k - 1 - anchor) * skips)
+    after = np.maximum((k - 1 - anchor) * skips, -anchor * skips)
+    lows = np.searchsorted(anchor_positions, before, side='left').tolist()
+    highs = np.searchsorted(anchor_positions, n - after, side='left').tolist()
+
+    hits = []
+    for skip, low, high in zip(skips.tolist(), lows, highs):
+        candidates = anchor_positions[low:high]
+        for offset, code in checks:
+            candidates = candidates[letters[candidates + offset * skip] == code]
+            if len(candidates) == 0:
+                break
+        else:
+            hits.extend((start - anchor * skip, skip) for start in candidates.tolist())
+    return hits
+
+# Worker state, set once per process by _init_worker
+_worker_letters: Optional['np.ndarray'] = None
+_worker_positions: Optional[List['np.ndarray']] = None
+
+def _init_worker(letters: 'np.ndarray', positions: List['np.ndarray']):
+    global _worker_letters, _worker_positions
+    _worker_letters, _worker_positions = letters, positions
+
+def _search_task(term: 'np.ndarray', skips: 'np.ndarray') -> List[Tuple[int, int]]:
+    return search_skips(_worker_letters, _worker_positions, term, skips)
+
+class ELSIndex:
+    """Folded letter stream of a corpus with per-letter positions and verse lookup"""
+
+    def __init__(self, corpus: GematriaCorpus):
+        self.corpus = corpus
+        self.letters = fold_finals(corpus.letters)
+        self.positions = letter_positions(self.letters)
+
+    @classmethod
+    def from_verses(cls, verses: Iterable[Tuple[str, int, int, str]]) -> 'ELSIndex':
+        """Build from (book, chapter, verse, hebrew_text) tuples"""
+        return cls(GematriaCorpus.from_verses(verses))
+
+    @classmethod
+    def from_corpus(cls, corpus) -> 'ELSIndex':
+        """Build from a corpus_format.CorpusReader (or anything with iter_verses)"""
+        return cls.from_verses(corpus.iter_verses('hebrew'))
+
+    def __len__(self) -> int:
+        return len(self.letters)
+
+    def verse_ref(self, position: int) -> Tuple[str, int, int]:
+        """(book, chapter, verse) containing a letter position"""
+        row = int(np.searchsorted(self.corpus.verse_letter_starts, position, side='right')) - 1
+        return self.corpus.verse_ref(row)
+
+    def hit(self, term: str, start: int, skip: int, length: Optional[int] = None) -> Dict:
+        """A hit with the verse references of its first and last letters"""
+        end = start + ((length or len(term_codes(term))) - 1) * skip
+        return {
+            'term': term, 'start': start, 'skip': skip,
+            'start_ref': self.verse_ref(start), 'end_ref': self.verse_ref(end),
+        }
+
+    def search_terms(self, terms: Sequence[str], min_skip: int = 1, max_skip: int = 1000,
+                     both_directions: bool = True,
+                     workers: Optional[int] = None) -> Dict[str, List[Dict]]:
+        """Hits of each term at skips min_skip..max_skip, ordered by |skip| then start
+
+        With both_directions, negative skips (the term read backwards) are
+        searched too. workers=1 searches in this process; otherwise skip
+        blocks go to a process pool shared by all terms.
+        """
+        if not 1 <= min_skip <= max_skip:
+            raise ValueError("skips must satisfy 1 <= min_skip <= max_skip")
+
+        skips = np.arange(min_skip, max_skip + 1, dtype=np.int64)
+        if both_directions:
+            skips = np.concatenate((skips, -skips))
+        tasks = [skips[i:i + SKIPS_PER_TASK] for i in range(0, len(skips), SKIPS_PER_TASK)]
+        codes = {term: term_codes(term) for term in terms}
+
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(tasks) == 1:
+            found = {term: [pair for task in tasks
+                            for pair in search_skips(self.letters, self.positions, codes[term], task)]
+                     for term in terms}
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(self.letters, self.positions)) as executor:
+                futures = {term: [executor.submit(_search_task, codes[term], task) for task in tasks]
+                           for term in terms}
+                found = {term: [pair for future in term_futures for pair in future.result()]
+                         for term, term_futures in futures.items()}
+
+        return {term: [self.hit(term, start, skip, len(codes[term]))
+                       for start, skip in sorted(pairs, key=lambda pair: (abs(pair[1]), pair[1] < 0, pair[0]))]
+                for term, pairs in found.items()}
+
+    def search(self, term: str, min_skip: int = 1, max_skip: int = 1000,
+               both_directions: bool = True, workers: Optional[int] = None) -> List[Dict]:
+        """Hits of one term; see search_terms"""
+        return self.search_terms([term], min_skip, max_skip, both_directions, workers)[term]
+
+def main():
+    if len(sys.argv) in (4, 5, 6):
+        from corpus_format import CorpusReader
+
+        corpus_file, term = sys.argv[1], sys.argv[2]
+        max_skip = int(sys.argv[3])
+        min_skip = int(sys.argv[4]) if len(sys.argv) > 4 else 1
+        workers = int(sys.argv[5]) if len(sys.argv) > 5 else None
+
+        with CorpusReader(corpus_file) as corpus:
+            index = ELSIndex.from_corpus(corpus)
+        for hit in index.search(term, min_skip, max_skip, workers=workers):
+            book_name, chapter, verse = hit['start_ref']
+            print(f"skip {hit['skip']:6d}  letter {hit['start']:8d}  {book_name} {chapter}:{verse}")
+        return 0
+
+    print("Usage: els.py <corpus_file> <term> <max_skip> [min_skip] [workers]")
+    return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Letter and N-gram Frequency Analysis
+
+Letter, n-gram and word frequency distributions over the cleaned Hebrew
+corpus, per verse, chapter and book. Everything is counted with
+np.bincount (or np.unique where a dense table would be too large) on the
+GematriaCorpus letter codes: a count for segment s and item x is bin
+s * size + x, so one call counts every segment at once.
+
+N-grams are runs of n letters inside one word, counted per book, chapter
+and verse; words are counted per book by a base-28 integer key of their
+letters. Results are computed per book and
+cached, and export() writes one columnar JSON file per book plus an index
+for the web front end:
+
+    analytics/index.json        books, alphabet, totals
+    analytics/<Book>.json       parallel arrays, e.g. ngrams['2'].gram[i] / .count[i]
+
+Per-chapter and per-verse n-gram tables are sparse: only (segment, gram)
+pairs that occur are listed. Per-verse trigram tables exceed the dense
+limit in most books, so they are counted with np.unique.
+
+Requires NumPy (the 'analysis' extra).
+"""
+
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError("frequency_analysis requires NumPy: pip install numpy") from e
+
+from gematria import LETTERS, GematriaCorpus
+
+# Letter codes are 1..27, so 28 symbols per position
+BASE = len(LETTERS) + 1
+
+# Largest segments * 28^n table counted densely with bincount
+DENSE_LIMIT = 1 << 24
+
+# Words longer than this do not fit a uint64 base-28 key and are counted separately
+MAX_KEY_LETTERS = 13
+
+FORMAT_VERSION = 2
+
+def _counts(keys: 'np.ndarray', size: int) -> Tuple['np.ndarray', 'np.ndarray']:
+    """(key, count) of every key that occurs, in key order"""
+    if size <= DENSE_LIMIT:
+        counts = np.bincount(keys, minlength=size)
+        present = np.flatnonzero(counts)
+        return present, counts[present]
+    return np.unique(keys, return_counts=True)
+
+def decode_grams(keys: 'np.ndarray', n: int) -> List[str]:
+    """Letters of base-28 n-gram keys, decoded for all keys at once"""
+    digits = (keys[:, None] // BASE ** np.arange(n - 1, -1, -1)) % BASE
+    text = (digits + (ord(LETTERS[0]) - 1)).astype('<u4').tobytes().decode('utf-32-le')
+    return [text[i:i + n] for i in range(0, len(text), n)]
+
+class BookFrequencies:
+    """Letter, n-gram and word counts of one book"""
+
+    def __init__(self, corpus: GematriaCorpus, book_row: int, ngram_sizes: Tuple[int, ...] = (2, 3)):
+        book_starts = corpus.book_verse_starts
+        first_verse = int(book_starts[book_row])
+        end_verse = int(book_starts[book_row + 1]) if book_row + 1 < len(book_starts) else len(corpus.verse_book)
+
+        verse_starts = corpus.verse_letter_starts
+        first_letter = int(verse_starts[first_verse])
+        end_letter = int(verse_starts[end_verse]) if end_verse < len(verse_starts) else len(corpus.letters)
+
+        self.book = corpus.book_names[corpus.verse_book[first_verse]]
+        self.verse_chapter = corpus.verse_chapter[first_verse:end_verse]
+        self.verse_number = corpus.verse_number[first_verse:end_verse]
+        self.chapters = np.unique(self.verse_chapter)
+
+        letters = corpus.letters[first_letter:end_letter].astype(np.int64)
+        self.source_hash = hashlib.sha1(letters.astype(np.uint8).tobytes()).hexdigest()
+
+        # Verse and chapter row of every letter
+        verse_lengths = np.diff(verse_starts[first_verse:end_verse], append=end_letter)
+        letter_verse = np.repeat(np.arange(end_verse - first_verse), verse_lengths)
+        chapter_row = np.searchsorted(self.chapters, self.verse_chapter)
+        letter_chapter = chapter_row[letter_verse]
+
+        # Letter histograms: one bincount per level
+        n_verses, n_chapters = end_verse - first_verse, len(self.chapters)
+        self.letter_counts = np.bincount(letters, minlength=BASE)[1:]
+        self.chapter_letter_counts = np.bincount(letter_chapter * BASE + letters,
+                                                 minlength=n_chapters * BASE).reshape(n_chapters, BASE)[:, 1:]
+        self.verse_letter_counts = np.bincount(letter_verse * BASE + letters,
+                                               minlength=n_verses * BASE).reshape(n_verses, BASE)[:, 1:]
+
+        # Word id of every letter, from the corpus word starts inside this book
+        word_starts = corpus.word_starts
+        first_word, end_word = np.searchsorted(word_starts, [first_letter, end_letter])
+        book_word_starts = word_starts[first_word:end_word] - first_letter
+        is_start = np.zeros(len(letters), dtype=bool)
+        is_start[book_word_starts] = True
+        letter_word = np.cumsum(is_start) - 1
+
+        self.ngrams: Dict[int, Dict[str, 'np.ndarray']] = {}
+        for n in ngram_sizes:
+            self.ngrams[n] = self._ngrams(letters, letter_word, letter_chapter, n_chapters,
+                                          letter_verse, n_verses, n)
+
+        self.words = self._words(letters, book_word_starts)
+
+    @staticmethod
+    def _ngrams(letters, letter_word, letter_chapter, n_chapters: int, letter_verse, n_verses: int,
+                n: int) -> Dict[str, 'np.ndarray']:
+        if len(letters) < n:
+            empty = np.zeros(0, dtype=np.int64)
+            return {'gram': empty, 'count': empty, 'chapter': empty, 'chapter_gram': empty,
+                    'chapter_count': empty, 'verse': empty, 'verse_gram': empty, 'verse_count': empty}
+
+        # Base-28 key of the n letters starting at each position, kept only inside one word
+        span = len(letters) - n + 1
+        keys = np.zeros(span, dtype=np.int64)
+        for offset in range(n):
+            keys = keys * BASE + letters[offset:offset + span]
+        inside = letter_word[:span] == letter_word[n - 1:]
+        keys = keys[inside]
+        size = BASE ** n
+
+        gram, count = _counts(keys, size)
+        chapter_keys, chapter_count = _counts(letter_chapter[:span][inside] * size + keys, n_chapters * size)
+        verse_keys, verse_count = _counts(letter_verse[:span][inside] * size + keys, n_verses * size)
+        return {
+            'gram': gram, 'count': count,
+            'chapter': chapter_keys // size, 'chapter_gram': chapter_keys % size,
+            'chapter_count': chapter_count,
+            'verse': verse_keys // size, 'verse_gram': verse_keys % size,
+            'verse_count': verse_count,
+        }
+
+    @staticmethod
+    def _words(letters, word_starts) -> List[Tuple[str, int]]:
+        """(word, count), most frequent first, ties in order of first appearance"""
+        if len(word_starts) == 0:
+            return []
+        lengths = np.diff(word_starts, append=len(letters))
+
+        # Key = sum(code * 28^(letters after it)), summed per word with reduceat
+        position = np.arange(len(letters))
+        after = np.repeat(word_starts + lengths, lengths) - position - 1
+        fits = np.repeat(lengths <= MAX_KEY_LETTERS, lengths)
+        weights = np.zeros(len(letters), dtype=np.uint64)
+        weights[fits] = letters[fits].astype(np.uint64) * (np.uint64(BASE) ** after[fits].astype(np.uint64))
+        keys = np.add.reduceat(weights, word_starts)
+
+        # Words are sliced out of the book's letters as one string at their first occurrence
+        text = (letters + (ord(LETTERS[0]) - 1)).astype('<u4').tobytes().decode('utf-32-le')
+        short = np.flatnonzero(lengths <= MAX_KEY_LETTERS)
+        _, first, counts = np.unique(keys[short], return_index=True, return_counts=True)
+        first = short[first]
+        order = np.lexsort((first, -counts))
+        words = {text[start:start + length]: count for start, length, count in
+                 zip(word_starts[first[order]].tolist(), lengths[first[order]].tolist(),
+                     counts[order].tolist())}
+
+        # The rare words too long for a key are counted one by one
+        long_words = [text[start:start + length] for start, length in
+                      zip(word_starts[lengths > MAX_KEY_LETTERS].tolist(),
+                          lengths[lengths > MAX_KEY_LETTERS].tolist())]
+        if long_words:
+            for word in long_words:
+                words[word] = words.get(word, 0) + 1
+            return sorted(words.items(), key=lambda item: -item[1])
+        return list(words.items())
+
+    def as_columns(self) -> Dict:
+        """Columnar JSON-ready dict: parallel arrays instead of row objects"""
+        def grams(n: int, data: Dict[str, 'np.ndarray']) -> Dict:
+            return {
+                'gram': decode_grams(data['gram'], n),
+                'count': data['count'].tolist(),
+                'chapter': {
+                    'chapter': self.chapters[data['chapter']].tolist(),
+                    'gram': decode_grams(data['chapter_gram'], n),
+                    'count': data['chapter_count'].tolist(),
+                },
+                'verse': {
+                    'chapter': self.verse_chapter[data['verse']].tolist(),
+                    'verse': self.verse_number[data['verse']].tolist(),
+                    'gram': decode_grams(data['verse_gram'], n),
+                    'count': data['verse_count'].tolist(),
+                },
+            }
+
+        return {
+            'version': FORMAT_VERSION,
+            'book': self.book,
+            'source_hash': self.source_hash,
+            'alphabet': LETTERS,
+            'letters': {
+                'book': self.letter_counts.tolist(),
+                'chapter': {'chapter': self.chapters.tolist(),
+                            'counts': self.chapter_letter_counts.tolist()},
+                'verse': {'chapter': self.verse_chapter.tolist(), 'verse': self.verse_number.tolist(),
+                          'counts': self.verse_letter_counts.tolist()},
+            },
+            'ngrams': {str(n): grams(n, data) for n, data in self.ngrams.items()},
+            'words': {'word': [word for word, _ in self.words],
+                      'count': [count for _, count in self.words]},
+        }
+
+class FrequencyAnalyzer:
+    """Per-book frequency results over a GematriaCorpus, computed once per book"""
+
+    def __init__(self, corpus: GematriaCorpus, ngram_sizes: Tuple[int, ...] = (2, 3)):
+        self.corpus = corpus
+        self.ngram_sizes = ngram_sizes
+        self._rows = {corpus.book_names[corpus.verse_book[start]]: row
+                      for row, start in enumerate(corpus.book_verse_starts.tolist())}
+        self._cache: Dict[str, BookFrequencies] = {}
+
+    @classmethod
+    def from_corpus(cls, corpus, ngram_sizes: Tuple[int, ...] = (2, 3)) -> 'FrequencyAnalyzer':
+        """Build from a corpus_format.CorpusReader (or anything with iter_verses)"""
+        return cls(GematriaCorpus.from_corpus(corpus), ngram_sizes)
+
+    @property
+    def books(self) -> List[str]:
+        return list(self._rows)
+
+    def book(self, book_name: str) -> BookFrequencies:
+        result = self._cache.get(book_name)
+        if result is None:
+            if book_name not in self._rows:
+                raise KeyError(book_name)
+            result = self._cache[book_name] = BookFrequencies(self.corpus, self._rows[book_name],
+                                                              self.ngram_sizes)
+        return result
+
+    def letter_totals(self) -> 'np.ndarray':
+        """Corpus letter counts (one per letter in LETTERS), summed from the book results"""
+        return sum((self.book(book_name).letter_counts for book_name in self.books),
+                   np.zeros(len(LETTERS), dtype=np.int64))
+
+    def export(self, output_dir: str) -> Dict:
+        """Write index.json and one <Book>.json per book, skipping books whose text is unchanged"""
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        written, skipped = [], []
+        books = []
+        for book_name in self.books:
+            result = self.book(book_name)
+            path = output_dir / f"{book_name}.json"
+            books.append({'book': book_name, 'file': path.name,
+                          'letters': int(result.letter_counts.sum()),
+                          'chapters': len(result.chapters), 'verses': len(result.verse_number)})
+
+            if path.exists():
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        existing = json.load(f)
+                    if (existing.get('version') == FORMAT_VERSION
+                            and existing.get('source_hash') == result.source_hash):
+                        skipped.append(book_name)
+                        continue
+                except (OSError, ValueError):
+                    pass
+
+            _write_json(path, result.as_columns())
+            written.append(book_name)
+
+        _write_json(output_dir / 'index.json', {
+            'version': FORMAT_VERSION,
+            'alphabet': LETTERS,
+            'ngram_sizes': list(self.ngram_sizes),
+            'letters': self.letter_totals().tolist(),
+            'books': books,
+        })
+        return {'written': written, 'skipped': skipped}
+
+def _write_json(path: Path, data: Dict):
+    """Write JSON atomically, so the front end never reads a half-written file"""
+    tmp_path = path.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        # dumps encodes in C; dump streams through the slower Python encoder
+        f.write(json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+    os.replace(tmp_path, path)
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == 'export':
+        from corpus_format import CorpusReader
+
+        with CorpusReader(sys.argv[2]) as corpus:
+            analyzer = FrequencyAnalyzer.from_corpus(corpus)
+        result = analyzer.export(sys.argv[3])
+        print(f"Wrote {len(result['written'])} books to {sys.argv[3]} "
+              f"({len(result['skipped'])} unchanged)")
+        return 0
+
+    print("Usage: frequency_analysis.py export <corpus_file> <output_dir>")
+    return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
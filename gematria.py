@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Gematria Engine
+
+NumPy-backed gematria over cleaned Hebrew text. The whole corpus is mapped
+to one array of letter codes in a single vectorized pass (niqqud and
+cantillation are skipped, spaces, maqaf and sof pasuq separate words), and
+word, verse, chapter and book sums are computed with np.add.reduceat.
+
+Requires NumPy (the 'analysis' extra).
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError("gematria requires NumPy: pip install numpy") from e
+
+# Letter codes 1..27 follow Unicode order, U+05D0 (א) to U+05EA (ת), finals included
+ALEPH = 0x05D0
+LETTERS = ''.join(chr(ALEPH + i) for i in range(27))
+FINAL_FORMS = {'ך': 'כ', 'ם': 'מ', 'ן': 'נ', 'ף': 'פ', 'ץ': 'צ'}
+
+# Standard values; final letters keep the value of their regular form
+_STANDARD = {
+    'א': 1, 'ב': 2, 'ג': 3, 'ד': 4, 'ה': 5, 'ו': 6, 'ז': 7, 'ח': 8, 'ט': 9,
+    'י': 10, 'כ': 20, 'ל': 30, 'מ': 40, 'נ': 50, 'ס': 60, 'ע': 70, 'פ': 80, 'צ': 90,
+    'ק': 100, 'ר': 200, 'ש': 300, 'ת': 400,
+}
+
+def _scheme_table(value_of) -> 'np.ndarray':
+    table = np.zeros(28, dtype=np.uint16)
+    for code, letter in enumerate(LETTERS, 1):
+        table[code] = value_of(FINAL_FORMS.get(letter, letter))
+    return table
+
+_ORDINAL = {letter: i for i, letter in enumerate(_STANDARD, 1)}
+
+# Value tables indexed by letter code (index 0 is unused)
+SCHEMES: Dict[str, 'np.ndarray'] = {
+    'standard': _scheme_table(_STANDARD.__getitem__),
+    'ordinal': _scheme_table(_ORDINAL.__getitem__),
+    # Mispar katan: drop the zeros, so י=1, כ=2, ק=1, ש=3
+    'reduced': _scheme_table(lambda letter: int(str(_STANDARD[letter]).rstrip('0'))),
+}
+
+# Character classes for code points below U+0600; everything above is a separator
+_MARK = 0
+_SEPARATOR = 255
+_CLASS = np.full(0x0600, _SEPARATOR, dtype=np.uint8)
+_CLASS[0x0591:0x05C8] = _MARK                       # cantillation and niqqud
+for _cp in (0x05BE, 0x05C0, 0x05C3, 0x05C6):        # maqaf, paseq, sof pasuq, nun hafukha
+    _CLASS[_cp] = _SEPARATOR
+_CLASS[ALEPH:ALEPH + 27] = np.arange(1, 28, dtype=np.uint8)
+
+# Separator used between verses when a corpus is encoded in one pass
+VERSE_BREAK = '\n'
+
+def _codepoints(text: str) -> 'np.ndarray':
+    return np.frombuffer(text.encode('utf-32-le'), dtype='<u4')
+
+def _classify(codepoints: 'np.ndarray') -> 'np.ndarray':
+    return _CLASS[np.minimum(codepoints, 0x05FF)]
+
+def letter_codes(text: str) -> 'np.ndarray':
+    """Letter codes (1..27) of the Hebrew letters in text, marks removed"""
+    classes = _classify(_codepoints(text))
+    return classes[(classes != _MARK) & (classes != _SEPARATOR)]
+
+def letters_only(text: str) -> str:
+    """Consonants of text with niqqud, cantillation and separators removed"""
+    return ''.join(LETTERS[code - 1] for code in letter_codes(text).tolist())
+
+def gematria(text: str, scheme: str = 'standard') -> int:
+    """Gematria value of a word or phrase"""
+    return int(SCHEMES[scheme][letter_codes(text)].sum(dtype=np.int64))
+
+def segment_sums(values: 'np.ndarray', starts: 'np.ndarray') -> 'np.ndarray':
+    """Sum values over segments beginning at starts, allowing empty segments"""
+    sums = np.zeros(len(starts), dtype=np.int64)
+    if len(starts) == 0 or len(values) == 0:
+        return sums
+
+    lengths = np.diff(starts, append=len(values))
+    nonempty = lengths > 0
+    sums[nonempty] = np.add.reduceat(values, starts[nonempty], dtype=np.int64)
+    return sums
+
+class GematriaCorpus:
+    """Letter-code arrays and segment boundaries for a whole corpus"""
+
+    def __init__(self, refs: List[Tuple[str, int, int]], texts: List[str]):
+        if len(refs) != len(texts):
+            raise ValueError("refs and texts must have the same length")
+
+        # Verse references as compact columns
+        self.book_names: List[str] = []
+        book_ids = {}
+        for book_name, _, _ in refs:
+            if book_name not in book_ids:
+                book_ids[book_name] = len(self.book_names)
+                self.book_names.append(book_name)
+
+        self.verse_book = np.array([book_ids[ref[0]] for ref in refs], dtype=np.uint8)
+        self.verse_chapter = np.array([ref[1] for ref in refs], dtype=np.uint16)
+        self.verse_number = np.array([ref[2] for ref in refs], dtype=np.uint16)
+
+        # One pass over the joined text: classify every code point at once
+        codepoints = _codepoints(''.join(text + VERSE_BREAK for text in texts))
+        classes = _classify(codepoints)
+        is_letter = (classes != _MARK) & (classes != _SEPARATOR)
+        self.letters = classes[is_letter]
+
+        # A word starts at a letter whose preceding non-mark character is a separator
+        separators_before = np.cumsum(classes == _SEPARATOR)[is_letter]
+        self.word_starts = np.flatnonzero(np.diff(separators_before, prepend=-1) != 0)
+
+        # Verse boundaries in letter space and in word space
+        verse_ends = np.cumsum(is_letter)[codepoints == ord(VERSE_BREAK)]
+        self.verse_letter_starts = np.concatenate(([0], verse_ends))[:len(refs)].astype(np.int64)
+        self.verse_word_starts = np.searchsorted(self.word_starts, self.verse_letter_starts)
+
+        # Chapter and book boundaries in verse space
+        new_chapter = np.ones(len(refs), dtype=bool)
+        new_book = np.ones(len(refs), dtype=bool)
+        if len(refs) > 1:
+            new_book[1:] = self.verse_book[1:] != self.verse_book[:-1]
+            new_chapter[1:] = new_book[1:] | (self.verse_chapter[1:] != self.verse_chapter[:-1])
+        self.chapter_verse_starts = np.flatnonzero(new_chapter)
+        self.book_verse_starts = np.flatnonzero(new_book)
+
+        self._values: Dict[str, 'np.ndarray'] = {}
+
+    @classmethod
+    def from_verses(cls, verses: Iterable[Tuple[str, int, int, str]]) -> 'GematriaCorpus':
+        """Build from (book, chapter, verse, hebrew_text) tuples"""
+        refs, texts = [], []
+        for book_name, chapter, verse, text in verses:
+            refs.append((book_name, chapter, verse))
+            texts.append(text)
+        return cls(refs, texts)
+
+    @classmethod
+    def from_corpus(cls, corpus) -> 'GematriaCorpus':
+        """Build from a corpus_format.CorpusReader"""
+        return cls.from_verses(corpus.iter_verses('hebrew'))
+
+    def values(self, scheme: str = 'standard') -> 'np.ndarray':
+        """uint16 letter values for every letter in the corpus"""
+        if scheme not in self._values:
+            self._values[scheme] = SCHEMES[scheme][self.letters]
+        return self._values[scheme]
+
+    def word_sums(self, scheme: str = 'standard') -> 'np.ndarray':
+        return segment_sums(self.values(scheme), self.word_starts)
+
+    def verse_sums(self, scheme: str = 'standard') -> 'np.ndarray':
+        return segment_sums(self.values(scheme), self.verse_letter_starts)
+
+    def chapter_sums(self, scheme: str = 'standard') -> 'np.ndarray':
+        return segment_sums(self.verse_sums(scheme), self.chapter_verse_starts)
+
+    def book_sums(self, scheme: str = 'standard') -> Dict[str, int]:
+        sums = segment_sums(self.verse_sums(scheme), self.book_verse_starts)
+        return {self.book_names[self.verse_book[start]]: int(total)
+                for start, total in zip(self.book_verse_starts, sums)}
+
+    def word(self, index: int) -> str:
+        """Consonants of the word at a word index"""
+        start = self.word_starts[index]
+        end = self.word_starts[index + 1] if index + 1 < len(self.word_starts) else len(self.letters)
+        return ''.join(LETTERS[code - 1] for code in self.letters[start:end].tolist())
+
+    def word_verse(self, word_indices: 'np.ndarray') -> 'np.ndarray':
+        """Verse row of each word index"""
+        return np.searchsorted(self.verse_word_starts, word_indices, side='right') - 1
+
+    def verse_ref(self, row: int) -> Tuple[str, int, int]:
+        """(book, chapter, verse) of a verse row"""
+        return (self.book_names[self.verse_book[row]], int(self.verse_chapter[row]),
+                int(self.verse_number[row]))
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Gematria Value Index
+
+Reverse index from gematria value to the words and verses of the corpus
+that have it. Built once from a GematriaCorpus and saved as one .npz file:
+
+    vocab            distinct words (consonants only)
+    word_vocab       vocab id of every word occurrence, in corpus order
+    word_verse       verse row of every word occurrence
+    verse_*          book id, chapter and verse number of every verse row
+    <scheme>_*       per scheme, values sorted with the permutation that sorts
+                     them, for vocab entries, word occurrences and verses
+
+A lookup is a binary search (np.searchsorted) on a sorted value array, so
+finding every word equal to 26 costs microseconds; occurrences and verse
+references are only materialized up to the requested limit.
+
+Requires NumPy (the 'analysis' extra).
+"""
+
+import os
+import sys
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError("gematria_index requires NumPy: pip install numpy") from e
+
+from gematria import ALEPH, SCHEMES, GematriaCorpus
+
+FORMAT_VERSION = 1
+
+def _sorted(values: 'np.ndarray') -> Tuple['np.ndarray', 'np.ndarray']:
+    """(sorted values, stable sorting permutation)"""
+    order = np.argsort(values, kind='stable').astype(np.int32)
+    return values[order], order
+
+class GematriaIndex:
+    """Sorted value arrays for words, word occurrences and verses, per scheme"""
+
+    def __init__(self, arrays: Dict[str, 'np.ndarray']):
+        if int(arrays['version']) != FORMAT_VERSION:
+            raise ValueError(f"Unsupported gematria index version {int(arrays['version'])}")
+        self.arrays = arrays
+        self.book_names: List[str] = arrays['book_names'].tolist()
+        self.vocab: List[str] = arrays['vocab'].tolist()
+        self.vocab_counts = np.bincount(arrays['word_vocab'], minlength=len(self.vocab))
+        self.schemes = [scheme for scheme in SCHEMES if f'{scheme}_word_sorted' in arrays]
+
+    @classmethod
+    def build(cls, corpus: GematriaCorpus, schemes: Sequence[str] = ('standard',)) -> 'GematriaIndex':
+        # Every word as a string, sliced from the corpus letters decoded in one go
+        text = (corpus.letters.astype(np.uint32) + (ALEPH - 1)).astype('<u4').tobytes().decode('utf-32-le')
+        ends = np.append(corpus.word_starts[1:], len(corpus.letters)).tolist()
+        words = np.array([text[start:end] for start, end in zip(corpus.word_starts.tolist(), ends)])
+        vocab, word_vocab = np.unique(words, return_inverse=True) if len(words) else (words, words)
+
+        arrays = {
+            'version': np.array(FORMAT_VERSION),
+            'book_names': np.array(corpus.book_names),
+            'vocab': vocab,
+            'word_vocab': word_vocab.astype(np.int32),
+            'word_verse': corpus.word_verse(np.arange(len(words))).astype(np.int32),
+            'verse_book': corpus.verse_book,
+            'verse_chapter': corpus.verse_chapter,
+            'verse_number': corpus.verse_number,
+        }
+
+        for scheme in schemes:
+            word_values = corpus.word_sums(scheme)
+            vocab_values = np.zeros(len(vocab), dtype=np.int64)
+            vocab_values[word_vocab] = word_values
+            for kind, values in (('vocab', vocab_values), ('word', word_values),
+                                 ('verse', corpus.verse_sums(scheme))):
+                arrays[f'{scheme}_{kind}_sorted'], arrays[f'{scheme}_{kind}_order'] = _sorted(values)
+
+        return cls(arrays)
+
+    @classmethod
+    def from_verses(cls, verses: Iterable[Tuple[str, int, int, str]],
+                    schemes: Sequence[str] = ('standard',)) -> 'GematriaIndex':
+        """Build from (book, chapter, verse, hebrew_text) tuples"""
+        return cls.build(GematriaCorpus.from_verses(verses), schemes)
+
+    def save(self, path: str):
+        """Write the index as an uncompressed .npz, atomically"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **self.arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'GematriaIndex':
+        with np.load(path) as data:
+            return cls({name: data[name] for name in data.files})
+
+    def _range(self, scheme: str, kind: str, value: int) -> 'np.ndarray':
+        """Positions (in corpus order terms) of the entries of a kind with exactly this value"""
+        if scheme not in self.schemes:
+            raise KeyError(f"scheme '{scheme}' is not in this index")
+        values = self.arrays[f'{scheme}_{kind}_sorted']
+        low, high = np.searchsorted(values, [value, value + 1])
+        return self.arrays[f'{scheme}_{kind}_order'][low:high]
+
+    def verse_ref(self, row: int) -> Tuple[str, int, int]:
+        return (self.book_names[self.arrays['verse_book'][row]], int(self.arrays['verse_chapter'][row]),
+                int(self.arrays['verse_number'][row]))
+
+    def words(self, value: int, scheme: str = 'standard') -> List[Tuple[str, int]]:
+        """Distinct words with this value and how often each occurs, most frequent first"""
+        ids = self._range(scheme, 'vocab', value)
+        counts = self.vocab_counts[ids]
+        order = np.argsort(-counts, kind='stable')
+        return [(self.vocab[i], int(c)) for i, c in zip(ids[order].tolist(), counts[order].tolist())]
+
+    def word_count(self, value: int, scheme: str = 'standard') -> int:
+        """Number of word occurrences with this value"""
+        return len(self._range(scheme, 'word', value))
+
+    def occurrences(self, value: int, scheme: str = 'standard',
+                    limit: Optional[int] = None) -> List[Tuple[Tuple[str, int, int], str]]:
+        """(verse reference, word) of word occurrences with this value, in corpus order"""
+        positions = self._range(scheme, 'word', value)[:limit]
+        return [(self.verse_ref(row), self.vocab[vocab_id]) for row, vocab_id in
+                zip(self.arrays['word_verse'][positions].tolist(),
+                    self.arrays['word_vocab'][positions].tolist())]
+
+    def verses(self, value: int, scheme: str = 'standard',
+               limit: Optional[int] = None) -> List[Tuple[str, int, int]]:
+        """References of verses whose total has this value, in corpus order"""
+        return [self.verse_ref(row) for row in self._range(scheme, 'verse', value)[:limit].tolist()]
+
+    def lookup(self, value: int, scheme: str = 'standard', limit: int = 20) -> Dict:
+        """JSON-ready summary of everything with this value"""
+        words = self.words(value, scheme)
+        return {
+            'value': value,
+            'scheme': scheme,
+            'word_count': self.word_count(value, scheme),
+            'words': [{'word': word, 'count': count} for word, count in words[:limit]],
+            'distinct_words': len(words),
+            'occurrences': [{'ref': list(ref), 'word': word}
+                            for ref, word in self.occurrences(value, scheme, limit)],
+            'verse_count': len(self._range(scheme, 'verse', value)),
+            'verses': [list(ref) for ref in self.verses(value, scheme, limit)],
+        }
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == 'build':
+        source, index_file = sys.argv[2], sys.argv[3]
+        if source.endswith('.db'):
+            from sqlite_store import SQLiteStore
+            with SQLiteStore(source) as store:
+                index = GematriaIndex.from_verses(store.iter_verses('hebrew'), list(SCHEMES))
+        else:
+            from corpus_format import CorpusReader
+            with CorpusReader(source) as corpus:
+                index = GematriaIndex.from_verses(corpus.iter_verses('hebrew'), list(SCHEMES))
+        index.save(index_file)
+        print(f"Wrote {index_file}: {len(index.arrays['word_vocab'])} words, {len(index.vocab)} distinct")
+        return 0
+
+    if len(sys.argv) in (4, 5) and sys.argv[1] == 'lookup':
+        index = GematriaIndex.load(sys.argv[2])
+        result = index.lookup(int(sys.argv[3]), sys.argv[4] if len(sys.argv) > 4 else 'standard')
+        print(f"{result['word_count']} words, {result['verse_count']} verses with value {result['value']}")
+        for word in result['words']:
+            print(f"  {word['word']}  x{word['count']}")
+        return 0
+
+    print("Usage: gematria_index.py build <corpus_file|database.db> <index.npz>")
+    print("       gematria_index.py lookup <index.npz> <value> [scheme]")
+    return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+HTTP Transport
+
+A tuned requests Session for talking to the Sefaria API: a connection pool
+sized to the download concurrency, connect/read timeouts, retries with
+exponential backoff and jitter on 429/5xx (honoring Retry-After), explicit
+gzip negotiation, and per-request latency metrics.
+"""
+
+import random
+import threading
+import time
+from array import array
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    import requests
+
+    from clean_bible_downloader import CancelToken
+
+def backoff_delay(attempt: int, backoff_factor: float = 0.5, max_backoff: float = 60.0) -> float:
+    """Exponential backoff with full jitter for the given retry attempt"""
+    return random.uniform(0, min(max_backoff, backoff_factor * (2 ** attempt)))
+
+def parse_retry_after(value: Optional[str], max_backoff: float = 60.0) -> Optional[float]:
+    """Seconds to wait according to a Retry-After header value, if any"""
+    if not value:
+        return None
+
+    try:
+        seconds = float(value)
+    except ValueError:
+        # HTTP-date form; email.utils is only needed (and imported) for this rare case
+        from email.utils import parsedate_to_datetime
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+
+    return min(max_backoff, max(0.0, seconds))
+
+class LatencyStats:
+    """Thread-safe per-request latency and outcome counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = array('d')
+        self.statuses: Dict[str, int] = {}
+        self.retries = 0
+        self.bytes = 0
+        self.slowest = (0.0, '')
+
+    def record(self, url: str, seconds: float, status: Optional[int], size: int = 0):
+        """Record one HTTP attempt (status None means a connection error or timeout)"""
+        with self._lock:
+            self.latencies.append(seconds)
+            key = str(status) if status is not None else 'error'
+            self.statuses[key] = self.statuses.get(key, 0) + 1
+            self.bytes += size
+            if seconds > self.slowest[0]:
+                self.slowest = (seconds, url)
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def summary(self) -> Dict:
+        """Aggregate counters and latency percentiles in seconds"""
+        with self._lock:
+            latencies = sorted(self.latencies)
+            count = len(latencies)
+
+            def percentile(p: float) -> float:
+                return latencies[min(count - 1, int(p * count))] if count else 0.0
+
+            return {
+                'requests': count,
+                'retries': self.retries,
+                'statuses': dict(self.statuses),
+                'bytes': self.bytes,
+                'total': sum(latencies),
+                'mean': sum(latencies) / count if count else 0.0,
+                'p50': percentile(0.50),
+                'p95': percentile(0.95),
+                'max': latencies[-1] if count else 0.0,
+                'slowest_url': self.slowest[1],
+            }
+
+    def report(self) -> str:
+        """Human readable one-block summary"""
+        s = self.summary()
+        statuses = ', '.join(f"{code}: {n}" for code, n in sorted(s['statuses'].items()))
+        return (f"HTTP requests: {s['requests']} ({statuses or 'none'}), retries: {s['retries']}, "
+                f"{s['bytes'] / 1024:.0f} KiB\n"
+                f"Latency: mean {s['mean'] * 1000:.0f} ms, p50 {s['p50'] * 1000:.0f} ms, "
+                f"p95 {s['p95'] * 1000:.0f} ms, max {s['max'] * 1000:.0f} ms\n"
+                f"Slowest: {s['slowest_url']}")
+
+class HTTPTransport:
+    """requests Session with pooling, timeouts, retries and metrics"""
+
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(self, pool_size: int = 4, connect_timeout: float = 5.0, read_timeout: float = 30.0,
+                 max_retries: int = 4, backoff_factor: float = 0.5, max_backoff: float = 60.0,
+                 user_agent: str = 'Clean-Bible-Downloader/1.0'):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.stats = LatencyStats()
+
+        # requests is imported here rather than at module level: it dominates
+        # import time, and the helpers above are shared by the asyncio backend
+        import requests
+        from requests.adapters import HTTPAdapter
+        self._transient_errors = (requests.ConnectionError, requests.Timeout)
+
+        # One pooled connection per worker; retries are handled here, not by urllib3
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'User-Agent': user_agent,
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+        })
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter for the given retry attempt"""
+        return backoff_delay(attempt, self.backoff_factor, self.max_backoff)
+
+    def retry_after(self, response: 'requests.Response') -> Optional[float]:
+        """Seconds to wait according to a Retry-After header, if any"""
+        return parse_retry_after(response.headers.get('Retry-After'), self.max_backoff)
+
+    def get(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+            token: Optional['CancelToken'] = None) -> 'requests.Response':
+        """GET with timeouts, retrying transient failures
+
+        With a CancelToken, backoff waits (including Retry-After) end early
+        with DownloadCancelled when the token is cancelled.
+        """
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            except self._transient_errors:
+                self.stats.record(url, time.perf_counter() - start, None)
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.backoff_delay(attempt)
+            else:
+                self.stats.record(url, time.perf_counter() - start, response.status_code,
+                                  len(response.content))
+                if response.status_code not in self.RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+
+                delay = self.retry_after(response)
+                if delay is None:
+                    delay = self.backoff_delay(attempt)
+
+            attempt += 1
+            self.stats.record_retry()
+            if token is not None:
+                token.sleep(delay)
+            else:
+                time.sleep(delay)
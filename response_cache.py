@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Response Cache for Sefaria API calls
+
+A content-addressed on-disk cache keyed by URL + query parameters. Response
+bodies are stored once per SHA-256 digest, entries remember their ETag and
+Last-Modified headers for conditional revalidation, and the cache is capped
+in size with least-recently-used eviction.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+class OfflineCacheMiss(Exception):
+    """Raised in offline mode when a request is not in the cache"""
+
+class CacheEntry:
+    """Metadata for one cached response"""
+
+    __slots__ = ('digest', 'size', 'etag', 'last_modified', 'stored_at')
+
+    def __init__(self, digest: str, size: int, etag: Optional[str] = None,
+                 last_modified: Optional[str] = None, stored_at: Optional[float] = None):
+        self.digest = digest
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at if stored_at is not None else time.time()
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class ResponseCache:
+    """On-disk LRU cache of API response bodies"""
+
+    INDEX_VERSION = 1
+
+    # Puts between automatic index writes; callers flush() at the end of a batch
+    FLUSH_EVERY = 64
+
+    def __init__(self, cache_dir: str = '.sefaria_cache', max_bytes: int = 512 * 1024 * 1024,
+                 max_age: Optional[float] = 7 * 24 * 3600):
+        # max_age is in seconds; None means cached text never needs revalidation
+        self.cache_dir = Path(cache_dir)
+        self.objects_dir = self.cache_dir / 'objects'
+        self.index_file = self.cache_dir / 'index.json'
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+        self._lock = threading.RLock()
+        self._entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._refs: Dict[str, int] = {}
+        self._sizes: Dict[str, int] = {}
+        self.total_bytes = 0
+        self._unflushed = 0
+
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def key(url: str, params: Optional[Dict] = None) -> str:
+        """Cache key for a request URL and its query parameters"""
+        canonical = json.dumps([url, sorted((params or {}).items())], ensure_ascii=False)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest
+
+    def _load_index(self):
+        """Read the entry index written by a previous run"""
+        if not self.index_file.exists():
+            return
+
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable cache index: {e}")
+            return
+
+        if index.get('version') != self.INDEX_VERSION:
+            return
+
+        # Entries are stored least recently used first
+        for key, fields in index.get('entries', []):
+            entry = CacheEntry(**fields)
+            if self._object_path(entry.digest).exists():
+                self._add_entry(key, entry)
+
+    def _add_entry(self, key: str, entry: CacheEntry):
+        self._entries[key] = entry
+        if entry.digest not in self._refs:
+            self._refs[entry.digest] = 0
+            self._sizes[entry.digest] = entry.size
+            self.total_bytes += entry.size
+        self._refs[entry.digest] += 1
+
+    def _drop_entry(self, key: str):
+        entry = self._entries.pop(key)
+        self._refs[entry.digest] -= 1
+        if self._refs[entry.digest] == 0:
+            del self._refs[entry.digest]
+            self.total_bytes -= self._sizes.pop(entry.digest)
+            try:
+                self._object_path(entry.digest).unlink()
+            except FileNotFoundError:
+                pass
+
+    def flush(self):
+        """Write the entry index to disk atomically, if anything changed since the last write"""
+        with self._lock:
+            if not self._unflushed:
+                return
+            self._unflushed = 0
+            index = {
+                'version': self.INDEX_VERSION,
+                'entries': [[key, entry.to_dict()] for key, entry in self._entries.items()],
+            }
+            tmp_file = self.index_file.with_suffix('.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(index, f)
+            os.replace(tmp_file, self.index_file)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Look up an entry and mark it as recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def read(self, entry: CacheEntry) -> Optional[bytes]:
+        """Read the response body for an entry, or None if it was evicted since get()"""
+        # A concurrent put or eviction may unlink the object between get() and
+        # here; callers treat that as a cache miss
+        try:
+            return self._object_path(entry.digest).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """Whether an entry can be served without revalidation"""
+        return self.max_age is None or time.time() - entry.stored_at < self.max_age
+
+    def conditional_headers(self, entry: Optional[CacheEntry]) -> Dict[str, str]:
+        """Request headers that let the server answer 304 Not Modified"""
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def touch(self, key: str):
+        """Mark an entry as revalidated by a 304 response"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.stored_at = time.time()
+                self._entries.move_to_end(key)
+                self._unflushed += 1
+
+    def put(self, key: str, body: bytes, headers: Optional[Dict] = None) -> CacheEntry:
+        """Store a response body and its validators
+
+        The index is written every FLUSH_EVERY puts; call flush() when a
+        batch of downloads ends.
+        """
+        headers = headers or {}
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+
+        with self._lock:
+            # Drop the old entry first, so re-storing the same body never unlinks it
+            if key in self._entries:
+                self._drop_entry(key)
+
+            if digest not in self._refs:
+                path.parent.mkdir(exist_ok=True)
+                tmp_path = path.with_name(f"{digest}.{threading.get_ident()}.tmp")
+                tmp_path.write_bytes(body)
+                os.replace(tmp_path, path)
+
+            entry = CacheEntry(digest, len(body), headers.get('ETag'), headers.get('Last-Modified'))
+            self._add_entry(key, entry)
+            self._evict()
+            self._unflushed += 1
+            if self._unflushed >= self.FLUSH_EVERY:
+                self.flush()
+            return entry
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits max_bytes"""
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            self._drop_entry(oldest)
+
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            for key in list(self._entries):
+                self._drop_entry(key)
+            self._unflushed += 1
+            self.flush()
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Search Index
+
+An inverted index over cleaned Hebrew and English verses. English is
+lower-cased into word tokens; Hebrew is reduced to consonants (niqqud and
+cantillation removed, final letters folded to their regular forms) so a
+search does not depend on pointing. Each term keeps a positional posting
+list in three compact arrays: delta-encoded document ids, term counts and
+delta-encoded positions. A document is one verse in one language.
+
+Supports term, phrase ("...") and prefix (word*) queries returning verse
+references, and incremental updates: new chapters are appended, and a
+re-downloaded chapter tombstones its previous verses.
+"""
+
+import json
+import os
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+MAGIC = b'BIBIDX01'
+FORMAT_VERSION = 1
+
+# Niqqud and cantillation are dropped; maqaf, paseq, sof pasuq and nun
+# hafukha separate words; final letters fold to their regular forms
+_NORMALIZE = {cp: None for cp in range(0x0591, 0x05C8)}
+_NORMALIZE.update({ord(c): ' ' for c in '־׀׃׆'})
+_NORMALIZE.update({ord(final): regular for final, regular in zip('ךםןףץ', 'כמנפצ')})
+_NORMALIZE[ord('’')] = "'"
+
+_TOKEN_RE = re.compile(r"[א-ת]+|[a-z0-9]+(?:'[a-z]+)*")
+
+def tokenize(text: str) -> List[str]:
+    """Search tokens of a verse or query: consonant-only Hebrew words, lower-case English words"""
+    return _TOKEN_RE.findall(text.lower().translate(_NORMALIZE))
+
+class Posting:
+    """Positional posting list of one term, stored as delta-encoded arrays"""
+
+    __slots__ = ('docs', 'freqs', 'positions', 'last_doc')
+
+    def __init__(self):
+        self.docs = array('I')          # doc id deltas
+        self.freqs = array('H')         # occurrences per doc
+        self.positions = array('H')     # position deltas, restarting at each doc
+        self.last_doc = 0
+
+    def add(self, doc: int, positions: Sequence[int]):
+        """Append a document; documents must arrive in increasing id order"""
+        self.docs.append(doc - self.last_doc)
+        self.last_doc = doc
+        self.freqs.append(len(positions))
+        previous = 0
+        for position in positions:
+            self.positions.append(position - previous)
+            previous = position
+
+    def doc_ids(self) -> List[int]:
+        return list(accumulate(self.docs))
+
+    def position_starts(self) -> List[int]:
+        """Index into positions where each doc's run begins"""
+        return list(accumulate(self.freqs, initial=0))
+
+    def doc_positions(self, index: int, starts: List[int]) -> Set[int]:
+        """Absolute positions in the index-th doc of the list"""
+        return set(accumulate(self.positions[starts[index]:starts[index + 1]]))
+
+class SearchIndex:
+    """Positional inverted index with verse-reference results"""
+
+    def __init__(self):
+        self.book_names: List[str] = []
+        self._book_ids: Dict[str, int] = {}
+
+        # Verse id -> reference columns; verse id v has doc ids 2v (Hebrew) and 2v+1 (English)
+        self.verse_book = array('B')
+        self.verse_chapter = array('H')
+        self.verse_number = array('H')
+
+        # (book_id, chapter) -> verse ids of its current version
+        self._chapters: Dict[Tuple[int, int], range] = {}
+        self.deleted: Set[int] = set()
+
+        self.postings: Dict[str, Posting] = {}
+        self._sorted_terms: Optional[List[str]] = None
+
+        # Decoded posting lists, dropped whenever a term gets new documents
+        self._doc_cache: Dict[str, List[int]] = {}
+        self._doc_set_cache: Dict[str, Set[int]] = {}
+        self._start_cache: Dict[str, List[int]] = {}
+
+        # While chapters arrive in (book, chapter) order, verse id order is reference order
+        self._in_order = True
+        self._last_chapter: Tuple[int, int] = (-1, -1)
+
+    def __len__(self) -> int:
+        """Number of live verses"""
+        return len(self.verse_book) - len(self.deleted)
+
+    def _book_id(self, book_name: str) -> int:
+        book_id = self._book_ids.get(book_name)
+        if book_id is None:
+            book_id = self._book_ids[book_name] = len(self.book_names)
+            self.book_names.append(book_name)
+        return book_id
+
+    def has_chapter(self, book_name: str, chapter: int) -> bool:
+        return (self._book_ids.get(book_name), chapter) in self._chapters
+
+    def add_chapter(self, book_name: str, chapter: int, hebrew: Sequence[str] = (),
+                    english: Sequence[str] = ()):
+        """Index a chapter, replacing (tombstoning) any previously indexed version"""
+        book_id = self._book_id(book_name)
+        previous = self._chapters.get((book_id, chapter))
+        if previous is not None:
+            self.deleted.update(previous)
+
+        if (book_id, chapter) <= self._last_chapter:
+            self._in_order = False
+        self._last_chapter = (book_id, chapter)
+
+        first = len(self.verse_book)
+        count = max(len(hebrew), len(english))
+        self.verse_book.extend([book_id] * count)
+        self.verse_chapter.extend([chapter] * count)
+        self.verse_number.extend(range(1, count + 1))
+        self._chapters[(book_id, chapter)] = range(first, first + count)
+
+        # Verse by verse, both languages per verse, so doc ids reach every posting in increasing order
+        for offset, verse_id in enumerate(range(first, first + count)):
+            for language, lines in enumerate((hebrew, english)):
+                if offset >= len(lines):
+                    continue
+                line = lines[offset]
+                term_positions: Dict[str, List[int]] = {}
+                for position, term in enumerate(tokenize(line)):
+                    term_positions.setdefault(term, []).append(position)
+
+                for term, positions in term_positions.items():
+                    posting = self.postings.get(term)
+                    if posting is None:
+                        posting = self.postings[term] = Posting()
+                        self._sorted_terms = None
+                    posting.add(verse_id * 2 + language, positions)
+                    self._doc_cache.pop(term, None)
+                    self._doc_set_cache.pop(term, None)
+                    self._start_cache.pop(term, None)
+
+    def add_table(self, table):
+        """Index every chapter of a verse_table.VerseTable"""
+        for book_name in table.book_names:
+            for chapter in table.chapter_numbers(book_name):
+                self.add_chapter(book_name, chapter, table.chapter(book_name, chapter, 'hebrew'),
+                                 table.chapter(book_name, chapter, 'english'))
+
+    def add_corpus(self, corpus):
+        """Index every chapter of a corpus_format.CorpusReader"""
+        for book_name in corpus.books:
+            for chapter in range(1, corpus.chapter_count(book_name) + 1):
+                self.add_chapter(book_name, chapter, corpus.chapter(book_name, chapter, 'hebrew'),
+                                 corpus.chapter(book_name, chapter, 'english'))
+
+    def _restore_order(self):
+        """Recompute the in-order flag after _chapters was replaced wholesale"""
+        keys = [key for key, _ in sorted(self._chapters.items(), key=lambda item: item[1].start)]
+        self._in_order = all(a < b for a, b in zip(keys, keys[1:]))
+        self._last_chapter = keys[-1] if keys else (-1, -1)
+
+    def compact(self) -> 'SearchIndex':
+        """A new index without tombstoned verses, postings remapped to dense verse ids"""
+        compacted = SearchIndex()
+        mapping = {}
+        for (book_id, chapter), verse_ids in sorted(self._chapters.items(),
+                                                    key=lambda item: item[1].start):
+            first = len(compacted.verse_book)
+            new_book_id = compacted._book_id(self.book_names[book_id])
+            compacted.verse_book.extend([new_book_id] * len(verse_ids))
+            compacted.verse_chapter.extend([chapter] * len(verse_ids))
+            compacted.verse_number.extend(range(1, len(verse_ids) + 1))
+            compacted._chapters[(new_book_id, chapter)] = range(first, first + len(verse_ids))
+            for offset, verse_id in enumerate(verse_ids):
+                mapping[verse_id] = first + offset
+
+        for term, posting in self.postings.items():
+            new_posting = None
+            start = 0
+            for doc, freq in zip(accumulate(posting.docs), posting.freqs):
+                positions = list(accumulate(posting.positions[start:start + freq]))
+                start += freq
+                verse_id = mapping.get(doc >> 1)
+                if verse_id is None:
+                    continue
+                if new_posting is None:
+                    new_posting = compacted.postings[term] = Posting()
+                new_posting.add(verse_id * 2 + (doc & 1), positions)
+
+        compacted._restore_order()
+        return compacted
+
+    def ref(self, verse_id: int) -> Tuple[str, int, int]:
+        """(book, chapter, verse) of a verse id"""
+        return (self.book_names[self.verse_book[verse_id]], self.verse_chapter[verse_id],
+                self.verse_number[verse_id])
+
+    def _docs(self, term: str) -> List[int]:
+        docs = self._doc_cache.get(term)
+        if docs is None:
+            posting = self.postings.get(term)
+            docs = self._doc_cache[term] = posting.doc_ids() if posting else []
+        return docs
+
+    def _doc_set(self, term: str) -> Set[int]:
+        docs = self._doc_set_cache.get(term)
+        if docs is None:
+            docs = self._doc_set_cache[term] = set(self._docs(term))
+        return docs
+
+    def _positions(self, term: str, doc: int) -> Set[int]:
+        """Positions of term in one doc known to contain it"""
+        starts = self._start_cache.get(term)
+        if starts is None:
+            starts = self._start_cache[term] = self.postings[term].position_starts()
+        docs = self._docs(term)
+        return self.postings[term].doc_positions(bisect_left(docs, doc), starts)
+
+    def _count(self, term: str) -> int:
+        posting = self.postings.get(term)
+        return len(posting.docs) if posting else 0
+
+    def term_docs(self, word: str) -> Set[int]:
+        """Doc ids containing a single word"""
+        tokens = tokenize(word)
+        if len(tokens) != 1:
+            return self.phrase_docs(word)
+        return self._doc_set(tokens[0])
+
+    def phrase_docs(self, text: str) -> Set[int]:
+        """Doc ids containing the words of text consecutively"""
+        tokens = tokenize(text)
+        if not tokens:
+            return set()
+
+        # Intersect starting from the rarest term
+        candidates = None
+        for term in sorted(set(tokens), key=self._count):
+            docs = self._doc_set(term)
+            candidates = set(docs) if candidates is None else candidates & docs
+            if not candidates:
+                return set()
+
+        if len(tokens) == 1:
+            return candidates
+
+        # Positions are decoded only for the candidate docs
+        matches = set()
+        for doc in candidates:
+            positions = [self._positions(term, doc) for term in tokens]
+            if any(all(start + i in positions[i] for i in range(1, len(tokens)))
+                   for start in positions[0]):
+                matches.add(doc)
+        return matches
+
+    def prefix_docs(self, prefix: str) -> Set[int]:
+        """Doc ids containing a word starting with prefix"""
+        tokens = tokenize(prefix)
+        if len(tokens) != 1:
+            return set()
+        prefix = tokens[0]
+
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self.postings)
+        terms = self._sorted_terms
+
+        docs = set()
+        for i in range(bisect_left(terms, prefix), len(terms)):
+            if not terms[i].startswith(prefix):
+                break
+            docs.update(self._doc_set(terms[i]))
+        return docs
+
+    def refs(self, docs: Iterable[int]) -> List[Tuple[str, int, int]]:
+        """Verse references of doc ids, without tombstoned verses, in book order"""
+        verse_ids = {doc >> 1 for doc in docs}
+        if self.deleted:
+            verse_ids -= self.deleted
+
+        if self._in_order:
+            return [self.ref(v) for v in sorted(verse_ids)]
+
+        refs = [(self.verse_book[v], self.verse_chapter[v], self.verse_number[v]) for v in verse_ids]
+        refs.sort()
+        return [(self.book_names[book_id], chapter, verse) for book_id, chapter, verse in refs]
+
+    def term(self, word: str) -> List[Tuple[str, int, int]]:
+        return self.refs(self.term_docs(word))
+
+    def phrase(self, text: str) -> List[Tuple[str, int, int]]:
+        return self.refs(self.phrase_docs(text))
+
+    def prefix(self, prefix: str) -> List[Tuple[str, int, int]]:
+        return self.refs(self.prefix_docs(prefix))
+
+    def search(self, query: str) -> List[Tuple[str, int, int]]:
+        """Verses matching every part of query: "quoted phrases", prefix* words and words"""
+        matches = []
+        for phrase, word in re.findall(r'"([^"]*)"|(\S+)', query):
+            if phrase:
+                matches.append(self.phrase_docs(phrase))
+            elif word.endswith('*'):
+                matches.append(self.prefix_docs(word[:-1]))
+            else:
+                matches.append(self.term_docs(word))
+
+        if not matches:
+            return []
+
+        # Parts may match in different languages of the same verse; filter
+        # the smallest part's verses by membership in the others
+        matches.sort(key=len)
+        verses = {doc >> 1 for doc in matches[0]}
+        for docs in matches[1:]:
+            verses = {v for v in verses if v * 2 in docs or v * 2 + 1 in docs}
+            if not verses:
+                return []
+
+        return self.refs(v * 2 for v in verses)
+
+    def save(self, path: str):
+        """Write the index atomically"""
+        terms = sorted(self.postings)
+        header = {
+            'version': FORMAT_VERSION,
+            'byteorder': sys.byteorder,
+            'books': self.book_names,
+            'verses': len(self.verse_book),
+            'chapters': [[book_id, chapter, verse_ids.start, len(verse_ids)]
+                         for (book_id, chapter), verse_ids in self._chapters.items()],
+            'deleted': sorted(self.deleted),
+            'terms': [[term, len(self.postings[term].docs), len(self.postings[term].positions)]
+                      for term in terms],
+        }
+        header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+
+        tmp_path = Path(path).with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('=I', len(header_bytes)))
+            f.write(header_bytes)
+            for column in (self.verse_book, self.verse_chapter, self.verse_number):
+                column.tofile(f)
+            for field in ('docs', 'freqs', 'positions'):
+                for term in terms:
+                    getattr(self.postings[term], field).tofile(f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'SearchIndex':
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a search index file")
+
+        (header_len,) = struct.unpack_from('=I', data, len(MAGIC))
+        pos = len(MAGIC) + 4
+        header = json.loads(data[pos:pos + header_len])
+        pos += header_len
+
+        if header['version'] != FORMAT_VERSION or header['byteorder'] != sys.byteorder:
+            raise ValueError(f"Unsupported search index {path}: version {header['version']}, "
+                             f"{header['byteorder']} endian")
+
+        def read(typecode: str, count: int) -> array:
+            nonlocal pos
+            column = array(typecode)
+            size = count * column.itemsize
+            column.frombytes(data[pos:pos + size])
+            pos += size
+            return column
+
+        index = cls()
+        for book_name in header['books']:
+            index._book_id(book_name)
+        n_verses = header['verses']
+        index.verse_book = read('B', n_verses)
+        index.verse_chapter = read('H', n_verses)
+        index.verse_number = read('H', n_verses)
+        index._chapters = {(book_id, chapter): range(start, start + count)
+                           for book_id, chapter, start, count in header['chapters']}
+        index.deleted = set(header['deleted'])
+        index._restore_order()
+
+        postings = []
+        for term, _, _ in header['terms']:
+            postings.append(index.postings.setdefault(term, Posting()))
+        for posting, (_, n_docs, _) in zip(postings, header['terms']):
+            posting.docs = read('I', n_docs)
+        for posting, (_, n_docs, _) in zip(postings, header['terms']):
+            posting.freqs = read('H', n_docs)
+        for posting, (_, _, n_positions) in zip(postings, header['terms']):
+            posting.positions = read('H', n_positions)
+            posting.last_doc = sum(posting.docs)
+
+        return index
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == 'build':
+        from corpus_format import CorpusReader
+
+        index = SearchIndex()
+        with CorpusReader(sys.argv[2]) as corpus:
+            index.add_corpus(corpus)
+        index.save(sys.argv[3])
+        print(f"Wrote {sys.argv[3]}: {len(index)} verses, {len(index.postings)} terms")
+        return 0
+
+    if len(sys.argv) >= 4 and sys.argv[1] == 'search':
+        index = SearchIndex.load(sys.argv[2])
+        refs = index.search(' '.join(sys.argv[3:]))
+        for book_name, chapter, verse in refs:
+            print(f"{book_name} {chapter}:{verse}")
+        print(f"{len(refs)} verses")
+        return 0
+
+    print("Usage: search_index.py build <corpus_file> <index_file>")
+    print('       search_index.py search <index_file> <query>   (words, "phrases", prefix*)')
+    return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
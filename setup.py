@@ -27,6 +27,28 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/yourusername/bible-mathematical-discovery",
     packages=find_packages(),
+    py_modules=[
+        "api_server",
+        "async_downloader",
+        "bible_cli",
+        "bible_downloader_gui",
+        "bulk_downloader",
+        "chapter_index",
+        "clean_bible_downloader",
+        "corpus_format",
+        "els",
+        "frequency_analysis",
+        "gematria",
+        "gematria_index",
+        "http_transport",
+        "response_cache",
+        "search_index",
+        "significance",
+        "sqlite_store",
+        "text_cleaner",
+        "text_writers",
+        "verse_table",
+    ],
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Science/Research",
@@ -56,12 +78,18 @@ setup(
             "scipy>=1.6.0",
             "matplotlib>=3.3.0",
         ],
+        "async": [
+            "aiohttp>=3.8",
+        ],
     },
     entry_points={
         "console_scripts": [
             "bible-analyzer=full_bible_analyzer:main",
             "bible-downloader=clean_bible_downloader:main",
         ],
+        "gui_scripts": [
+            "bible-downloader-gui=bible_downloader_gui:main",
+        ],
     },
     include_package_data=True,
     package_data={
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo Significance Testing
+
+Compares a corpus-level statistic on the real Hebrew letter stream with its
+distribution over N shuffled control texts. A statistic is any picklable
+callable statistic(letters, corpus) -> float, where letters is a (possibly
+shuffled) array of GematriaCorpus letter codes and corpus supplies the word
+and verse boundaries, which shuffling keeps fixed.
+
+Controls:
+    letters   permute the whole letter stream
+    verses    permute letters within each verse
+
+Shuffle i uses its own generator spawned from one SeedSequence, so results
+are reproducible for a seed whatever the number of workers. Shuffles are
+evaluated in chunks across a process pool.
+
+Requires NumPy (the 'analysis' extra).
+"""
+
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+from typing import Callable, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError("significance requires NumPy: pip install numpy") from e
+
+from gematria import SCHEMES, GematriaCorpus, letter_codes, segment_sums
+
+Statistic = Callable[['np.ndarray', GematriaCorpus], float]
+
+CONTROLS = ('letters', 'verses')
+ALTERNATIVES = ('greater', 'less', 'two-sided')
+
+class WordValueCount:
+    """Number of words whose gematria equals value"""
+
+    def __init__(self, value: int, scheme: str = 'standard'):
+        self.value = value
+        self.scheme = scheme
+
+    def __call__(self, letters: 'np.ndarray', corpus: GematriaCorpus) -> float:
+        sums = segment_sums(SCHEMES[self.scheme][letters], corpus.word_starts)
+        return float(np.count_nonzero(sums == self.value))
+
+class VerseSumMultiple:
+    """Number of verses whose gematria total is a multiple of divisor"""
+
+    def __init__(self, divisor: int, scheme: str = 'standard'):
+        self.divisor = divisor
+        self.scheme = scheme
+
+    def __call__(self, letters: 'np.ndarray', corpus: GematriaCorpus) -> float:
+        sums = segment_sums(SCHEMES[self.scheme][letters], corpus.verse_letter_starts)
+        return float(np.count_nonzero(sums % self.divisor == 0))
+
+class VerseInitialLetter:
+    """Number of verses beginning with a letter (final forms count as distinct letters)"""
+
+    def __init__(self, letter: str):
+        codes = letter_codes(letter)
+        if len(codes) != 1:
+            raise ValueError(f"'{letter}' is not a single Hebrew letter")
+        self.code = int(codes[0])
+
+    def __call__(self, letters: 'np.ndarray', corpus: GematriaCorpus) -> float:
+        starts = corpus.verse_letter_starts
+        starts = starts[starts < len(letters)]
+        return float(np.count_nonzero(letters[starts] == self.code))
+
+class ELSCount:
+    """Number of ELS hits of a term at skips ±min_skip..max_skip"""
+
+    def __init__(self, term: str, min_skip: int = 2, max_skip: int = 100):
+        self.term = term
+        self.min_skip = min_skip
+        self.max_skip = max_skip
+
+    def __call__(self, letters: 'np.ndarray', corpus: GematriaCorpus) -> float:
+        # Imported here so pool workers only load els when the statistic needs it
+        from els import fold_finals, letter_positions, search_skips, term_codes
+
+        folded = fold_finals(letters)
+        skips = np.arange(self.min_skip, self.max_skip + 1)
+        skips = np.concatenate((skips, -skips))
+        return float(len(search_skips(folded, letter_positions(folded), term_codes(self.term), skips)))
+
+def shuffle_letters(corpus: GematriaCorpus, rng: 'np.random.Generator', control: str,
+                    verse_ids: Optional['np.ndarray'] = None) -> 'np.ndarray':
+    """One control text: corpus.letters shuffled as the control describes"""
+    if control == 'letters':
+        return rng.permutation(corpus.letters)
+    if control == 'verses':
+        # Random keys within each verse's integer band keep letters in their verse
+        if verse_ids is None:
+            verse_ids = _verse_ids(corpus)
+        return corpus.letters[np.argsort(verse_ids + rng.random(len(verse_ids)))]
+    raise ValueError(f"unknown control '{control}', expected one of {', '.join(CONTROLS)}")
+
+def _verse_ids(corpus: GematriaCorpus) -> 'np.ndarray':
+    """Verse row of every letter"""
+    lengths = np.diff(corpus.verse_letter_starts, append=len(corpus.letters))
+    return np.repeat(np.arange(len(lengths), dtype=np.float64), lengths)
+
+def _evaluate(corpus: GematriaCorpus, statistic: Statistic, control: str,
+              seeds: List['np.random.SeedSequence']) -> List[float]:
+    verse_ids = _verse_ids(corpus) if control == 'verses' else None
+    return [statistic(shuffle_letters(corpus, np.random.default_rng(seed), control, verse_ids), corpus)
+            for seed in seeds]
+
+# Worker state, set once per process by _init_worker
+_worker_args = None
+
+def _init_worker(corpus: GematriaCorpus, statistic: Statistic, control: str):
+    global _worker_args
+    _worker_args = (corpus, statistic, control)
+
+def _evaluate_task(seeds: List['np.random.SeedSequence']) -> List[float]:
+    return _evaluate(*_worker_args, seeds)
+
+def wilson_interval(successes: int, trials: int, confidence: float = 0.95) -> List[float]:
+    """Wilson score interval for a binomial proportion"""
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = successes / trials
+    center = (p + z * z / (2 * trials)) / (1 + z * z / trials)
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / (1 + z * z / trials)
+    # The interval always contains p; clamping keeps rounding from excluding p = 0 or 1
+    return [min(p, max(0.0, center - margin)), max(p, min(1.0, center + margin))]
+
+class ShuffleTest:
+    """Permutation test of one statistic against shuffled control texts"""
+
+    def __init__(self, corpus: GematriaCorpus, statistic: Statistic, control: str = 'letters',
+                 seed: int = 0):
+        if control not in CONTROLS:
+            raise ValueError(f"unknown control '{control}', expected one of {', '.join(CONTROLS)}")
+        self.corpus = corpus
+        self.statistic = statistic
+        self.control = control
+        self.seed = seed
+
+    def null_distribution(self, shuffles: int, workers: Optional[int] = None) -> 'np.ndarray':
+        """Statistic on each of the shuffled texts, in shuffle order"""
+        seeds = np.random.SeedSequence(self.seed).spawn(shuffles)
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or shuffles < 2:
+            return np.array(_evaluate(self.corpus, self.statistic, self.control, seeds))
+
+        # A few chunks per worker balance uneven statistic costs without much pickling
+        chunk = max(1, math.ceil(shuffles / (workers * 4)))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.corpus, self.statistic, self.control)) as executor:
+            results = executor.map(_evaluate_task,
+                                   [seeds[i:i + chunk] for i in range(0, shuffles, chunk)])
+            return np.array([value for values in results for value in values])
+
+    def run(self, shuffles: int = 1000, workers: Optional[int] = None,
+            alternative: str = 'greater', confidence: float = 0.95) -> Dict:
+        """Observed value, null summary, p-value with confidence intervals and throughput
+
+        The p-value counts the observed text as one of the permutations,
+        (1 + extreme) / (1 + shuffles), so it is never zero. p_value_interval
+        is the Wilson interval of the Monte Carlo estimate; null_interval is
+        the central interval of the null distribution.
+        """
+        if alternative not in ALTERNATIVES:
+            raise ValueError(f"unknown alternative '{alternative}', expected one of {', '.join(ALTERNATIVES)}")
+        if shuffles < 1:
+            raise ValueError("shuffles must be at least 1")
+
+        observed = float(self.statistic(self.corpus.letters, self.corpus))
+
+        start = time.perf_counter()
+        null = self.null_distribution(shuffles, workers)
+        elapsed = time.perf_counter() - start
+
+        mean = float(null.mean())
+        if alternative == 'greater':
+            extreme = int(np.count_nonzero(null >= observed))
+        elif alternative == 'less':
+            extreme = int(np.count_nonzero(null <= observed))
+        else:
+            extreme = int(np.count_nonzero(np.abs(null - mean) >= abs(observed - mean)))
+
+        tail = (1 - confidence) / 2
+        std = float(null.std(ddof=1)) if shuffles > 1 else 0.0
+        return {
+            'statistic': type(self.statistic).__name__,
+            'control': self.control,
+            'seed': self.seed,
+            'shuffles': shuffles,
+            'observed': observed,
+            'null_mean': mean,
+            'null_std': std,
+            'z_score': (observed - mean) / std if std > 0 else None,
+            'alternative': alternative,
+            'p_value': (1 + extreme) / (1 + shuffles),
+            'p_value_interval': wilson_interval(1 + extreme, 1 + shuffles, confidence),
+            'null_interval': [float(np.quantile(null, tail)), float(np.quantile(null, 1 - tail))],
+            'confidence': confidence,
+            'elapsed': round(elapsed, 3),
+            'shuffles_per_second': round(shuffles / elapsed, 1) if elapsed > 0 else None,
+        }
+
+def main():
+    import json
+
+    statistics = {
+        'els': lambda arg: ELSCount(arg),
+        'word-value': lambda arg: WordValueCount(int(arg)),
+        'verse-multiple': lambda arg: VerseSumMultiple(int(arg)),
+        'verse-initial': lambda arg: VerseInitialLetter(arg),
+    }
+    if len(sys.argv) in (4, 5, 6) and sys.argv[2] in statistics:
+        from corpus_format import CorpusReader
+
+        with CorpusReader(sys.argv[1]) as reader:
+            corpus = GematriaCorpus.from_corpus(reader)
+        statistic = statistics[sys.argv[2]](sys.argv[3])
+        shuffles = int(sys.argv[4]) if len(sys.argv) > 4 else 1000
+        control = sys.argv[5] if len(sys.argv) > 5 else 'letters'
+        print(json.dumps(ShuffleTest(corpus, statistic, control).run(shuffles), indent=2))
+        return 0
+
+    print("Usage: significance.py <corpus_file> <statistic> <argument> [shuffles] [control]")
+    print(f"       statistic: {', '.join(statistics)}; control: {', '.join(CONTROLS)}")
+    return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
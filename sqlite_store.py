@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+SQLite Store
+
+Keeps downloaded chapters in one SQLite database instead of a directory of
+.txt files:
+
+    versions  (id, name)                                  he-en, he, en, ...
+    books     (id, name, position)                        position = canon order
+    chapters  (id, book_id, version_id, chapter, verse_count)
+    verses    (id, chapter_id, verse, hebrew, english)
+    verses_fts                                            FTS5, rowid = verses.id
+
+The database runs in WAL mode so readers never block the writer. Each book
+is written in one transaction with one executemany per table, and a
+re-downloaded chapter replaces the stored copy. The FTS table holds the
+search_index tokens of each verse (Hebrew without niqqud or cantillation,
+final letters folded; English lower-cased), so the same queries work as
+with SearchIndex: words, "phrases" and prefix* terms, ANDed per verse.
+"""
+
+import json
+import re
+import sqlite3
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from clean_bible_downloader import BIBLE_BOOKS
+from search_index import tokenize
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS books (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    position INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chapters (
+    id INTEGER PRIMARY KEY,
+    book_id INTEGER NOT NULL REFERENCES books(id),
+    version_id INTEGER NOT NULL REFERENCES versions(id),
+    chapter INTEGER NOT NULL,
+    verse_count INTEGER NOT NULL,
+    UNIQUE (book_id, version_id, chapter)
+);
+CREATE TABLE IF NOT EXISTS verses (
+    id INTEGER PRIMARY KEY,
+    chapter_id INTEGER NOT NULL REFERENCES chapters(id),
+    verse INTEGER NOT NULL,
+    hebrew TEXT,
+    english TEXT,
+    UNIQUE (chapter_id, verse)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS verses_fts USING fts5(hebrew, english);
+"""
+
+# Canonical book order; books outside BIBLE_BOOKS sort after it
+_CANON = {book_name: i for i, book_name in enumerate(BIBLE_BOOKS.values())}
+
+_VERSE_SELECT = """
+    SELECT b.name, c.chapter, v.verse, v.{language}
+    FROM verses v
+    JOIN chapters c ON c.id = v.chapter_id
+    JOIN books b ON b.id = c.book_id
+    JOIN versions r ON r.id = c.version_id
+"""
+
+def _search_text(text: Optional[str]) -> str:
+    return ' '.join(tokenize(text)) if text else ''
+
+def fts_query(query: str) -> str:
+    """FTS5 MATCH expression for a SearchIndex.search style query"""
+    parts = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', query):
+        tokens = tokenize(phrase or word)
+        if tokens:
+            prefix = '*' if not phrase and word.endswith('*') else ''
+            parts.append('"' + ' '.join(tokens) + '"' + prefix)
+    return ' AND '.join(parts)
+
+class SQLiteBookWriter:
+    """Collect a book's chapters and store them in one transaction
+
+    Has the write_chapter / close / abort interface of StreamingBookWriter,
+    so it can replace the text files wherever a book is streamed.
+    """
+
+    def __init__(self, store: 'SQLiteStore', book_name: str, version: str):
+        self.store = store
+        self.book_name = book_name
+        self.version = version
+        self.chapters_written = 0
+        self._chapters: List[Tuple[int, List[str], List[str]]] = []
+
+    def write_chapter(self, data: Dict, chapter: Optional[int] = None):
+        """Queue one cleaned chapter; without a number chapters count up from 1"""
+        self.chapters_written += 1
+        number = chapter if chapter is not None else self.chapters_written
+        self._chapters.append((number, data['hebrew'], data['english']))
+
+    def close(self) -> List[str]:
+        """Store the queued chapters, returning the database file name"""
+        if self._chapters:
+            self.store.write_chapters(self.book_name, self.version, self._chapters)
+            self._chapters = []
+        return [Path(self.store.path).name]
+
+    def abort(self):
+        """Store the chapters that did finish, like the '.part' files of an aborted download"""
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+class SQLiteStore:
+    """Verse storage and full-text search in a SQLite database"""
+
+    def __init__(self, path: str):
+        self.path = path
+        # Transactions are explicit (see transaction()), so autocommit mode
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA foreign_keys=ON')
+        self.conn.executescript(SCHEMA)
+        self._ids: Dict[Tuple[str, str], int] = {}
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @contextmanager
+    def transaction(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            # Ids handed out inside the transaction are gone
+            self._ids.clear()
+            raise
+        self.conn.execute('COMMIT')
+
+    def _id(self, table: str, name: str) -> int:
+        """Id of a book or version, inserting it on first use (inside a transaction)"""
+        key = (table, name)
+        row_id = self._ids.get(key)
+        if row_id is None:
+            row = self.conn.execute(f'SELECT id FROM {table} WHERE name = ?', (name,)).fetchone()
+            if row is not None:
+                row_id = row[0]
+            elif table == 'books':
+                position = _CANON.get(name, len(_CANON) + self.conn.execute(
+                    'SELECT COUNT(*) FROM books').fetchone()[0])
+                row_id = self.conn.execute('INSERT INTO books (name, position) VALUES (?, ?)',
+                                           (name, position)).lastrowid
+            else:
+                row_id = self.conn.execute(f'INSERT INTO {table} (name) VALUES (?)',
+                                           (name,)).lastrowid
+            self._ids[key] = row_id
+        return row_id
+
+    def _next_id(self, table: str) -> int:
+        return self.conn.execute(f'SELECT COALESCE(MAX(id), 0) + 1 FROM {table}').fetchone()[0]
+
+    def write_chapters(self, book_name: str, version: str,
+                       chapters: Iterable[Tuple[int, Sequence[str], Sequence[str]]]) -> int:
+        """Store (chapter, hebrew, english) tuples of one book in one transaction
+
+        Stored copies of the same chapters are replaced. Returns the number
+        of verses written.
+        """
+        with self.transaction():
+            book_id = self._id('books', book_name)
+            version_id = self._id('versions', version)
+            chapters = list(chapters)
+
+            keys = [(book_id, version_id, chapter) for chapter, _, _ in chapters]
+            self.conn.executemany("""
+                DELETE FROM verses_fts WHERE rowid IN (
+                    SELECT v.id FROM verses v JOIN chapters c ON c.id = v.chapter_id
+                    WHERE c.book_id = ? AND c.version_id = ? AND c.chapter = ?)""", keys)
+            self.conn.executemany("""
+                DELETE FROM verses WHERE chapter_id IN (
+                    SELECT id FROM chapters WHERE book_id = ? AND version_id = ? AND chapter = ?)""",
+                                  keys)
+            self.conn.executemany(
+                'DELETE FROM chapters WHERE book_id = ? AND version_id = ? AND chapter = ?', keys)
+
+            # Ids are assigned here so the FTS rows can share them without a round trip
+            chapter_id = self._next_id('chapters')
+            verse_id = self._next_id('verses')
+            chapter_rows, verse_rows, fts_rows = [], [], []
+            for chapter, hebrew, english in chapters:
+                count = max(len(hebrew), len(english))
+                chapter_rows.append((chapter_id, book_id, version_id, chapter, count))
+                for i in range(count):
+                    hebrew_line = hebrew[i] if i < len(hebrew) else None
+                    english_line = english[i] if i < len(english) else None
+                    verse_rows.append((verse_id, chapter_id, i + 1, hebrew_line, english_line))
+                    fts_rows.append((verse_id, _search_text(hebrew_line), _search_text(english_line)))
+                    verse_id += 1
+                chapter_id += 1
+
+            self.conn.executemany('INSERT INTO chapters VALUES (?, ?, ?, ?, ?)', chapter_rows)
+            self.conn.executemany('INSERT INTO verses VALUES (?, ?, ?, ?, ?)', verse_rows)
+            self.conn.executemany('INSERT INTO verses_fts (rowid, hebrew, english) VALUES (?, ?, ?)',
+                                  fts_rows)
+        return len(verse_rows)
+
+    def book_writer(self, book_name: str, version: str = 'he-en') -> SQLiteBookWriter:
+        return SQLiteBookWriter(self, book_name, version)
+
+    def save_book(self, book_name: str, result: Dict, version: str = 'he-en') -> int:
+        """Store a download_book result, using its VerseTable for chapter boundaries"""
+        table = result.get('verses')
+        if table is None:
+            chapters = [(1, result['hebrew'], result['english'])]
+        else:
+            chapters = [(chapter, table.chapter(book_name, chapter, 'hebrew'),
+                         table.chapter(book_name, chapter, 'english'))
+                        for chapter in table.chapter_numbers(book_name)]
+        return self.write_chapters(book_name, version, chapters)
+
+    def books(self, version: str = 'he-en') -> List[str]:
+        """Stored books of a version, in canonical order"""
+        rows = self.conn.execute("""
+            SELECT DISTINCT b.name, b.position FROM books b
+            JOIN chapters c ON c.book_id = b.id JOIN versions r ON r.id = c.version_id
+            WHERE r.name = ? ORDER BY b.position""", (version,))
+        return [name for name, _ in rows]
+
+    def chapter_numbers(self, book_name: str, version: str = 'he-en') -> List[int]:
+        rows = self.conn.execute("""
+            SELECT c.chapter FROM chapters c
+            JOIN books b ON b.id = c.book_id JOIN versions r ON r.id = c.version_id
+            WHERE b.name = ? AND r.name = ? ORDER BY c.chapter""", (book_name, version))
+        return [chapter for (chapter,) in rows]
+
+    def verse(self, book_name: str, chapter: int, verse: int, language: str = 'hebrew',
+              version: str = 'he-en') -> Optional[str]:
+        """Text of a verse ('' if it has none in that language), or None if it is not stored"""
+        row = self.conn.execute(
+            _VERSE_SELECT.format(language=self._column(language))
+            + 'WHERE b.name = ? AND c.chapter = ? AND v.verse = ? AND r.name = ?',
+            (book_name, chapter, verse, version)).fetchone()
+        return None if row is None else row[3] or ''
+
+    def chapter(self, book_name: str, chapter: int, language: str = 'hebrew',
+                version: str = 'he-en') -> List[str]:
+        """All verses of a chapter"""
+        rows = self.conn.execute(
+            _VERSE_SELECT.format(language=self._column(language))
+            + 'WHERE b.name = ? AND c.chapter = ? AND r.name = ? ORDER BY v.verse',
+            (book_name, chapter, version))
+        return [text or '' for *_, text in rows]
+
+    def iter_verses(self, language: str = 'hebrew',
+                    version: str = 'he-en') -> Iterator[Tuple[str, int, int, str]]:
+        """(book, chapter, verse, text) for the whole version in order, as CorpusReader.iter_verses"""
+        rows = self.conn.execute(
+            _VERSE_SELECT.format(language=self._column(language))
+            + 'WHERE r.name = ? ORDER BY b.position, c.chapter, v.verse', (version,))
+        for book_name, chapter, verse, text in rows:
+            yield book_name, chapter, verse, text or ''
+
+    def search(self, query: str, language: Optional[str] = None, version: Optional[str] = None,
+               limit: Optional[int] = None) -> List[Tuple[str, int, int, str]]:
+        """(book, chapter, verse, version) of verses matching a query, in canonical order
+
+        language restricts matching to the 'hebrew' or 'english' column.
+        """
+        match = fts_query(query)
+        if not match:
+            return []
+        if language is not None:
+            match = f"{self._column(language)} : ({match})"
+
+        sql = """
+            SELECT b.name, c.chapter, v.verse, r.name
+            FROM verses_fts f
+            JOIN verses v ON v.id = f.rowid
+            JOIN chapters c ON c.id = v.chapter_id
+            JOIN books b ON b.id = c.book_id
+            JOIN versions r ON r.id = c.version_id
+            WHERE verses_fts MATCH ?"""
+        params: list = [match]
+        if version is not None:
+            sql += ' AND r.name = ?'
+            params.append(version)
+        sql += ' ORDER BY b.position, c.chapter, v.verse, r.name'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return self.conn.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _column(language: str) -> str:
+        if language not in ('hebrew', 'english'):
+            raise ValueError(f"unknown language '{language}'")
+        return language
+
+def import_bulk_download(store: SQLiteStore, input_dir: str, version: str = 'he-en') -> int:
+    """Store every completed chapter of a BulkDownloader output directory, one transaction per book"""
+    with open(Path(input_dir) / 'manifest.json', 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    verses = 0
+    for book_name, chapters in manifest['completed'].items():
+        book = []
+        for chapter in sorted(chapters):
+            with open(Path(input_dir) / 'chapters' / book_name / f"{chapter}.json",
+                      'r', encoding='utf-8') as f:
+                data = json.load(f)
+            book.append((chapter, data['hebrew'], data['english']))
+        verses += store.write_chapters(book_name, version, book)
+    return verses
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == 'import':
+        with SQLiteStore(sys.argv[3]) as store:
+            verses = import_bulk_download(store, sys.argv[2])
+        print(f"Stored {verses} verses in {sys.argv[3]}")
+        return 0
+
+    if len(sys.argv) == 4 and sys.argv[1] == 'search':
+        with SQLiteStore(sys.argv[2]) as store:
+            for book_name, chapter, verse, version in store.search(sys.argv[3]):
+                print(f"{book_name} {chapter}:{verse}  {store.verse(book_name, chapter, verse, 'english', version)}")
+        return 0
+
+    if len(sys.argv) in (5, 6) and sys.argv[1] == 'show':
+        with SQLiteStore(sys.argv[2]) as store:
+            book_name, chapter = sys.argv[3], int(sys.argv[4])
+            if len(sys.argv) == 6:
+                verse = int(sys.argv[5])
+                print(store.verse(book_name, chapter, verse, 'hebrew'))
+                print(store.verse(book_name, chapter, verse, 'english'))
+            else:
+                for line in store.chapter(book_name, chapter, 'hebrew'):
+                    print(line)
+        return 0
+
+    print("Usage: sqlite_store.py import <bulk_download_dir> <database>")
+    print("       sqlite_store.py search <database> <query>")
+    print("       sqlite_store.py show <database> <book> <chapter> [verse]")
+    return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
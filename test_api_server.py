@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Test API Server - routing, errors and server-sent events
+"""
+
+import http.client
+import json
+import threading
+
+import pytest
+
+from api_server import ApiServer, BibleApi
+from tests.stub_server import StubSefariaServer
+
+@pytest.fixture
+def server(tmp_path):
+    with StubSefariaServer(chapters=3, verses=2, latency=0) as stub:
+        api = BibleApi(stub.downloader(requests_per_second=0), str(tmp_path))
+        server = ApiServer(('127.0.0.1', 0), api)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+        server.server_close()
+
+def request(server, method: str, path: str, body=None):
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+    connection.request(method, path, json.dumps(body) if body is not None else None)
+    response = connection.getresponse()
+    return response.status, response.read()
+
+def test_text_and_api_errors(server):
+    status, body = request(server, 'GET', '/api/text/Genesis/2?version=he')
+    assert status == 200 and len(json.loads(body)['verses']) == 2
+
+    assert request(server, 'GET', '/api/text/Genesis/9')[0] == 404
+    assert request(server, 'POST', '/api/jobs/x/cancel')[0] == 404
+
+def test_unexpected_exception_is_a_json_500(server):
+    def fail(*args):
+        raise RuntimeError('boom')
+    server.api.books = fail
+    server.api.jobs.start = fail
+
+    for method, path, data in (('GET', '/api/books', None), ('POST', '/api/jobs', {'book': 'Ruth'})):
+        status, body = request(server, method, path, data)
+        assert status == 500
+        assert json.loads(body) == {'error': 'internal server error: boom'}
+
+def test_event_stream_reports_errors(server):
+    def fail():
+        raise RuntimeError('boom')
+    server.api.jobs.snapshot = fail
+
+    status, body = request(server, 'GET', '/api/events')
+    assert status == 200
+    assert body.decode('utf-8') == 'event: error\ndata: {"error": "internal server error: boom"}\n\n'
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test Bible CLI - chapter selections, job planning and version batching
+"""
+
+from pathlib import Path
+
+import pytest
+
+from bible_cli import build_jobs, parse_chapters, resolve_book
+from clean_bible_downloader import CleanBibleDownloader, batch_versions, split_versions
+
+def test_parse_chapters():
+    assert parse_chapters('1-3,2,8', 10) == [1, 2, 3, 8]
+    assert parse_chapters('9-', 10) == [9, 10]
+    assert parse_chapters('-2', 10) == [1, 2]
+    for bad in ('0', '4-2', '11', 'x'):
+        with pytest.raises(ValueError):
+            parse_chapters(bad, 10)
+
+def test_resolve_book():
+    assert resolve_book('samuel1') == 'I Samuel'
+    assert resolve_book(' song of songs ') == 'Song of Songs'
+    with pytest.raises(ValueError):
+        resolve_book('Maccabees')
+
+def test_duplicate_refs_make_one_job_per_output():
+    downloader = CleanBibleDownloader()
+    jobs = build_jobs(downloader, ['Genesis', 'Genesis', 'Ruth:1-2', 'ruth:2-3'], ['he', 'he', 'en'],
+                      Path('out'))
+    planned = [(job.book_name, job.version, job.whole_book, job.chapters) for job in jobs]
+    assert planned == [
+        ('Genesis', 'he', True, list(range(1, 51))),
+        ('Ruth', 'he', False, [1, 2, 3]),
+        ('Genesis', 'en', True, list(range(1, 51))),
+        ('Ruth', 'en', False, [1, 2, 3]),
+    ]
+    assert jobs[0].output_dir == Path('out') / 'he'
+
+def test_batch_and_split_versions():
+    koren = 'en:The Koren Jerusalem Bible'
+    # Default Hebrew and English share one request; the named English version needs its own
+    batches = batch_versions(['he-en', 'he', koren, 'en'])
+    assert batches == ['he-en', koren]
+
+    results = {batch: {'hebrew': ['א'], 'english': [batch]} for batch in batches}
+    assert split_versions(results, ['he', 'en', koren]) == {
+        'he': {'hebrew': ['א'], 'english': []},
+        'en': {'hebrew': [], 'english': ['he-en']},
+        koren: {'hebrew': [], 'english': [koren]},
+    }
+
+    failed = split_versions({'he-en': {'hebrew': [], 'english': [], 'error': 'boom'}}, ['he', 'en'])
+    assert failed['he']['error'] == failed['en']['error'] == 'boom'
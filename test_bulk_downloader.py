@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test Bulk Downloader - incremental sync against the stub server
+"""
+
+import json
+
+from bulk_downloader import BulkDownloader
+from response_cache import ResponseCache
+from tests.stub_server import StubSefariaServer
+
+BOOKS = ['Genesis', 'Obadiah']
+
+def test_sync_without_etags(tmp_path):
+    with StubSefariaServer(chapters=3, verses=2, latency=0) as stub:
+        stub.send_etags = False
+
+        def pipeline():
+            downloader = stub.downloader(requests_per_second=0,
+                                         cache=ResponseCache(str(tmp_path / 'cache'), max_age=None))
+            return BulkDownloader(downloader, str(tmp_path / 'out'), version='he-en')
+
+        first = pipeline().sync(BOOKS)
+        assert len(first['added']) == 6
+        manifest = json.loads((tmp_path / 'out' / 'manifest.json').read_text(encoding='utf-8'))
+        for book_name in BOOKS:
+            validators = manifest['validators'][book_name]
+            assert validators['versions'] == {'versionTitle': 'Stub English Translation',
+                                              'heVersionTitle': 'Stub Hebrew Edition'}
+            assert validators['revision']
+
+        # Unchanged books cost one versions listing each and no text requests
+        requests_before = stub.request_count
+        unchanged = pipeline().sync(BOOKS)
+        assert unchanged['unchanged_books'] == BOOKS
+        assert stub.request_count - requests_before == len(BOOKS)
+
+        stub.revised_chapters = {2}
+        revised = pipeline().sync(BOOKS)
+        assert revised['changed'] == ['Genesis.2', 'Obadiah.2']
+
+        # The response cache serves the revised text, not the one from the first sync
+        downloader = stub.downloader(cache=ResponseCache(str(tmp_path / 'cache')), offline=True)
+        assert downloader.download_chapter('Genesis', 2, 'en')['english'][0].endswith('(revised)')
+
+        forced = pipeline().sync(['Genesis'], force=True)
+        assert forced['unchanged_books'] == [] and forced['changed'] == []
+
+def test_single_chapter_book_keeps_version_titles():
+    with StubSefariaServer(chapters=1, verses=2, latency=0) as stub:
+        result = stub.downloader(requests_per_second=0).download_book_if_changed('Obadiah', 'he-en')
+        assert len(result['chapters']) == 1 and len(result['chapters'][0]['hebrew']) == 2
+        assert result['validators']['versions']['heVersionTitle'] == 'Stub Hebrew Edition'
+        assert result['validators']['revision']
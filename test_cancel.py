@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test Cancel - CancelToken in retry waits, batch interrupts and the asyncio downloader
+"""
+
+import asyncio
+import io
+import threading
+import time
+
+import pytest
+
+from bible_cli import BatchRunner, build_jobs
+from clean_bible_downloader import CancelToken, DownloadCancelled
+from tests.stub_server import StubSefariaServer
+
+def test_cancel_interrupts_retry_after_wait():
+    with StubSefariaServer(chapters=2, verses=2, latency=0, fail_every=1) as stub:
+        stub.retry_after = 30
+        downloader = stub.downloader(requests_per_second=0)
+        token = CancelToken()
+        threading.Timer(0.2, token.cancel).start()
+
+        start = time.perf_counter()
+        with pytest.raises(DownloadCancelled):
+            downloader.download_chapter('Genesis', 1, 'he', token)
+        assert time.perf_counter() - start < 5
+
+class InterruptingProgress(io.StringIO):
+    """Progress stream that raises KeyboardInterrupt at the first finished chapter"""
+
+    def write(self, text):
+        if '"event": "chapter"' in text:
+            raise KeyboardInterrupt
+        return super().write(text)
+
+def test_interrupted_batch_runs_no_queued_fetch(tmp_path):
+    with StubSefariaServer(chapters=10, verses=2, latency=0.1) as stub:
+        downloader = stub.downloader(requests_per_second=0)
+        jobs = build_jobs(downloader, ['Genesis'], ['he'], tmp_path)
+        runner = BatchRunner(downloader, jobs, workers=1, progress=InterruptingProgress())
+        with pytest.raises(KeyboardInterrupt):
+            runner.run()
+
+        # The first chapter and at most the one already in flight; the queued task never ran
+        assert runner.token.cancelled
+        assert stub.request_count <= 2
+
+def test_async_pause_and_cancel():
+    pytest.importorskip('aiohttp')
+    from async_downloader import AsyncCleanBibleDownloader
+
+    with StubSefariaServer(chapters=20, verses=2, latency=0.05) as stub:
+        async def run():
+            token = CancelToken()
+            async with AsyncCleanBibleDownloader(max_concurrency=2, requests_per_second=0,
+                                                 base_url=stub.base_url,
+                                                 chapter_index=stub.downloader().chapter_index) as downloader:
+                # Paused before starting: nothing is requested, and the event loop keeps running
+                token.pause()
+                download = asyncio.ensure_future(downloader.download_book('Genesis', 'he', token))
+                await asyncio.sleep(0.2)
+                assert stub.request_count == 0
+
+                token.resume()
+                await asyncio.sleep(0.15)
+                token.cancel()
+                return await asyncio.wait_for(download, 5)
+
+        result = asyncio.run(run())
+        assert result['cancelled']
+        assert 0 < len(result['hebrew']) < 40
+        assert stub.request_count < 20
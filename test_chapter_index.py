@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Test Chapter Index - bundled counts, refresh and whole-book conversion
+"""
+
+import json
+
+from chapter_index import INDEX_FILE, load_chapter_index, refresh_chapter_index
+from corpus_format import CorpusReader, convert_text_outputs
+from tests.stub_server import StubSefariaServer
+from text_writers import save_clean_text
+
+def test_bundled_verse_counts():
+    index = load_chapter_index(str(INDEX_FILE))
+    assert len(index.books) == 39
+    for book_name in index.books:
+        assert len(index.verse_counts(book_name)) == index.chapter_count(book_name)
+    assert sum(sum(index.verse_counts(book_name)) for book_name in index.books) == 23207
+    assert index.verse_count('Genesis', 1) == 31 and index.verse_count('Psalms', 119) == 176
+    assert index.verse_count('Genesis', 51) is None
+
+def test_refresh_writes_user_copy(tmp_path):
+    bundled = INDEX_FILE.read_bytes()
+    path = tmp_path / 'index' / 'chapter_index.json'
+    with StubSefariaServer(chapters=3, verses=4, latency=0) as stub:
+        index = refresh_chapter_index(stub.downloader(requests_per_second=0), str(path))
+
+    assert INDEX_FILE.read_bytes() == bundled
+    data = json.loads(path.read_text(encoding='utf-8'))
+    assert set(data) == {'format', 'revision', 'source', 'books'}
+    assert data['books']['Ruth'] == {'chapters': 3, 'verses': [4, 4, 4]}
+    assert index.source.startswith('Sefaria shape API') and index.verse_count('Ruth', 2) == 4
+
+def test_convert_hebrew_only_whole_book(tmp_path):
+    downloads = tmp_path / 'downloads'
+    downloads.mkdir()
+    verses = load_chapter_index(str(INDEX_FILE)).verse_counts('Ruth')
+    hebrew = [f"{chapter}:{verse}" for chapter, count in enumerate(verses, 1) for verse in range(1, count + 1)]
+    save_clean_text({'hebrew': hebrew, 'english': []}, str(downloads), 'Ruth_complete')
+    save_clean_text({'hebrew': hebrew[:-1], 'english': []}, str(downloads), 'Esther_complete')
+
+    result = convert_text_outputs(str(downloads), str(tmp_path / 'tanakh.corpus'),
+                                  load_chapter_index(str(INDEX_FILE)))
+    assert result == {'books': ['Ruth'], 'skipped': ['Esther']}
+    with CorpusReader(str(tmp_path / 'tanakh.corpus')) as corpus:
+        assert corpus.verse_count('Ruth', 3) == 18
+        assert corpus.verse('Ruth', 4, 1) == '4:1'
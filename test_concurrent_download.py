@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Test Concurrent Download - chapter order and the token-bucket rate limiter
+"""
+
+import random
+import threading
+import time
+
+from clean_bible_downloader import RateLimiter
+from tests.stub_server import StubSefariaServer
+
+class JitteryStub(StubSefariaServer):
+    """Stub whose responses finish in random order"""
+
+    def handle(self, request):
+        time.sleep(random.random() * 0.03)
+        super().handle(request)
+
+def test_chapters_come_back_in_order():
+    with JitteryStub(chapters=30, verses=2, latency=0) as stub:
+        downloader = stub.downloader(max_workers=8, requests_per_second=0)
+        received = [(chapter, data['english'][0].split(':', 1)[0])
+                    for chapter, data in downloader.iter_chapters('Genesis', range(1, 31), 'en')]
+        assert received == [(chapter, str(chapter)) for chapter in range(1, 31)]
+
+def test_rate_limiter_burst_then_rate():
+    limiter = RateLimiter(50, capacity=5)
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.acquire()
+    assert time.monotonic() - start < 0.05
+
+    # The next 25 tokens, taken by five threads, refill at 50 per second
+    def take():
+        for _ in range(25 // 5):
+            limiter.acquire()
+
+    threads = [threading.Thread(target=take) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert 0.45 <= time.monotonic() - start < 2
+
+def test_rate_limiter_disabled():
+    limiter = RateLimiter(0)
+    start = time.monotonic()
+    for _ in range(1000):
+        limiter.acquire()
+    assert time.monotonic() - start < 0.5
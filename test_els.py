@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test ELS - skip bounds, stream ends and both directions against brute force
+"""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from els import ELSIndex, term_codes
+from gematria import LETTERS
+
+def brute_force(letters, term, skips):
+    """Every (start, skip) whose sequence fits in letters and spells term"""
+    n, k = len(letters), len(term)
+    return {(start, skip) for skip in skips for start in range(n)
+            if 0 <= start + (k - 1) * skip < n
+            and all(letters[start + i * skip] == term[i] for i in range(k))}
+
+def sample_index() -> ELSIndex:
+    rng = np.random.default_rng(7)
+    letters = list('אבגדה')
+    verses = [('Genesis', 1, v, ''.join(rng.choice(letters, size=40))) for v in range(1, 11)]
+    return ELSIndex.from_verses(verses)
+
+@pytest.mark.parametrize('term', ['אב', 'גדה', 'הה'])
+def test_matches_brute_force(term):
+    index = sample_index()
+    codes = term_codes(term).tolist()
+    letters = index.letters.tolist()
+
+    hits = index.search(term, min_skip=3, max_skip=60, workers=1)
+    skips = list(range(3, 61)) + list(range(-60, -2))
+    assert {(hit['start'], hit['skip']) for hit in hits} == brute_force(letters, codes, skips)
+    assert [abs(hit['skip']) for hit in hits] == sorted(abs(hit['skip']) for hit in hits)
+
+def test_skip_bounds_are_inclusive_and_checked():
+    index = sample_index()
+    # A term made of the first and last letters fits exactly at the largest possible skip
+    last = len(index) - 1
+    word = ''.join(LETTERS[code - 1] for code in index.letters[[0, last]].tolist())
+
+    hits = index.search(word, min_skip=last, max_skip=last, workers=1)
+    assert (0, last) in {(hit['start'], hit['skip']) for hit in hits}
+    assert hits[0]['start_ref'] == ('Genesis', 1, 1) and hits[0]['end_ref'] == ('Genesis', 1, 10)
+    assert index.search(word, min_skip=last + 1, max_skip=last + 5, workers=1) == []
+
+    for min_skip, max_skip in ((0, 5), (5, 4)):
+        with pytest.raises(ValueError):
+            index.search(word, min_skip, max_skip)
+
+def test_process_pool_matches_single_process():
+    index = sample_index()
+    assert index.search('אב', 1, 600, workers=2) == index.search('אב', 1, 600, workers=1)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test Frequency Analysis - counts per book, chapter and verse against Counters
+"""
+
+import collections
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from frequency_analysis import FrequencyAnalyzer
+from gematria import GematriaCorpus
+
+VERSES = [
+    ('Genesis', 1, 1, 'בראשית ברא אלהים'),
+    ('Genesis', 1, 2, 'והארץ היתה תהו ובהו'),
+    ('Genesis', 2, 1, 'ויכלו השמים והארץ'),
+    ('Exodus', 1, 1, 'ואלה שמות בני ישראל'),
+]
+
+def grams(text: str, n: int) -> collections.Counter:
+    return collections.Counter(word[i:i + n] for word in text.split() for i in range(len(word) - n + 1))
+
+def test_ngram_counts_per_verse_chapter_and_book():
+    analyzer = FrequencyAnalyzer(GematriaCorpus.from_verses(VERSES), ngram_sizes=(2, 3))
+    genesis = analyzer.book('Genesis').as_columns()
+    assert analyzer.books == ['Genesis', 'Exodus']
+
+    for n in (2, 3):
+        table = genesis['ngrams'][str(n)]
+        expected = sum((grams(text, n) for book, _, _, text in VERSES if book == 'Genesis'),
+                       collections.Counter())
+        assert dict(zip(table['gram'], table['count'])) == expected
+
+        verse = table['verse']
+        found = collections.Counter()
+        for chapter, number, gram, count in zip(verse['chapter'], verse['verse'], verse['gram'], verse['count']):
+            found[(chapter, number, gram)] = count
+        assert found == collections.Counter({(chapter, number, gram): count
+                                             for book, chapter, number, text in VERSES if book == 'Genesis'
+                                             for gram, count in grams(text, n).items()})
+
+        chapter_one = {gram: count for chapter, gram, count in
+                       zip(table['chapter']['chapter'], table['chapter']['gram'], table['chapter']['count'])
+                       if chapter == 1}
+        assert chapter_one == grams(VERSES[0][3] + ' ' + VERSES[1][3], n)
+
+def test_words_and_letters():
+    result = FrequencyAnalyzer(GematriaCorpus.from_verses(VERSES)).book('Genesis')
+    assert dict(result.words) == collections.Counter(' '.join(text for book, _, _, text in VERSES[:3]).split())
+    assert result.words[0] == ('והארץ', 2)
+    assert int(result.letter_counts.sum()) == sum(len(text.replace(' ', '')) for _, _, _, text in VERSES[:3])
+    assert result.verse_letter_counts.shape[0] == 3
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test Gematria - value schemes and word / verse / chapter / book sums
+"""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from gematria import GematriaCorpus, gematria, letters_only, segment_sums
+
+@pytest.mark.parametrize('word, standard, ordinal, reduced', [
+    ('יהוה', 26, 26, 17),
+    ('אלהים', 86, 41, 14),
+    ('בראשית', 913, 76, 13),
+    ('שלום', 376, 52, 16),
+    ('קדש', 404, 44, 8),
+])
+def test_schemes(word, standard, ordinal, reduced):
+    assert gematria(word) == standard
+    assert gematria(word, 'ordinal') == ordinal
+    assert gematria(word, 'reduced') == reduced
+
+def test_marks_and_final_letters():
+    # Niqqud and cantillation are skipped; final letters count as their regular form
+    assert gematria('בְּרֵאשִׁ֖ית') == 913
+    assert letters_only('בְּרֵאשִׁ֖ית') == 'בראשית'
+    assert gematria('ם') == gematria('מ') == 40
+    assert gematria('ך', 'ordinal') == gematria('כ', 'ordinal') == 11
+    assert gematria('ץ', 'reduced') == 9
+    assert gematria('In the beginning') == 0
+
+def test_segment_sums_with_empty_segments():
+    values = np.array([1, 2, 3], dtype=np.uint16)
+    assert segment_sums(values, np.array([0, 0, 2, 3])).tolist() == [0, 3, 3, 0]
+    assert segment_sums(np.array([], dtype=np.uint16), np.array([0, 0])).tolist() == [0, 0]
+
+def test_corpus_sums():
+    corpus = GematriaCorpus.from_verses([
+        ('Genesis', 1, 1, 'בְּרֵאשִׁית בָּרָא אֱלֹהִים'),
+        ('Genesis', 1, 2, 'יהוה־אלהים'),      # maqaf separates words
+        ('Genesis', 1, 3, ''),
+        ('Genesis', 2, 1, 'אור׃'),
+        ('Exodus', 1, 1, 'ואלה שמות'),
+    ])
+    assert corpus.word_sums().tolist() == [913, 203, 86, 26, 86, 207, 42, 746]
+    assert corpus.verse_sums().tolist() == [1202, 112, 0, 207, 788]
+    assert corpus.chapter_sums().tolist() == [1314, 207, 788]
+    assert corpus.book_sums() == {'Genesis': 1521, 'Exodus': 788}
+    # Ordinal: בראשית 76 + ברא 23 + אלהים 41, ... ואלה 24 + שמות 62
+    assert corpus.verse_sums('ordinal').tolist() == [140, 67, 0, 27, 86]
+
+    assert corpus.word(1) == 'ברא' and corpus.word(6) == 'ואלה'
+    assert corpus.word_verse(np.array([0, 3, 5, 6, 7])).tolist() == [0, 1, 3, 4, 4]
+    assert corpus.verse_ref(4) == ('Exodus', 1, 1)
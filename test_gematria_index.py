@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Test Gematria Index - value lookups and the saved .npz
+"""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from gematria_index import GematriaIndex
+
+VERSES = [
+    ('Genesis', 1, 5, 'יום אחד'),
+    ('Deuteronomy', 6, 4, 'ה אחד'),
+    ('Deuteronomy', 6, 5, 'ואהבת את אהבה'),
+]
+
+def test_lookup():
+    index = GematriaIndex.from_verses(VERSES, ['standard', 'ordinal'])
+    # אחד = 1 + 8 + 4 and אהבה = 1 + 5 + 2 + 5
+    assert index.words(13) == [('אחד', 2), ('אהבה', 1)]
+    assert index.word_count(13) == 3
+    assert index.occurrences(13, limit=2) == [(('Genesis', 1, 5), 'אחד'), (('Deuteronomy', 6, 4), 'אחד')]
+    # יום + אחד = 56 + 13
+    assert index.verses(69) == [('Genesis', 1, 5)]
+    assert index.words(14) == [] and index.verses(1) == []
+
+    result = index.lookup(13, limit=1)
+    assert result['distinct_words'] == 2 and result['words'] == [{'word': 'אחד', 'count': 2}]
+    # Ordinal values: י = 10, ו = 6, ם = 13
+    assert index.words(29, 'ordinal') == [('יום', 1)] and index.words(29) == []
+    with pytest.raises(KeyError):
+        index.words(13, 'atbash')
+
+def test_save_load_round_trip(tmp_path):
+    index = GematriaIndex.from_verses(VERSES)
+    path = str(tmp_path / 'values.npz')
+    index.save(path)
+
+    loaded = GematriaIndex.load(path)
+    assert loaded.schemes == ['standard']
+    assert loaded.lookup(13) == index.lookup(13)
+    assert loaded.lookup(69) == index.lookup(69)
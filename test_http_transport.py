@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test HTTP Transport - retries on 429/5xx, the Retry-After cap and cancellable waits
+"""
+
+import threading
+import time
+from email.utils import formatdate
+
+import pytest
+
+from clean_bible_downloader import CancelToken, DownloadCancelled
+from http_transport import HTTPTransport, parse_retry_after
+from tests.stub_server import StubSefariaServer
+
+class RecordingToken(CancelToken):
+    """Token that records backoff waits instead of sleeping"""
+
+    def __init__(self):
+        super().__init__()
+        self.sleeps = []
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+
+@pytest.mark.parametrize('status', [429, 503])
+def test_retries_transient_status(status):
+    with StubSefariaServer(chapters=2, verses=2, latency=0, fail_every=2) as stub:
+        stub.fail_status = status
+        transport = HTTPTransport()
+        transport.get(f"{stub.base_url}/texts/Genesis.1")
+
+        token = RecordingToken()
+        response = transport.get(f"{stub.base_url}/texts/Genesis.2", token=token)
+        assert response.status_code == 200
+        assert token.sleeps == [0.0]
+        stats = transport.stats.summary()
+        assert stats['retries'] == 1
+        assert stats['statuses'] == {'200': 2, str(status): 1}
+
+def test_gives_up_after_max_retries():
+    with StubSefariaServer(chapters=2, verses=2, latency=0, fail_every=1) as stub:
+        transport = HTTPTransport(max_retries=2, backoff_factor=0.01)
+        token = RecordingToken()
+        response = transport.get(f"{stub.base_url}/texts/Genesis.1", token=token)
+        assert response.status_code == 503
+        assert stub.request_count == 3 and len(token.sleeps) == 2
+
+def test_retry_after_capped_at_max_backoff():
+    with StubSefariaServer(chapters=2, verses=2, latency=0, fail_every=2) as stub:
+        stub.retry_after = 3600
+        transport = HTTPTransport()
+        transport.get(f"{stub.base_url}/texts/Genesis.1")
+
+        token = RecordingToken()
+        assert transport.get(f"{stub.base_url}/texts/Genesis.2", token=token).status_code == 200
+        assert token.sleeps == [60.0]
+
+def test_parse_retry_after():
+    assert parse_retry_after('3600') == 60.0
+    assert parse_retry_after('2.5') == 2.5
+    assert parse_retry_after('-1') == 0.0
+    assert 25 <= parse_retry_after(formatdate(time.time() + 30, usegmt=True)) <= 30
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after(None) is None
+
+def test_cancel_ends_retry_wait():
+    with StubSefariaServer(chapters=2, verses=2, latency=0, fail_every=1) as stub:
+        stub.retry_after = 30
+        token = CancelToken()
+        threading.Timer(0.2, token.cancel).start()
+
+        start = time.perf_counter()
+        with pytest.raises(DownloadCancelled):
+            HTTPTransport().get(f"{stub.base_url}/texts/Genesis.1", token=token)
+        assert time.perf_counter() - start < 5
+        assert stub.request_count == 1
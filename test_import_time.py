@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test Import Time - Startup Latency Guard
+Import the downloader core and CLI under `python -X importtime` in a fresh
+interpreter and check they stay fast and never load tkinter (or requests,
+which is only imported once an HTTPTransport is created)
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+# Cumulative import budget in seconds, generous enough for slow CI machines;
+# the core measures roughly 30 ms, and importing requests + tkinter adds 100+ ms
+IMPORT_BUDGET = 0.1
+HEAVY_MODULES = ('tkinter', 'requests')
+
+def import_times(module: str) -> Dict[str, float]:
+    """Cumulative import time in seconds of every module loaded by importing module"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=Path(__file__).parent, capture_output=True, text=True, check=True,
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+def check_module(module: str):
+    times = import_times(module)
+
+    heavy = [name for name in times if name.split('.')[0] in HEAVY_MODULES]
+    assert not heavy, f"importing {module} loaded {', '.join(heavy)}"
+
+    # Take the best of a few runs so one noisy run does not fail the suite
+    best = min([times[module]] + [import_times(module)[module] for _ in range(2)])
+    assert best < IMPORT_BUDGET, f"importing {module} took {best * 1000:.0f} ms"
+
+def test_core_import_is_light():
+    check_module('clean_bible_downloader')
+
+def test_cli_import_is_light():
+    check_module('bible_cli')
+
+def main():
+    for module in ('clean_bible_downloader', 'bible_cli', 'bible_downloader_gui'):
+        times = import_times(module)
+        heavy = sorted({name.split('.')[0] for name in times} & set(HEAVY_MODULES))
+        print(f"{module}: {times[module] * 1000:.1f} ms"
+              + (f" (loads {', '.join(heavy)})" if heavy else ""))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test Range Fetch - Book.N-M spans, their cache entries and the CLI batch
+"""
+
+import io
+import json
+
+import pytest
+
+from bible_cli import BatchRunner, build_jobs
+from clean_bible_downloader import CleanBibleDownloader, SpanSizer, split_range
+from response_cache import ResponseCache
+from tests.stub_server import StubSefariaServer
+
+def test_spans_stop_at_gaps_and_span_size():
+    downloader = CleanBibleDownloader(range_fetch=True, span_sizer=SpanSizer(initial=3))
+    assert list(downloader.request_spans([1, 2, 3, 4, 5, 7, 8, 10])) == [[1, 2, 3], [4, 5], [7, 8], [10]]
+    downloader.range_fetch = False
+    assert list(downloader.request_spans([1, 2])) == [[1], [2]]
+
+def test_span_sizer_adapts():
+    sizer = SpanSizer(initial=4, max_span=30, target_bytes=1000, target_seconds=10)
+    sizer.record(4, 400, 0.1)
+    assert sizer.span == 8
+    sizer.record(8, 8000, 0.1)
+    assert 1 <= sizer.span < 8
+
+def test_split_range():
+    data = {'he': [['<b>א</b>', 'ב'], [], ['ג']], 'text': [['a'], ['b'], []], 'versionTitle': 'x'}
+    assert split_range(data, 'he-en', 3) == [
+        {'hebrew': ['א', 'ב'], 'english': ['a']},
+        {'hebrew': [], 'english': ['b']},
+        {'hebrew': ['ג'], 'english': []},
+    ]
+    assert split_range({'he': [], 'text': []}, 'he', 2) == [{'hebrew': [], 'english': []}] * 2
+    with pytest.raises(ValueError):
+        split_range(data, 'he', 2)
+
+def test_offline_rerun_with_other_spans(tmp_path):
+    with StubSefariaServer(chapters=40, verses=3, latency=0.001, chapter_latency=0.001) as stub:
+        cold = stub.downloader(max_workers=4, requests_per_second=0, range_fetch=True,
+                               cache=ResponseCache(str(tmp_path)))
+        online = cold.download_book('Genesis', 'he-en')
+        assert len(online['hebrew']) == 120
+
+        # Other workers and span sizes than the cold run
+        offline = stub.downloader(max_workers=8, requests_per_second=0, range_fetch=True,
+                                  span_sizer=SpanSizer(initial=7), cache=ResponseCache(str(tmp_path)),
+                                  offline=True)
+        requests_before = stub.request_count
+        assert offline.download_book('Genesis', 'he-en') == online
+        assert stub.request_count == requests_before
+
+def test_batch_runner_range_fetch(tmp_path):
+    with StubSefariaServer(chapters=12, verses=2, latency=0) as stub:
+        downloader = stub.downloader(requests_per_second=0, range_fetch=True)
+        jobs = build_jobs(downloader, ['Genesis:1-10'], ['he-en', 'en'], tmp_path)
+        for job in jobs:
+            job.output_dir.mkdir(parents=True, exist_ok=True)
+        progress = io.StringIO()
+        summary = BatchRunner(downloader, jobs, workers=2, progress=progress).run()
+
+        assert summary['chapters'] == 20 and not summary['failed']
+        # he-en and en share one Book.N-M request per span
+        assert stub.request_count < 10
+        events = [json.loads(line) for line in progress.getvalue().splitlines()]
+        assert sorted(e['chapter'] for e in events if e['event'] == 'chapter' and e['version'] == 'en') \
+            == list(range(1, 11))
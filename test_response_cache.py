@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test Response Cache - storage, LRU eviction, persistence and revalidation
+"""
+
+from response_cache import ResponseCache
+from tests.stub_server import StubSefariaServer
+
+def test_put_get_and_same_body_again(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    key = cache.key('http://x/api/texts/Genesis.1', {'ven': 'A'})
+    assert key != cache.key('http://x/api/texts/Genesis.1')
+
+    cache.put(key, b'{"he": []}', {'ETag': '"1"'})
+    cache.put(key, b'{"he": []}', {'ETag': '"1"'})
+    entry = cache.get(key)
+    assert cache.read(entry) == b'{"he": []}'
+    assert cache.conditional_headers(entry) == {'If-None-Match': '"1"'}
+    assert cache.total_bytes == len(b'{"he": []}')
+
+def test_lru_eviction(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=25)
+    for name in ('a', 'b', 'c'):
+        cache.put(name, name.encode() * 10)
+    assert cache.get('a') is None
+    assert cache.get('b') is not None and cache.get('c') is not None
+
+    # b is now the most recently used, so c goes next
+    cache.get('b')
+    cache.put('d', b'd' * 10)
+    assert cache.get('c') is None and cache.get('b') is not None
+
+def test_index_written_on_flush(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.put('a', b'body')
+    assert ResponseCache(str(tmp_path)).get('a') is None
+
+    cache.flush()
+    reloaded = ResponseCache(str(tmp_path))
+    assert reloaded.read(reloaded.get('a')) == b'body'
+
+def test_stale_entries_revalidate_with_304(tmp_path):
+    with StubSefariaServer(chapters=2, verses=3, latency=0) as stub:
+        fresh = stub.downloader(cache=ResponseCache(str(tmp_path / 'fresh'), max_age=None))
+        first = fresh.download_chapter('Genesis', 1, 'he-en')
+        assert fresh.download_chapter('Genesis', 1, 'he-en') == first
+        assert fresh.transport.stats.summary()['statuses'] == {'200': 1}
+
+        stale = stub.downloader(cache=ResponseCache(str(tmp_path / 'stale'), max_age=0))
+        assert stale.download_chapter('Genesis', 1, 'he-en') == first
+        assert stale.download_chapter('Genesis', 1, 'he-en') == first
+        assert stale.transport.stats.summary()['statuses'] == {'200': 1, '304': 1}
+
+class RacingCache(ResponseCache):
+    """Cache whose entries are evicted by another thread right after get()"""
+
+    def get(self, key):
+        entry = super().get(key)
+        if entry is not None:
+            self.clear()
+        return entry
+
+def test_entry_evicted_after_get_is_a_miss(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'plain'), max_bytes=10)
+    cache.put('a', b'a' * 10)
+    entry = cache.get('a')
+    cache.put('b', b'b' * 10)
+    assert cache.read(entry) is None
+
+    with StubSefariaServer(chapters=2, verses=3, latency=0) as stub:
+        fresh = stub.downloader(cache=RacingCache(str(tmp_path / 'fresh'), max_age=None))
+        first = fresh.download_chapter('Genesis', 1, 'he-en')
+        assert 'error' not in first
+        assert fresh.download_chapter('Genesis', 1, 'he-en') == first
+        assert fresh.transport.stats.summary()['statuses'] == {'200': 2}
+
+        # Evicted while a stale entry was being revalidated: the 304 is followed by a full GET
+        stale = stub.downloader(cache=RacingCache(str(tmp_path / 'stale'), max_age=0))
+        stale.download_chapter('Genesis', 1, 'he-en')
+        assert stale.download_chapter('Genesis', 1, 'he-en') == first
+        assert stale.transport.stats.summary()['statuses'] == {'200': 2, '304': 1}
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test Search Index - queries, chapter replacement and the saved file
+"""
+
+from search_index import SearchIndex, tokenize
+
+def sample_index() -> SearchIndex:
+    index = SearchIndex()
+    index.add_chapter('Genesis', 1, ['בְּרֵאשִׁית בָּרָא אֱלֹהִים', 'וְהָאָרֶץ הָיְתָה תֹהוּ'],
+                      ['In the beginning God created', 'And the earth was unformed'])
+    index.add_chapter('Genesis', 2, ['וַיְכֻלּוּ הַשָּׁמַיִם וְהָאָרֶץ'],
+                      ["And the heaven and the earth were finished"])
+    return index
+
+def queries(index: SearchIndex):
+    return [index.search(query) for query in
+            ('earth', '"the earth"', 'begin*', 'והארץ', 'ברא God', '"earth the"', 'missing')]
+
+def test_queries():
+    # Niqqud dropped and final letters folded, so any spelling of a word matches
+    assert tokenize('וְהָאָרֶץ, the Earth’s') == ['והארצ', 'the', "earth's"]
+    assert queries(sample_index()) == [
+        [('Genesis', 1, 2), ('Genesis', 2, 1)],
+        [('Genesis', 1, 2), ('Genesis', 2, 1)],
+        [('Genesis', 1, 1)],
+        [('Genesis', 1, 2), ('Genesis', 2, 1)],
+        [('Genesis', 1, 1)],
+        [],
+        [],
+    ]
+
+def test_term_in_both_languages():
+    # Latin words and digits occur on both sides; doc ids of a term must still increase
+    index = SearchIndex()
+    index.add_chapter('Genesis', 1, hebrew=['x', 'abc 2'], english=['abc 1', 'y'])
+    assert index.search('abc') == [('Genesis', 1, 1), ('Genesis', 1, 2)]
+    assert index.search('"abc 2"') == [('Genesis', 1, 2)]
+
+def test_replaced_chapter_drops_old_verses():
+    index = sample_index()
+    index.add_chapter('Genesis', 1, ['בְּרֵאשִׁית'], ['In the beginning'])
+    assert len(index) == 2
+    assert index.search('earth') == [('Genesis', 2, 1)]
+    assert index.search('beginning') == [('Genesis', 1, 1)]
+
+def test_save_load_round_trip(tmp_path):
+    index = sample_index()
+    index.add_chapter('Genesis', 1, ['בְּרֵאשִׁית'], ['In the beginning'])
+    path = str(tmp_path / 'search_index.bin')
+    index.save(path)
+
+    loaded = SearchIndex.load(path)
+    assert len(loaded) == len(index)
+    assert queries(loaded) == queries(index)
+
+    # Later chapters still index correctly after a load
+    loaded.add_chapter('Exodus', 1, [], ['These are the names'])
+    assert loaded.search('names') == [('Exodus', 1, 1)]
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test Significance - reproducible shuffles and p-value bounds
+"""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from gematria import GematriaCorpus
+from significance import ShuffleTest, VerseSumMultiple, WordValueCount, shuffle_letters
+
+VERSES = [
+    ('Genesis', 1, 1, 'בראשית ברא אלהים את השמים ואת הארץ'),
+    ('Genesis', 1, 2, 'והארץ היתה תהו ובהו וחשך על פני תהום'),
+    ('Genesis', 1, 3, 'ויאמר אלהים יהי אור ויהי אור'),
+    ('Genesis', 1, 4, 'וירא אלהים את האור כי טוב'),
+]
+
+def sample_corpus() -> GematriaCorpus:
+    return GematriaCorpus.from_verses(VERSES)
+
+@pytest.mark.parametrize('control', ['letters', 'verses'])
+def test_same_seed_same_result_for_any_worker_count(control):
+    test = ShuffleTest(sample_corpus(), WordValueCount(86), control, seed=7)
+    serial = test.null_distribution(40, workers=1)
+    for workers in (2, 3):
+        assert np.array_equal(test.null_distribution(40, workers=workers), serial)
+
+    # A different seed draws different shuffles
+    other = ShuffleTest(sample_corpus(), WordValueCount(86), control, seed=8)
+    assert not np.array_equal(other.null_distribution(40, workers=1), serial)
+
+def test_verses_control_keeps_letters_in_their_verse():
+    corpus = sample_corpus()
+    shuffled = shuffle_letters(corpus, np.random.default_rng(0), 'verses')
+    bounds = list(corpus.verse_letter_starts) + [len(corpus.letters)]
+    for start, end in zip(bounds, bounds[1:]):
+        assert sorted(shuffled[start:end]) == sorted(corpus.letters[start:end])
+    assert not np.array_equal(shuffled, corpus.letters)
+
+@pytest.mark.parametrize('control', ['letters', 'verses'])
+@pytest.mark.parametrize('alternative', ['greater', 'less', 'two-sided'])
+def test_p_value_and_interval_in_bounds(control, alternative):
+    shuffles = 50
+    for statistic in (WordValueCount(86), VerseSumMultiple(7)):
+        result = ShuffleTest(sample_corpus(), statistic, control).run(shuffles, workers=1,
+                                                                     alternative=alternative)
+        # Add-one estimate: the observed text counts as one of the permutations
+        assert 1 / (1 + shuffles) <= result['p_value'] <= 1
+        low, high = result['p_value_interval']
+        assert 0 <= low <= result['p_value'] <= high <= 1
+        assert result['null_interval'][0] <= result['null_interval'][1]
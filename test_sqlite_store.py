@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Test SQLite Store - chapter replacement, FTS5 search and WAL mode
+"""
+
+from sqlite_store import SQLiteStore
+
+def sample_store(tmp_path) -> SQLiteStore:
+    store = SQLiteStore(str(tmp_path / 'bible.db'))
+    store.write_chapters('Genesis', 'he-en', [
+        (1, ['בְּרֵאשִׁית בָּרָא אֱלֹהִים', 'וְהָאָרֶץ הָיְתָה תֹהוּ'],
+         ['In the beginning God created', 'And the earth was unformed']),
+        (2, ['וַיְכֻלּוּ הַשָּׁמַיִם וְהָאָרֶץ'], ['And the heaven and the earth were finished']),
+    ])
+    return store
+
+def test_journal_mode_is_wal(tmp_path):
+    with sample_store(tmp_path) as store:
+        assert store.conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+def test_rewritten_chapter_replaces_its_rows(tmp_path):
+    with sample_store(tmp_path) as store:
+        assert store.write_chapters('Genesis', 'he-en', [(1, ['בְּרֵאשִׁית'], ['In the beginning'])]) == 1
+        assert store.chapter('Genesis', 1, 'english') == ['In the beginning']
+        assert store.verse('Genesis', 1, 2) is None
+        assert store.chapter_numbers('Genesis') == [1, 2]
+
+        # No verse or FTS rows of the old copy remain
+        assert store.conn.execute('SELECT COUNT(*) FROM verses').fetchone()[0] == 2
+        assert store.conn.execute('SELECT COUNT(*) FROM verses_fts').fetchone()[0] == 2
+        assert store.search('unformed') == []
+        assert store.search('earth') == [('Genesis', 2, 1, 'he-en')]
+
+def test_search_with_language_filter(tmp_path):
+    with sample_store(tmp_path) as store:
+        store.write_chapters('Genesis', 'en', [(1, [], ['The earth'])])
+
+        # Niqqud dropped and final letters folded, as in SearchIndex
+        assert store.search('והארץ') == [('Genesis', 1, 2, 'he-en'), ('Genesis', 2, 1, 'he-en')]
+        assert store.search('והארץ', language='english') == []
+        assert store.search('earth', language='hebrew') == []
+        assert store.search('earth', language='english', version='en') == [('Genesis', 1, 1, 'en')]
+        assert store.search('"the earth"') == [('Genesis', 1, 1, 'en'), ('Genesis', 1, 2, 'he-en'),
+                                               ('Genesis', 2, 1, 'he-en')]
+        assert store.search('begin*', language='english') == [('Genesis', 1, 1, 'he-en')]
+        assert store.search('ברא God') == [('Genesis', 1, 1, 'he-en')]
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test Text Cleaner - tags, footnotes, entities and paragraph markers
+"""
+
+import re
+from pathlib import Path
+
+from gematria import GematriaCorpus
+from text_cleaner import clean_lines, clean_text
+
+SAMPLE_HEBREW = Path(__file__).parent / 'genesis_chapter_1_hebrew_ONLY.txt'
+
+def sample_verses():
+    """Raw verses of the bundled Genesis 1 sample, as downloaded"""
+    lines = SAMPLE_HEBREW.read_text(encoding='utf-8').splitlines()
+    return [match.group(2) for match in map(re.compile(r'^(\d+): (.*)$').match, lines) if match]
+
+def test_sample_chapter_has_no_paragraph_markers():
+    verses = sample_verses()
+    assert len(verses) == 31
+    assert any('{פ}' in verse for verse in verses)
+
+    cleaned = clean_lines(verses)
+    assert not any('{' in verse or '}' in verse or '&' in verse for verse in cleaned)
+    assert cleaned[4] == clean_text(verses[4].replace('{פ}', ''))
+    assert cleaned[4].endswith('׃')
+
+def test_paragraph_marker_is_not_a_word():
+    corpus = GematriaCorpus.from_verses([('Genesis', 1, 5, clean_text(sample_verses()[4]))])
+    last = len(corpus.word_starts) - 1
+    assert corpus.word(last) == 'אחד'
+    assert corpus.word_sums()[-1] == 13
+
+def test_span_wrapped_markers_and_footnotes():
+    text = ('הָאָֽרֶץ׃ <span class="mam-spi-samekh">{ס}</span>'
+            ' and<sup class="footnote-marker">*</sup><i class="footnote">a <i>Heb.</i> note</i> earth')
+    assert clean_text(text) == 'הָאָֽרֶץ׃ and earth'
+
+def test_break_tags_any_case():
+    assert clean_text('one<P>two<BR/>three<div>four</div>') == 'one two three four'
+
+def test_closing_block_tags_break_words():
+    assert clean_text('<p>one</p>two</DIV>three<b>four</b>five') == 'one two threefourfive'
+    assert clean_text('a&nbsp;{ס}&nbsp;b') == 'a b'
+
+def test_entities():
+    assert clean_text('&ldquo;light&rdquo;&thinsp;&#x5D0; &amp;lt;') == '“light” א &lt;'
+    assert clean_text('') == ''
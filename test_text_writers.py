@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test Text Writers - streamed .part files, renames on close and aborted books
+"""
+
+import pytest
+
+from text_writers import StreamingBookWriter, save_clean_text
+
+CHAPTERS = [
+    {'hebrew': ['א1', 'א2'], 'english': ['a1', 'a2']},
+    {'hebrew': ['ב1'], 'english': ['b1', 'b2']},
+]
+
+def part_files(directory) -> list:
+    return sorted(path.name for path in directory.iterdir() if path.name.endswith('.part'))
+
+def test_chapters_stream_to_part_files(tmp_path):
+    writer = StreamingBookWriter(str(tmp_path), 'Ruth')
+    writer.write_chapter(CHAPTERS[0], 1)
+    assert part_files(tmp_path) == ['Ruth_english_clean.txt.part', 'Ruth_hebrew_clean.txt.part',
+                                    'Ruth_parallel_clean.txt.part']
+    assert not writer.path('hebrew').exists()
+
+    # Flushed after every chapter, so partial output is readable mid-download
+    partial = (tmp_path / 'Ruth_hebrew_clean.txt.part').read_text(encoding='utf-8')
+    assert partial.endswith('א1\nא2\n')
+    writer.abort()
+
+def test_close_renames_to_final_names(tmp_path):
+    with StreamingBookWriter(str(tmp_path), 'Ruth') as writer:
+        for chapter, data in enumerate(CHAPTERS, 1):
+            writer.write_chapter(data, chapter)
+    assert part_files(tmp_path) == []
+
+    hebrew = writer.path('hebrew').read_text(encoding='utf-8')
+    assert hebrew.startswith('Clean Hebrew Text - Ruth\n') and hebrew.endswith('א1\nא2\nב1\n')
+    parallel = writer.path('parallel').read_text(encoding='utf-8')
+    assert '--- Verse 2:2 ---\nHebrew:  \nEnglish: b2\n' in parallel
+
+def test_close_returns_names_and_matches_save_clean_text(tmp_path):
+    streamed, whole = tmp_path / 'streamed', tmp_path / 'whole'
+    streamed.mkdir()
+    whole.mkdir()
+
+    writer = StreamingBookWriter(str(streamed), 'Ruth')
+    for data in CHAPTERS:
+        writer.write_chapter(data)
+    assert sorted(writer.close()) == ['Ruth_english_clean.txt', 'Ruth_hebrew_clean.txt',
+                                      'Ruth_parallel_clean.txt']
+
+    # Without chapter numbers verses are numbered across the book, as save_clean_text does
+    save_clean_text({'hebrew': ['א1', 'א2', 'ב1', ''], 'english': ['a1', 'a2', 'b1', 'b2']},
+                    str(whole), 'Ruth')
+    for name in ('Ruth_english_clean.txt', 'Ruth_parallel_clean.txt'):
+        assert (streamed / name).read_text(encoding='utf-8') == (whole / name).read_text(encoding='utf-8')
+
+def test_abort_leaves_part_files(tmp_path):
+    with pytest.raises(KeyboardInterrupt):
+        with StreamingBookWriter(str(tmp_path), 'Ruth') as writer:
+            writer.write_chapter(CHAPTERS[0], 1)
+            raise KeyboardInterrupt
+
+    assert part_files(tmp_path) == ['Ruth_english_clean.txt.part', 'Ruth_hebrew_clean.txt.part',
+                                    'Ruth_parallel_clean.txt.part']
+    assert not writer.path('hebrew').exists()
+    assert (tmp_path / 'Ruth_english_clean.txt.part').read_text(encoding='utf-8').endswith('a1\na2\n')
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Test Verse Table - reference lookup over the array columns
+"""
+
+import pytest
+
+from verse_table import VerseRecord, VerseTable
+
+def sample_table() -> VerseTable:
+    table = VerseTable()
+    table.add_chapter('Genesis', 1, ['א1', 'א2', 'א3'], ['e1', 'e2'])
+    table.add_chapter('Genesis', 2, ['ב1'], ['f1'])
+    table.add_chapter('Exodus', 1, [], ['x1', 'x2'])
+    return table
+
+def test_lookup():
+    table = sample_table()
+    assert len(table) == 6
+    assert table.get('Genesis', 1, 3) == 'א3'
+    assert table.get('Genesis', 1, 3, 'english') == ''
+    assert table.get('Exodus', 1, 2, 'english') == 'x2'
+    assert table.get('Exodus', 1, 3) is None and table.get('Leviticus', 1, 1) is None
+
+    row = table.row('Genesis', 2, 1)
+    assert table.ref(row) == ('Genesis', 2, 1)
+    assert table.record(row) == VerseRecord(0, 2, 1, 3, 2)
+    assert table.chapter('Genesis', 1, 'english') == ['e1', 'e2', '']
+    assert table.chapter_numbers('Genesis') == [1, 2]
+    assert list(table.chapter_rows('Exodus', 2)) == []
+
+def test_flat_lists_and_iteration():
+    table = sample_table()
+    result = table.as_result()
+    assert result['hebrew'] == ['א1', 'א2', 'א3', 'ב1']
+    assert result['english'] == ['e1', 'e2', 'f1', 'x1', 'x2']
+    assert list(table.iter_verses())[-1] == ('Exodus', 1, 2, '')
+    assert table == sample_table()
+
+def test_duplicate_chapter_is_rejected():
+    table = sample_table()
+    with pytest.raises(ValueError):
+        table.add_chapter('Genesis', 2, ['again'])
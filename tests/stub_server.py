@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Stub Sefaria Server
+
+Local HTTP server answering /api/texts/, /api/shape/ and /api/texts/versions/
+requests like Sefaria, with configurable latency, periodic 503/429 failures and
+revised chapters. Used by the tests and by benchmarks.py.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+from chapter_index import ChapterIndex, load_chapter_index
+from clean_bible_downloader import CleanBibleDownloader
+
+SAMPLE_HEBREW = "<big>בְּ</big>רֵאשִׁ֖ית בָּרָ֣א אֱלֹהִ֑ים אֵ֥ת הַשָּׁמַ֖יִם וְאֵ֥ת הָאָֽרֶץ׃"
+SAMPLE_ENGLISH = ('When God began to create<sup class="footnote-marker">*</sup>'
+                  '<i class="footnote"><b>When God began to create </b>Others '
+                  '"In the beginning God created."</i> heaven and earth—')
+
+# Version titles the stub server reports
+STUB_HEBREW_VERSION = 'Stub Hebrew Edition'
+STUB_ENGLISH_VERSION = 'Stub English Translation'
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    # Large listen backlog so hundreds of concurrent clients are not refused
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class StubSefariaServer:
+    """Local HTTP server that answers /api/texts/ requests like Sefaria"""
+
+    def __init__(self, chapters: int = 150, verses: int = 20, latency: float = 0.05,
+                 fail_every: int = 0, chapter_latency: float = 0.0):
+        self.chapters = chapters
+        self.verses = verses
+        self.latency = latency
+        # Extra server time per chapter in a Book.N-M range response
+        self.chapter_latency = chapter_latency
+        # Answer every Nth request with fail_status (503 or 429) + Retry-After to exercise retries
+        self.fail_every = fail_every
+        self.fail_status = 503
+        self.retry_after = 0
+        # Chapters served with an edited English text, to simulate upstream revisions;
+        # the texts/versions listing reports a new revision whenever they change
+        self.revised_chapters = set()
+        # Sefaria itself sends no ETag; turn them off to test without validators
+        self.send_etags = True
+        self.request_count = 0
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = _StubHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}/api"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def downloader(self, **kwargs) -> CleanBibleDownloader:
+        """A downloader pointed at this stub, with every book sized like the stub"""
+        books = {name: {'chapters': self.chapters, 'verses': [self.verses] * self.chapters}
+                 for name in load_chapter_index().books}
+        return CleanBibleDownloader(base_url=self.base_url, chapter_index=ChapterIndex(books), **kwargs)
+
+    def chapter_payload(self, chapter: int, ven: str = '') -> dict:
+        """Build the JSON body for a single chapter, in English version ven if named"""
+        english = f"{chapter}: {SAMPLE_ENGLISH}"
+        if ven:
+            english = f"[{ven}] {english}"
+        if chapter in self.revised_chapters:
+            english += " (revised)"
+        return {
+            'he': [SAMPLE_HEBREW] * self.verses,
+            'text': [english] * self.verses,
+            'versionTitle': ven or STUB_ENGLISH_VERSION,
+            'heVersionTitle': STUB_HEBREW_VERSION,
+        }
+
+    def versions_payload(self) -> list:
+        """texts/versions listing: the default versions with a revision counter"""
+        revision = len(self.revised_chapters)
+        return [{'versionTitle': STUB_HEBREW_VERSION, 'language': 'he', 'revision': revision},
+                {'versionTitle': STUB_ENGLISH_VERSION, 'language': 'en', 'revision': revision}]
+
+    def handle(self, request: BaseHTTPRequestHandler):
+        """Serve one request after the simulated network latency"""
+        with self._lock:
+            self.request_count += 1
+            fail = self.fail_every and self.request_count % self.fail_every == 0
+
+        path = unquote(urlparse(request.path).path)
+        ven = parse_qs(urlparse(request.path).query).get('ven', [''])[0]
+        ref = path.rsplit('/', 1)[-1]
+        first, _, last = ref.rpartition('.')[2].partition('-') if '.' in ref else ('', '', '')
+
+        extra_chapters = int(last) - int(first) if last else 0
+        time.sleep(self.latency + extra_chapters * self.chapter_latency)
+
+        if fail:
+            request.send_response(self.fail_status)
+            request.send_header('Retry-After', str(self.retry_after))
+            request.send_header('Content-Length', '0')
+            request.end_headers()
+            return
+
+        if '/texts/versions/' in path:
+            body = self.versions_payload()
+        elif '/shape/' in path:
+            body = [{'title': ref, 'chapters': [self.verses] * self.chapters}]
+        elif last:
+            # Range refs nest each field per chapter
+            chapters = [self.chapter_payload(chapter, ven) for chapter in range(int(first), int(last) + 1)]
+            body = {key: [chapter[key] for chapter in chapters] for key in ('he', 'text')}
+            body.update({key: chapters[0][key] for key in ('versionTitle', 'heVersionTitle')})
+        elif '.' in ref:
+            body = self.chapter_payload(int(first), ven)
+        else:
+            body = {'text': [[''] * self.verses for _ in range(self.chapters)]}
+
+        payload = json.dumps(body).encode('utf-8')
+        etag = '"' + hashlib.sha1(payload).hexdigest() + '"'
+
+        if self.send_etags and request.headers.get('If-None-Match') == etag:
+            request.send_response(304)
+            request.send_header('ETag', etag)
+            request.end_headers()
+            return
+
+        request.send_response(200)
+        request.send_header('Content-Type', 'application/json')
+        if self.send_etags:
+            request.send_header('ETag', etag)
+        request.send_header('Content-Length', str(len(payload)))
+        request.end_headers()
+        request.wfile.write(payload)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
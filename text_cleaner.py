@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Text Cleaner
+
+Single-pass cleaning of Sefaria verse markup. One compiled alternation
+scans each verse once: footnotes and editorial markers go together with
+their content, break tags become spaces, other tags are dropped, bare
+{פ} / {ס} paragraph markers are removed and entities are decoded, all by
+one replacement callback. Whitespace is normalized afterwards.
+"""
+
+import re
+from html.entities import html5
+from typing import Iterable, List
+
+# Elements whose content is not part of the verse text
+SKIP_CLASSES = (
+    'footnote',          # <i class="footnote">...</i> translator notes
+    'footnote-marker',   # <sup class="footnote-marker">*</sup>
+    'mam-spi-pe',        # {פ} open paragraph marker
+    'mam-spi-samekh',    # {ס} closed paragraph marker
+)
+
+# Tags that separate words when removed, opening or closing
+BREAK_TAGS = ('br', 'p', 'div')
+
+# Content of a skipped element: text, other tags, or one nested level of the same tag
+# (footnotes such as <i class="footnote">... <i>Heb.</i> ...</i> nest their own tag)
+_INNER = r'(?:[^<]+|<(?!/?(?P=tag)\b)[^>]*>)*'
+
+# One scan: at '<' a skipped element (with its content) wins over a break tag, which
+# wins over any other tag; then bare {פ} / {ס} markers and entities. Every
+# alternative starts with a literal character, so the scan skips plain text quickly
+_CLEAN_RE = re.compile(
+    r'<(?:'
+    r'(?P<skip>(?P<tag>[a-z]+)\b[^>]*\bclass\s*=\s*["\'](?:[^"\']*\s)?(?:%s)(?:\s[^"\']*)?["\'][^>]*>'
+    % '|'.join(re.escape(name) for name in SKIP_CLASSES)
+    + _INNER + r'(?:<(?P=tag)\b[^>]*>' + _INNER + r'</(?P=tag)\s*>' + _INNER + r')*'
+    r'</(?P=tag)\s*>)'
+    r'|(?P<break>/?(?:%s)\b[^>]*>)' % '|'.join(BREAK_TAGS)
+    + r'|[^>]*>)'
+    r'|(?P<marker>\{[פס]\})'
+    r'|&(?P<entity>#[0-9]+|#[xX][0-9A-Fa-f]+|[A-Za-z][A-Za-z0-9]*);',
+    re.IGNORECASE,
+)
+
+# Replacements by the alternative that matched; other tags and skipped elements vanish.
+# The &nbsp; before a bare marker decodes to a space, which the whitespace split drops
+_SPACED = {'break': ' ', 'marker': ' '}
+
+def _replace(match) -> str:
+    kind = match.lastgroup
+    if kind == 'entity':
+        name = match.group(kind)
+        if name[0] == '#':
+            try:
+                return chr(int(name[2:], 16) if name[1] in 'xX' else int(name[1:]))
+            except (ValueError, OverflowError):
+                return ''
+        return html5.get(name + ';', match.group(0))
+    return _SPACED.get(kind, '')
+
+def clean_text(text: str) -> str:
+    """Strip tags, footnotes and markers, decode entities and normalize whitespace"""
+    if not text:
+        return ''
+
+    if '<' in text or '&' in text or '{' in text:
+        text = _CLEAN_RE.sub(_replace, text)
+
+    # str.split() with no argument also splits on decoded &thinsp; / &nbsp;
+    return ' '.join(text.split())
+
+def clean_lines(lines: Iterable[str]) -> List[str]:
+    """Clean a whole chapter (or any list of verses) at once"""
+    return [clean_text(line) if isinstance(line, str) else '' for line in lines]
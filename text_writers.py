@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Text Writers
+
+Write cleaned Bible text to the _hebrew_clean, _english_clean and
+_parallel_clean .txt files, either all at once from a downloaded result
+or streamed chapter by chapter while a book is still downloading.
+Parallel files label verses by chapter ("--- Verse 3:16 ---") whenever
+the chapter is known.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+def _header(title: str) -> str:
+    return f"{title}\n" + "=" * 50 + "\n\n"
+
+def _parallel_verse(label, hebrew_line: str, english_line: str) -> str:
+    return f"\n--- Verse {label} ---\nHebrew:  {hebrew_line}\nEnglish: {english_line}\n"
+
+def save_clean_text(data: Dict, output_dir: str, filename: str) -> List[str]:
+    """Save clean text to files, returning the names of the files written
+
+    When data carries a 'verses' VerseTable (download_book results) the
+    parallel file pairs verses per chapter and labels them chapter:verse.
+    """
+    saved = []
+
+    # Save Hebrew text
+    if data['hebrew']:
+        hebrew_file = Path(output_dir) / f"{filename}_hebrew_clean.txt"
+        with open(hebrew_file, 'w', encoding='utf-8') as f:
+            f.write(_header(f"Clean Hebrew Text - {filename}"))
+            for line in data['hebrew']:
+                f.write(line + "\n")
+        saved.append(hebrew_file.name)
+
+    # Save English text
+    if data['english']:
+        english_file = Path(output_dir) / f"{filename}_english_clean.txt"
+        with open(english_file, 'w', encoding='utf-8') as f:
+            f.write(_header(f"Clean English Text - {filename}"))
+            for line in data['english']:
+                f.write(line + "\n")
+        saved.append(english_file.name)
+
+    # Save combined text
+    if data['hebrew'] and data['english']:
+        combined_file = Path(output_dir) / f"{filename}_parallel_clean.txt"
+        with open(combined_file, 'w', encoding='utf-8') as f:
+            f.write(_header(f"Parallel Hebrew-English Text - {filename}"))
+
+            table = data.get('verses')
+            if table is not None:
+                for row in range(len(table)):
+                    f.write(_parallel_verse(f"{table.chapters[row]}:{table.verses[row]}",
+                                            table.text(row, 'hebrew'), table.text(row, 'english')))
+            else:
+                # Determine which array is longer
+                max_lines = max(len(data['hebrew']), len(data['english']))
+
+                for i in range(max_lines):
+                    hebrew_line = data['hebrew'][i] if i < len(data['hebrew']) else ""
+                    english_line = data['english'][i] if i < len(data['english']) else ""
+                    f.write(_parallel_verse(i + 1, hebrew_line, english_line))
+        saved.append(combined_file.name)
+
+    return saved
+
+class StreamingBookWriter:
+    """Append each chapter to the output files as soon as it is cleaned
+
+    Output goes to '.part' files that are flushed after every chapter, so
+    partial output can be read during a long download. close() renames
+    them into place atomically.
+    """
+
+    TITLES = {
+        'hebrew': "Clean Hebrew Text - {}",
+        'english': "Clean English Text - {}",
+        'parallel': "Parallel Hebrew-English Text - {}",
+    }
+
+    def __init__(self, output_dir: str, filename: str):
+        self.output_dir = Path(output_dir)
+        self.filename = filename
+        self.verse_number = 0
+        self.chapters_written = 0
+        self._files = {}
+
+    def path(self, kind: str) -> Path:
+        """Final path of the hebrew, english or parallel output file"""
+        return self.output_dir / f"{self.filename}_{kind}_clean.txt"
+
+    def _file(self, kind: str):
+        f = self._files.get(kind)
+        if f is None:
+            part_path = self.path(kind).with_suffix('.txt.part')
+            f = self._files[kind] = open(part_path, 'w', encoding='utf-8')
+            f.write(_header(self.TITLES[kind].format(self.filename)))
+        return f
+
+    def write_chapter(self, data: Dict, chapter: Optional[int] = None):
+        """Append one cleaned chapter to every relevant file
+
+        With a chapter number parallel verses are labelled chapter:verse,
+        otherwise they are numbered across the whole book.
+        """
+        hebrew, english = data['hebrew'], data['english']
+
+        if hebrew:
+            self._file('hebrew').writelines(line + "\n" for line in hebrew)
+
+        if english:
+            self._file('english').writelines(line + "\n" for line in english)
+
+        if hebrew and english:
+            parallel = self._file('parallel')
+            for i in range(max(len(hebrew), len(english))):
+                hebrew_line = hebrew[i] if i < len(hebrew) else ""
+                english_line = english[i] if i < len(english) else ""
+                label = f"{chapter}:{i + 1}" if chapter is not None else self.verse_number + i + 1
+                parallel.write(_parallel_verse(label, hebrew_line, english_line))
+
+        self.verse_number += max(len(hebrew), len(english))
+        self.chapters_written += 1
+
+        for f in self._files.values():
+            f.flush()
+
+    def close(self) -> List[str]:
+        """Finish the files and move them into place, returning their names"""
+        saved = []
+        for kind, f in self._files.items():
+            f.close()
+            final_path = self.path(kind)
+            os.replace(f.name, final_path)
+            saved.append(final_path.name)
+        self._files = {}
+        return saved
+
+    def abort(self):
+        """Close the files, leaving partial output in the '.part' files"""
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
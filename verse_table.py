@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Verse Table
+
+A verse-addressed, column-oriented store for downloaded text. Each verse is
+one row of compact array columns (book id, chapter, verse, Hebrew offset,
+English offset) pointing into per-language lists of lines, so chapter
+boundaries survive and (book, chapter, verse) lookups are O(1) with about
+13 bytes of column data per verse.
+
+VerseRecord is the per-verse view; records are created on demand and
+never stored.
+"""
+
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Offset of a verse with no text in a language (e.g. an English-only row)
+MISSING = -1
+
+class VerseRecord:
+    """One verse: reference plus offsets into the table's text lists"""
+
+    __slots__ = ('book_id', 'chapter', 'verse', 'hebrew_offset', 'english_offset')
+
+    def __init__(self, book_id: int, chapter: int, verse: int,
+                 hebrew_offset: int = MISSING, english_offset: int = MISSING):
+        self.book_id = book_id
+        self.chapter = chapter
+        self.verse = verse
+        self.hebrew_offset = hebrew_offset
+        self.english_offset = english_offset
+
+    def __repr__(self):
+        return (f"VerseRecord(book_id={self.book_id}, chapter={self.chapter}, verse={self.verse}, "
+                f"hebrew_offset={self.hebrew_offset}, english_offset={self.english_offset})")
+
+    def __eq__(self, other):
+        if not isinstance(other, VerseRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+class VerseTable:
+    """Array-backed verse columns with O(1) reference lookup"""
+
+    def __init__(self):
+        self.book_names: List[str] = []
+        self._book_ids: Dict[str, int] = {}
+
+        # One entry per verse row
+        self.book_ids = array('B')
+        self.chapters = array('H')
+        self.verses = array('H')
+        self.hebrew_offsets = array('i')
+        self.english_offsets = array('i')
+
+        # Text lines per language; offsets index into these
+        self.hebrew: List[str] = []
+        self.english: List[str] = []
+
+        # (book_id, chapter) -> (first row, verse count)
+        self._chapter_rows: Dict[Tuple[int, int], Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.verses)
+
+    def __eq__(self, other):
+        if not isinstance(other, VerseTable):
+            return NotImplemented
+        return (self.book_names == other.book_names and self.book_ids == other.book_ids
+                and self.chapters == other.chapters and self.verses == other.verses
+                and self.hebrew_offsets == other.hebrew_offsets
+                and self.english_offsets == other.english_offsets
+                and self.hebrew == other.hebrew and self.english == other.english)
+
+    def book_id(self, book_name: str) -> int:
+        """Id of a book, registering it on first use"""
+        book_id = self._book_ids.get(book_name)
+        if book_id is None:
+            book_id = self._book_ids[book_name] = len(self.book_names)
+            self.book_names.append(book_name)
+        return book_id
+
+    def add_chapter(self, book_name: str, chapter: int, hebrew: Sequence[str] = (),
+                    english: Sequence[str] = ()):
+        """Append a chapter; verse n is row n of the longer language"""
+        book_id = self.book_id(book_name)
+        if (book_id, chapter) in self._chapter_rows:
+            raise ValueError(f"{book_name} {chapter} is already in the table")
+
+        count = max(len(hebrew), len(english))
+        first_row = len(self.verses)
+        self._chapter_rows[(book_id, chapter)] = (first_row, count)
+
+        def offsets(lines: List[str], new_lines: Sequence[str]) -> List[int]:
+            start = len(lines)
+            lines.extend(new_lines)
+            return [start + i if i < len(new_lines) else MISSING for i in range(count)]
+
+        self.book_ids.extend([book_id] * count)
+        self.chapters.extend([chapter] * count)
+        self.verses.extend(range(1, count + 1))
+        self.hebrew_offsets.extend(offsets(self.hebrew, hebrew))
+        self.english_offsets.extend(offsets(self.english, english))
+
+    def row(self, book_name: str, chapter: int, verse: int) -> Optional[int]:
+        """Row of a verse reference, or None if it is not in the table"""
+        book_id = self._book_ids.get(book_name)
+        rows = self._chapter_rows.get((book_id, chapter))
+        if rows is None or not 1 <= verse <= rows[1]:
+            return None
+        return rows[0] + verse - 1
+
+    def record(self, row: int) -> VerseRecord:
+        return VerseRecord(self.book_ids[row], self.chapters[row], self.verses[row],
+                           self.hebrew_offsets[row], self.english_offsets[row])
+
+    def ref(self, row: int) -> Tuple[str, int, int]:
+        """(book, chapter, verse) of a row"""
+        return self.book_names[self.book_ids[row]], self.chapters[row], self.verses[row]
+
+    def text(self, row: int, language: str = 'hebrew') -> str:
+        """Text of a row in one language ('' if the verse has none)"""
+        if language == 'hebrew':
+            offset, lines = self.hebrew_offsets[row], self.hebrew
+        else:
+            offset, lines = self.english_offsets[row], self.english
+        return lines[offset] if offset != MISSING else ''
+
+    def get(self, book_name: str, chapter: int, verse: int,
+            language: str = 'hebrew') -> Optional[str]:
+        """Text of a verse reference, or None if it is not in the table"""
+        row = self.row(book_name, chapter, verse)
+        return self.text(row, language) if row is not None else None
+
+    def chapter_rows(self, book_name: str, chapter: int) -> range:
+        """Rows of one chapter (empty if it is not in the table)"""
+        rows = self._chapter_rows.get((self._book_ids.get(book_name), chapter))
+        return range(rows[0], rows[0] + rows[1]) if rows else range(0)
+
+    def chapter(self, book_name: str, chapter: int, language: str = 'hebrew') -> List[str]:
+        return [self.text(row, language) for row in self.chapter_rows(book_name, chapter)]
+
+    def chapter_numbers(self, book_name: str) -> List[int]:
+        """Chapters of a book present in the table, in insertion order"""
+        book_id = self._book_ids.get(book_name)
+        return [chapter for (book, chapter) in self._chapter_rows if book == book_id]
+
+    def iter_verses(self, language: str = 'hebrew') -> Iterator[Tuple[str, int, int, str]]:
+        """(book, chapter, verse, text) for every row, as CorpusReader.iter_verses"""
+        for row in range(len(self)):
+            yield (*self.ref(row), self.text(row, language))
+
+    def as_result(self) -> Dict:
+        """download_book result shape: flat 'hebrew' / 'english' lists plus this table"""
+        return {'hebrew': self.hebrew, 'english': self.english, 'verses': self}